@@ -3,16 +3,37 @@ Customer 360 API
 REST API for serving customer analytics data to the dashboard
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from pathlib import Path
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import importlib.util
 import logging
 import os
 import json
-from openai import OpenAI
+import re
+import time
+from rollup_cube import RollupCube
+from dashboard_engine import Segment, SegmentDashboardEngine
+from topk_index import TopKIndex
+from segment_index import SEGMENT_TYPES, SegmentActionIndex
+from chat_context import DEFAULT_TOKEN_BUDGET, ChatContext
+from name_matcher import CustomerNameMatcher
+from retrieval_index import CustomerRetrievalIndex
+from response_cache import ResponseCache
+from llm_client import LLMClient, LLMUnavailable
+from chat_tools import ChatTools
+
+# Line item rollups are shared with the gold aggregator. The module is loaded
+# from scripts/ by path, so the rest of scripts/ is not importable here.
+_spec = importlib.util.spec_from_file_location(
+    'gold_line_items', Path(__file__).resolve().parent.parent / 'scripts' / 'gold_line_items.py'
+)
+gold_line_items = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(gold_line_items)
+account_line_items, product_rollup = gold_line_items.account_line_items, gold_line_items.product_rollup
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +57,8 @@ class DataLoader:
     def __init__(self):
         self.cache = {}
         self.cache_time = {}
+        self.cache_file = {}
+        self.derived = {}
         self.opco_config = None
         self.region_to_countries = {}
 
@@ -103,13 +126,133 @@ class DataLoader:
         # Cache it
         self.cache[table_name] = df
         self.cache_time[table_name] = datetime.now()
+        self.cache_file[table_name] = latest_file.name
 
         return df
 
+    def snapshot_id(self, table_name: str):
+        """File name of the snapshot currently served for a table (None if absent)"""
+        self.load_latest(table_name)
+        return self.cache_file.get(table_name)
+
+    def get_derived(self, key: str, tables: list, builder):
+        """
+        Build (or reuse) a structure derived from one or more gold tables
+
+        The result is memoized against the snapshot files it was built from, so it
+        is rebuilt only when a newer gold file is picked up, not on every TTL refresh.
+        """
+        snapshot = tuple(self.snapshot_id(table) for table in tables)
+        cached = self.derived.get(key)
+        if cached is not None and cached[0] == snapshot:
+            return cached[1]
+
+        value = builder(*[self.load_latest(table) for table in tables])
+        self.derived[key] = (snapshot, value)
+        return value
+
 
 data_loader = DataLoader()
 
 
+def get_rollup_cube() -> RollupCube:
+    """Rollup cube for the current customer_360_metrics snapshot"""
+    return data_loader.get_derived('rollup_cube', ['customer_360_metrics'], RollupCube.from_customers)
+
+
+def get_topk_index() -> TopKIndex:
+    """Top-K leaderboard index for the current customer_360_metrics snapshot"""
+    return data_loader.get_derived(
+        'topk_index',
+        ['customer_360_metrics'],
+        lambda customers: TopKIndex.from_snapshot(customers, get_rollup_cube().relationships)
+    )
+
+
+def get_dashboard_engine() -> SegmentDashboardEngine:
+    """Segment dashboard engine for the current customer_360_metrics snapshot"""
+    return data_loader.get_derived(
+        'dashboard_engine',
+        ['customer_360_metrics'],
+        lambda customers: SegmentDashboardEngine(customers, get_rollup_cube(), get_topk_index())
+    )
+
+
+def get_segment_action_index() -> SegmentActionIndex:
+    """Segment-indexed recommendations and alerts for the current gold snapshots"""
+    return data_loader.get_derived(
+        'segment_action_index',
+        ['customer_360_metrics', 'recommendations', 'risk_alerts'],
+        lambda customers, recommendations, alerts: SegmentActionIndex(
+            customers, recommendations, alerts, get_rollup_cube().relationships
+        )
+    )
+
+
+def get_chat_context() -> ChatContext:
+    """Chatbot summary stats and system prompt for the current customer_360_metrics snapshot"""
+    token_budget = int(os.getenv('CHATBOT_CONTEXT_TOKENS', DEFAULT_TOKEN_BUDGET))
+    return data_loader.get_derived(
+        'chat_context',
+        ['customer_360_metrics'],
+        lambda customers: ChatContext(customers, token_budget)
+    )
+
+
+def get_name_matcher() -> CustomerNameMatcher:
+    """Customer name matcher for the current customer_360_metrics snapshot"""
+    return data_loader.get_derived('name_matcher', ['customer_360_metrics'], CustomerNameMatcher)
+
+
+def get_retrieval_index() -> CustomerRetrievalIndex:
+    """BM25 retrieval index over customers, alerts and recommendations for the current snapshots"""
+    return data_loader.get_derived(
+        'retrieval_index',
+        ['customer_360_metrics', 'risk_alerts', 'recommendations'],
+        CustomerRetrievalIndex
+    )
+
+
+def get_chat_tools() -> ChatTools:
+    """Function-calling tools over the current customer_360_metrics and risk_alerts snapshots"""
+    return data_loader.get_derived(
+        'chat_tools',
+        ['customer_360_metrics', 'risk_alerts'],
+        lambda customers, alerts: ChatTools(
+            customers, alerts, get_rollup_cube(), get_topk_index(), get_name_matcher()
+        )
+    )
+
+
+def index_timeline(timeline: pd.DataFrame):
+    """
+    Timeline sorted by account_id with the newest events first, and its account ids
+
+    Gold builds write the timeline in this order already; older snapshots are
+    sorted once here. Events without an account cannot be requested and are dropped.
+    """
+    timeline = timeline[timeline['account_id'].notna()] if not timeline.empty else timeline
+    if not timeline.empty and not timeline['account_id'].is_monotonic_increasing:
+        timeline = timeline.sort_values(['account_id', 'event_date'], ascending=[True, False], kind='stable')
+    timeline = timeline.reset_index(drop=True)
+    account_ids = timeline['account_id'].to_numpy(dtype=object) if not timeline.empty else np.array([], dtype=object)
+    return timeline, account_ids
+
+
+def get_timeline_index():
+    """Sorted customer timeline and its account ids for the current snapshot"""
+    return data_loader.get_derived('timeline_index', ['customer_timeline'], index_timeline)
+
+
+def resolve_opco_region(opco_id: str) -> str:
+    """Data region for an OpCo; unknown OpCos map to a region with no customers"""
+    data_loader._load_opco_config()
+    opco = next((o for o in data_loader.opco_config['opcos'] if o['id'] == opco_id), None)
+    if not opco:
+        return 'NONEXISTENT'
+    return opco.get('data_region', opco['region'])
+
+
 def has_zero_metrics(customer: dict) -> bool:
     """
     Check if a customer has any KEY BUSINESS METRIC with a zero value.
@@ -357,15 +500,15 @@ def get_customer_recommendations(account_id: str):
 @app.route('/api/customer/<account_id>/timeline', methods=['GET'])
 def get_customer_timeline(account_id: str):
     """Get customer journey timeline"""
-    timeline = data_loader.load_latest('customer_timeline')
+    timeline, account_ids = get_timeline_index()
 
     if timeline.empty:
         return jsonify([])
 
-    customer_events = timeline[timeline['account_id'] == account_id]
-
-    # Sort by date descending
-    customer_events = customer_events.sort_values('event_date', ascending=False)
+    # One account's events are a contiguous slice, newest first
+    start = np.searchsorted(account_ids, account_id, side='left')
+    end = np.searchsorted(account_ids, account_id, side='right')
+    customer_events = timeline.iloc[start:end]
 
     results = customer_events.to_dict('records')
 
@@ -409,6 +552,40 @@ def get_customer_opportunities(account_id: str):
     return jsonify(results)
 
 
+@app.route('/api/customer/<account_id>/products', methods=['GET'])
+def get_customer_products(account_id: str):
+    """Get a customer's product mix: line items, quantity and value per product, with contracted value"""
+    # Load from silver layer
+    silver_path = Path('../data/silver')
+    opp_file = silver_path / 'silver_opportunity_sample.parquet'
+    line_item_file = silver_path / 'silver_opportunity_line_item_sample.parquet'
+
+    if not opp_file.exists() or not line_item_file.exists():
+        return jsonify([])
+
+    opportunities = pd.read_parquet(opp_file)
+    customer_opps = opportunities[opportunities['account_id'] == account_id]
+    if customer_opps.empty:
+        return jsonify([])
+    line_items = pd.read_parquet(
+        line_item_file, filters=[('opportunity_id', 'in', customer_opps['opportunity_id'].tolist())]
+    )
+
+    # Same rollup as active_services, product_mix and contracted_value in customer_360_metrics
+    products = product_rollup(account_line_items(line_items, customer_opps))
+    products = products.drop(columns='account_id').sort_values('value', ascending=False, kind='stable')
+
+    results = products.to_dict('records')
+
+    # Handle NaN
+    for product in results:
+        for key, value in product.items():
+            if pd.isna(value):
+                product[key] = None
+
+    return jsonify(results)
+
+
 @app.route('/api/customer/<account_id>/tickets', methods=['GET'])
 def get_customer_tickets(account_id: str):
     """Get support tickets for a customer"""
@@ -497,146 +674,49 @@ def get_dashboard_summary():
     if customers.empty:
         return jsonify({})
 
-    # Filter by OpCo if provided
+    # Filter by OpCo (its data region) if provided
+    segment = Segment()
     opco_filter = request.args.get('opco')
     if opco_filter:
-        # Get OpCo configuration to find the data_region
-        config_path = Path(__file__).parent.parent / 'config' / 'opcos.json'
-        with open(config_path, 'r') as f:
-            opco_config = json.load(f)
-
-        # Find the matching OpCo
-        opco = next((o for o in opco_config['opcos'] if o['id'] == opco_filter), None)
-        if opco:
-            # Filter customers by exact region match
-            data_region = opco.get('data_region', opco['region'])
-            customers = customers[customers['region'] == data_region]
-        else:
-            # If OpCo not found, return empty results
-            customers = customers[customers['region'] == 'NONEXISTENT']
+        segment = Segment(region=resolve_opco_region(opco_filter))
 
-        if customers.empty:
-            return jsonify({
-                'total_customers': 0,
-                'total_revenue': 0,
-                'avg_health_score': 0,
-                'high_risk_customers': 0,
-                'health_distribution': {},
-                'risk_distribution': {},
-                'region_distribution': {},
-                'top_revenue_customers': [],
-                'at_risk_customers': [],
-                'healthy_customers_sample': [],
-                'at_risk_customers_sample': [],
-                'critical_customers_sample': [],
-                'region_samples': {},
-                'avg_nps': 0,
-                'avg_csat': 0,
-                'avg_ces': 0,
-                'avg_support_tickets': 0,
-                'avg_sla_compliance': 0,
-                'avg_revenue_per_customer': 0
-            })
+    return jsonify(get_dashboard_engine().dashboard(segment))
 
-    # Helper function to add subsidiary info to customer records
-    def add_subsidiary_info(customer_df):
-        results = []
-        for _, customer in customer_df.iterrows():
-            customer_data = {
-                'account_id': customer['account_id'],
-                'account_name': customer['account_name'],
-                'annual_revenue': float(customer.get('annual_revenue', 0)) if pd.notna(customer.get('annual_revenue')) else None,
-                'health_status': customer.get('health_status'),
-                'region': customer.get('region'),
-                'churn_risk_score': float(customer.get('churn_risk_score', 0)) if pd.notna(customer.get('churn_risk_score')) else None,
-                'subsidiaries': []
-            }
 
-            # Parse and add subsidiary information
-            if customer.get('subsidiaries'):
-                try:
-                    subs = json.loads(customer['subsidiaries']) if isinstance(customer['subsidiaries'], str) else customer['subsidiaries']
-                    customer_data['subsidiaries'] = subs
-                    customer_data['subsidiary_count'] = len(subs)
-                except:
-                    pass
-
-            # Only include customer if they don't have zero-valued metrics
-            if not has_zero_metrics(customer_data):
-                results.append(customer_data)
-        return results
-
-    # Get customers by health status
-    healthy_customers = add_subsidiary_info(
-        customers[customers['health_status'] == 'Healthy'].head(10)
-    )
-    at_risk_customers_health = add_subsidiary_info(
-        customers[customers['health_status'] == 'At-Risk'].head(10)
-    )
-    critical_customers = add_subsidiary_info(
-        customers[customers['health_status'] == 'Critical'].head(10)
-    )
+@app.route('/api/leaderboard/<metric>', methods=['GET'])
+def get_leaderboard(metric: str):
+    """Get the top customers by a metric, optionally within a segment (see config/leaderboards.json)"""
+    customers = data_loader.load_latest('customer_360_metrics')
 
-    # Get customers by region (sorted by revenue - top revenue customers)
-    region_samples = {}
-    for region in customers['region'].unique():
-        region_customers = customers[customers['region'] == region].nlargest(5, 'annual_revenue')
-        region_samples[region] = add_subsidiary_info(region_customers)
-
-    # Customer satisfaction metrics
-    avg_nps = float(customers['nps_score'].mean()) if 'nps_score' in customers.columns else 0
-    avg_csat = float(customers['csat_score'].mean()) if 'csat_score' in customers.columns else 0
-    avg_ces = float(customers['ces_score'].mean()) if 'ces_score' in customers.columns else 0
-
-    # Service metrics
-    avg_support_tickets = float(customers['support_tickets_open'].mean()) if 'support_tickets_open' in customers.columns else 0
-    avg_sla_compliance = float(customers['sla_compliance_rate'].mean()) if 'sla_compliance_rate' in customers.columns else 0
-    total_revenue = float(customers['annual_revenue'].sum())
-    total_customers_count = len(customers)
-
-    summary = {
-        'total_customers': total_customers_count,
-        'total_revenue': total_revenue,
-        'avg_health_score': float(customers['health_score'].mean()),
-        'high_risk_customers': len(customers[customers['churn_risk_level'] == 'HIGH']),
-        'health_distribution': customers['health_status'].value_counts().to_dict(),
-        'risk_distribution': customers['churn_risk_level'].value_counts().to_dict(),
-        'region_distribution': customers['region'].value_counts().to_dict(),
-        'top_revenue_customers': add_subsidiary_info(
-            customers.nlargest(10, 'annual_revenue')
-        ),
-        'at_risk_customers': add_subsidiary_info(
-            customers[customers['churn_risk_level'] == 'HIGH'].head(10)
-        ),
-        'healthy_customers_sample': healthy_customers,
-        'at_risk_customers_sample': at_risk_customers_health,
-        'critical_customers_sample': critical_customers,
-        'region_samples': region_samples,
-        # Customer satisfaction metrics
-        'avg_nps': avg_nps,
-        'avg_csat': avg_csat,
-        'avg_ces': avg_ces,
-        # Service metrics
-        'avg_support_tickets': avg_support_tickets,
-        'avg_sla_compliance': avg_sla_compliance,
-        'avg_revenue_per_customer': float(total_revenue / total_customers_count) if total_customers_count > 0 else 0
-    }
+    if customers.empty:
+        return jsonify([])
 
-    return jsonify(summary)
+    try:
+        k = max(1, min(int(request.args.get('k', 10)), 100))
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+
+    topk = get_topk_index()
+    filters = {segment: request.args.get(segment) for segment in topk.segments}
+
+    try:
+        positions = topk.top(metric, k, **filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(get_dashboard_engine().records(positions))
 
 
 @app.route('/api/segment/recommendations', methods=['GET'])
 def get_segment_recommendations():
     """Get aggregated recommendations for a customer segment"""
-    filter_type = request.args.get('type')  # 'health' or 'region'
-    filter_value = request.args.get('value')  # e.g., 'Healthy', 'East Africa'
+    filter_type = request.args.get('type')  # 'health', 'region', 'opco' or 'subsidiary'
+    filter_value = request.args.get('value')  # e.g., 'Healthy', 'East Africa', 'kenya', 'liquid_tech'
 
     if not filter_type or not filter_value:
         return jsonify({'error': 'Missing type or value parameter'}), 400
 
     customers = data_loader.load_latest('customer_360_metrics')
-    recommendations = data_loader.load_latest('recommendations')
-    alerts = data_loader.load_latest('risk_alerts')
 
     if customers.empty:
         return jsonify({
@@ -646,15 +726,16 @@ def get_segment_recommendations():
             'segment_stats': {}
         })
 
-    # Filter customers by segment
-    if filter_type == 'health':
-        segment_customers = customers[customers['health_status'] == filter_value]
-    elif filter_type == 'region':
-        segment_customers = customers[customers['region'] == filter_value]
-    else:
+    attribute = SEGMENT_TYPES.get(filter_type)
+    if attribute is None:
         return jsonify({'error': 'Invalid filter type'}), 400
 
-    if segment_customers.empty:
+    # Segment statistics come from the rollup cube
+    cube = get_rollup_cube()
+    segment_filter = {attribute: filter_value}
+    view = cube.slice(**segment_filter)
+
+    if view.count == 0:
         return jsonify({
             'segment_info': {'filter_type': filter_type, 'filter_value': filter_value},
             'top_recommendations': [],
@@ -662,71 +743,137 @@ def get_segment_recommendations():
             'segment_stats': {'customer_count': 0}
         })
 
-    segment_account_ids = segment_customers['account_id'].tolist()
-
-    # Get recommendations for this segment
-    segment_recommendations = []
-    if not recommendations.empty:
-        segment_recommendations = recommendations[
-            recommendations['account_id'].isin(segment_account_ids)
-        ]
-
-        # Sort by priority and limit to top 5 most common
-        priority_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
-        segment_recommendations['priority_order'] = segment_recommendations['priority'].map(priority_order)
-        segment_recommendations = segment_recommendations.sort_values('priority_order').head(5)
-
-    # Get critical alerts for this segment
-    segment_alerts = []
-    if not alerts.empty:
-        segment_alerts = alerts[
-            (alerts['account_id'].isin(segment_account_ids)) &
-            (alerts['severity'] == 'HIGH')
-        ]
-        segment_alerts = segment_alerts.head(5)
-
-    # Calculate segment statistics
     segment_stats = {
-        'customer_count': len(segment_customers),
-        'total_revenue': float(segment_customers['annual_revenue'].sum()),
-        'avg_health_score': float(segment_customers['health_score'].mean()),
-        'high_risk_count': len(segment_customers[segment_customers['churn_risk_level'] == 'HIGH']),
-        'at_risk_revenue': float(
-            segment_customers[segment_customers['churn_risk_level'].isin(['HIGH', 'MEDIUM'])]['annual_revenue'].sum()
-        ),
-        'avg_churn_risk': float(segment_customers['churn_risk_score'].mean())
+        'customer_count': view.count,
+        'total_revenue': view.sum('annual_revenue_sum'),
+        'avg_health_score': view.mean('health_score'),
+        'high_risk_count': view.distribution('churn_risk_level').get('HIGH', 0),
+        'at_risk_revenue': cube.slice(churn_risk_level=['HIGH', 'MEDIUM'], **segment_filter).sum('annual_revenue_sum'),
+        'avg_churn_risk': view.mean('churn_risk_score')
     }
 
-    # Convert to dicts
-    rec_results = segment_recommendations.to_dict('records') if not segment_recommendations.empty else []
-    alert_results = segment_alerts.to_dict('records') if not segment_alerts.empty else []
-
-    # Convert timestamps
-    for rec in rec_results:
-        for key, value in rec.items():
-            if pd.api.types.is_datetime64_any_dtype(type(value)):
-                rec[key] = value.isoformat()
-            elif pd.isna(value):
-                rec[key] = None
-
-    for alert in alert_results:
-        for key, value in alert.items():
-            if pd.api.types.is_datetime64_any_dtype(type(value)):
-                alert[key] = value.isoformat()
-            elif pd.isna(value):
-                alert[key] = None
+    # Recommendations and alerts are pre-joined to segments and pre-ranked per snapshot
+    actions = get_segment_action_index()
 
     return jsonify({
         'segment_info': {
             'filter_type': filter_type,
             'filter_value': filter_value
         },
-        'top_recommendations': rec_results,
-        'critical_alerts': alert_results,
+        'top_recommendations': actions.top_recommendations(attribute, filter_value),
+        'critical_alerts': actions.critical_alerts(attribute, filter_value),
         'segment_stats': segment_stats
     })
 
 
+CHAT_MODEL = 'gpt-4o-mini'  # Cost-effective model
+CHAT_COMPLETION_PARAMS = {'model': CHAT_MODEL, 'temperature': 0.7, 'max_tokens': 500}
+CHAT_HISTORY_MESSAGES = 6
+CHAT_RETRIEVAL_K = 5
+
+# Gold tables the chatbot answers from; a new snapshot of any of them invalidates cached answers
+CHAT_SNAPSHOT_TABLES = ['customer_360_metrics', 'risk_alerts', 'recommendations']
+
+# One pooled client per worker process, with timeouts, retries and a circuit breaker
+llm_client = LLMClient.from_env()
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('CHATBOT_CACHE_SIZE', 512)),
+    ttl_seconds=float(os.getenv('CHATBOT_CACHE_TTL_SECONDS', 900))
+)
+
+
+def is_demo_mode() -> bool:
+    """Demo mode answers from canned templates when no OpenAI API key is configured"""
+    return not os.getenv('OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY') == 'sk-demo-key'
+
+
+def chat_tools_enabled() -> bool:
+    """
+    Whether the LLM answers through function calling (default) rather than a
+    system prompt packed with snapshot stats
+    """
+    return os.getenv('CHATBOT_TOOLS', 'true').lower() not in ('0', 'false', 'no')
+
+
+def llm_params() -> dict:
+    """Completion parameters for the LLM, including the tools when enabled"""
+    if not chat_tools_enabled():
+        return dict(CHAT_COMPLETION_PARAMS)
+    tools = get_chat_tools()
+    return dict(CHAT_COMPLETION_PARAMS, tools=tools.schemas, call_tool=tools.call)
+
+
+def trim_history(conversation_history: list) -> list:
+    """Last few well-formed messages of the conversation, as sent to the LLM"""
+    return [
+        {"role": msg['role'], "content": msg['content']}
+        for msg in (conversation_history or [])[-CHAT_HISTORY_MESSAGES:]
+        if isinstance(msg, dict) and 'role' in msg and 'content' in msg
+    ]
+
+
+def chat_cache_key(query: str, conversation_history: list):
+    """Response cache key: normalized query, trimmed history, gold snapshot and answer mode"""
+    snapshot = tuple(data_loader.snapshot_id(table) for table in CHAT_SNAPSHOT_TABLES)
+    return ResponseCache.key(
+        query, trim_history(conversation_history), snapshot, is_demo_mode(), chat_tools_enabled()
+    )
+
+
+def build_chat_messages(query: str, conversation_history: list):
+    """
+    Build the LLM message list for a chat query
+
+    Returns:
+        Tuple of (messages, mentioned customer rows)
+    """
+    # Summary stats, customer lists and system prompt are built once per snapshot
+    chat_context = get_chat_context()
+
+    # Customers named in the question, found in one pass over the query
+    mentioned = get_name_matcher().match(query)
+
+    if is_demo_mode():
+        # Demo answers come from templates; the prompt is only kept for completeness
+        context = chat_context.system_prompt
+    elif chat_tools_enabled():
+        # The model fetches what it needs through tools, so the prompt stays short
+        context = chat_context.tool_system_prompt
+    else:
+        context = grounded_system_prompt(query, mentioned)
+
+    # Build messages for conversation
+    messages = [{"role": "system", "content": context}]
+
+    # Add conversation history (last few messages for context)
+    messages.extend(trim_history(conversation_history))
+
+    # Add current query
+    messages.append({"role": "user", "content": query})
+    return messages, mentioned
+
+
+def grounded_system_prompt(query: str, mentioned: pd.DataFrame) -> str:
+    """Stats system prompt plus the customers mentioned in or relevant to the query"""
+    # Other relevant accounts, retrieved from customer, alert and recommendation text
+    retrieval = get_retrieval_index()
+    retrieval_k = int(os.getenv('CHATBOT_RETRIEVAL_K', CHAT_RETRIEVAL_K))
+    related = [
+        retrieval.describe(account_id)
+        for account_id, _ in retrieval.search(query, retrieval_k, exclude=mentioned['account_id'])
+    ]
+    return get_chat_context().system_prompt_for(mentioned, related)
+
+
+def demo_response_for(query: str, mentioned: pd.DataFrame) -> str:
+    """Demo-mode answer built from the cached chat context"""
+    chat_context = get_chat_context()
+    return generate_demo_response(
+        query, chat_context.summary_stats, chat_context.top_customers, chat_context.at_risk, mentioned
+    )
+
+
 @app.route('/api/chatbot/query', methods=['POST'])
 def chatbot_query():
     """Answer questions about customer data using LLM"""
@@ -738,99 +885,44 @@ def chatbot_query():
         return jsonify({'error': 'Query is required'}), 400
 
     try:
-        # Load customer data for context
-        customers = data_loader.load_latest('customer_360_metrics')
-
-        # Get summary statistics
-        summary_stats = {
-            'total_customers': len(customers),
-            'total_revenue': float(customers['annual_revenue'].sum()),
-            'avg_health_score': float(customers['health_score'].mean()),
-            'health_distribution': customers['health_status'].value_counts().to_dict(),
-            'region_distribution': customers['region'].value_counts().to_dict(),
-            'avg_churn_risk': float(customers['churn_risk_score'].mean()),
-            'high_risk_customers': len(customers[customers['churn_risk_level'] == 'HIGH']),
-            'avg_nps_score': float(customers['nps_score'].mean()),
-            'avg_csat_score': float(customers['csat_score'].mean()),
-            'avg_ces_score': float(customers['ces_score'].mean()),
-            'avg_clv': float(customers['customer_lifetime_value'].mean()),
-            'total_clv': float(customers['customer_lifetime_value'].sum()),
-        }
+        # Repeat questions against the same snapshot are answered from the cache
+        cache_key = chat_cache_key(query, conversation_history)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return jsonify({
+                'response': cached[0],
+                'timestamp': datetime.utcnow().isoformat(),
+                'cached': True,
+                'cache_age_seconds': round(cached[1], 3)
+            })
 
-        # Get top customers by revenue
-        top_customers = customers.nlargest(5, 'annual_revenue')[
-            ['account_name', 'annual_revenue', 'health_status', 'region']
-        ].to_dict('records')
-
-        # Get at-risk customers
-        at_risk = customers[customers['health_status'].isin(['At-Risk', 'Critical'])][
-            ['account_name', 'health_status', 'health_score', 'churn_risk_score', 'region']
-        ].nlargest(5, 'churn_risk_score').to_dict('records')
-
-        # Create context for LLM
-        context = f"""You are a helpful AI assistant for a Customer 360° analytics platform for Cassava Technologies.
-You have access to customer data and can answer questions about customer health, revenue, regions, satisfaction metrics, and recommendations.
-
-Current Data Summary:
-- Total Customers: {summary_stats['total_customers']}
-- Total Annual Revenue: ${summary_stats['total_revenue']:,.2f}
-- Average Health Score: {summary_stats['avg_health_score']:.1f}/100
-- Health Distribution: {summary_stats['health_distribution']}
-- Region Distribution: {summary_stats['region_distribution']}
-- High Risk Customers: {summary_stats['high_risk_customers']}
-- Average Churn Risk: {summary_stats['avg_churn_risk']:.1f}%
-
-Customer Satisfaction Metrics:
-- Average NPS (Net Promoter Score): {summary_stats['avg_nps_score']:.1f}
-- Average CSAT (Customer Satisfaction): {summary_stats['avg_csat_score']:.1f}/100
-- Average CES (Customer Effort Score): {summary_stats['avg_ces_score']:.1f}/10 (measures ease of doing business)
-- Average CLV (Customer Lifetime Value): ${summary_stats['avg_clv']:,.2f}
-- Total CLV: ${summary_stats['total_clv']:,.2f}
-
-Top 5 Customers by Revenue:
-{chr(10).join([f"- {c['account_name']}: ${c['annual_revenue']:,.2f} ({c['health_status']}, {c['region']})" for c in top_customers])}
-
-Top 5 At-Risk Customers:
-{chr(10).join([f"- {c['account_name']}: {c['health_status']} (Health: {c['health_score']:.1f}, Churn Risk: {c['churn_risk_score']:.1f}%, {c['region']})" for c in at_risk])}
-
-Answer the user's question based on this data. Be concise, specific, and actionable.
-Use **bold** for emphasis on key metrics and customer names.
-If asked for recommendations, provide 2-3 specific, data-driven suggestions.
-If the question cannot be answered with the available data, politely explain what information is available."""
-
-        # Initialize OpenAI client (will use OPENAI_API_KEY env variable)
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY', 'sk-demo-key'))
-
-        # Build messages for conversation
-        messages = [{"role": "system", "content": context}]
-
-        # Add conversation history
-        if conversation_history:
-            for msg in conversation_history[-6:]:  # Keep last 6 messages for context
-                if isinstance(msg, dict) and 'role' in msg and 'content' in msg:
-                    messages.append({"role": msg['role'], "content": msg['content']})
-
-        # Add current query
-        messages.append({"role": "user", "content": query})
+        messages, mentioned = build_chat_messages(query, conversation_history)
 
         # Call OpenAI API (or return demo response if no API key)
-        if not os.getenv('OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY') == 'sk-demo-key':
+        fallback = False
+        if is_demo_mode():
             # Demo mode - return intelligent response based on query
-            response_text = generate_demo_response(query, summary_stats, top_customers, at_risk, customers)
+            response_text = demo_response_for(query, mentioned)
         else:
-            # Real API call
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",  # Cost-effective model
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500
-            )
-            response_text = response.choices[0].message.content
-
-        return jsonify({
+            try:
+                response_text = llm_client.complete(messages, **llm_params())
+            except LLMUnavailable as e:
+                # Upstream down or saturated: answer from the demo templates instead
+                logger.warning(f"LLM unavailable, falling back to demo response: {e}")
+                response_text = demo_response_for(query, mentioned)
+                fallback = True
+
+        # Fallback answers are not cached, so the LLM answers again once it recovers
+        if not fallback:
+            response_cache.put(cache_key, response_text)
+        result = {
             'response': response_text,
-            'timestamp': datetime.utcnow().isoformat()
-        })
+            'timestamp': datetime.utcnow().isoformat(),
+            'cached': False
+        }
+        if fallback:
+            result['fallback'] = True
+        return jsonify(result)
 
     except Exception as e:
         import traceback
@@ -842,7 +934,98 @@ If the question cannot be answered with the available data, politely explain wha
         }), 500
 
 
-def generate_demo_response(query, stats, top_customers, at_risk, customers_df=None):
+def sse_event(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def demo_response_chunks(text: str):
+    """Split a demo answer into word-sized deltas, like a streamed completion"""
+    return re.findall(r'\s*\S+', text) or [text]
+
+
+@app.route('/api/chatbot/stream', methods=['POST'])
+def chatbot_stream():
+    """
+    Answer questions about customer data as a Server-Sent Events stream
+
+    Emits `data: {"delta": ...}` events as the answer is generated, then a
+    `done` event with the time to first delta, or an `error` event. Cached
+    answers are sent as a single delta.
+    """
+    data = request.get_json()
+    query = data.get('query', '')
+    conversation_history = data.get('history', [])
+
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+
+    started = time.perf_counter()
+
+    def generate():
+        first_delta_ms = None
+        fallback = False
+        try:
+            cache_key = chat_cache_key(query, conversation_history)
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                deltas = iter([cached[0]])
+            else:
+                messages, mentioned = build_chat_messages(query, conversation_history)
+                if is_demo_mode():
+                    deltas = iter(demo_response_chunks(demo_response_for(query, mentioned)))
+                else:
+                    deltas = llm_client.stream(messages, **llm_params())
+
+            answer = []
+            while True:
+                try:
+                    delta = next(deltas)
+                except StopIteration:
+                    break
+                except LLMUnavailable as e:
+                    if answer:
+                        raise
+                    # Nothing sent yet: stream the demo answer instead
+                    logger.warning(f"LLM unavailable, falling back to demo response: {e}")
+                    deltas = iter(demo_response_chunks(demo_response_for(query, mentioned)))
+                    fallback = True
+                    continue
+                if first_delta_ms is None:
+                    first_delta_ms = (time.perf_counter() - started) * 1000
+                    logger.info(f"Chatbot stream time to first delta: {first_delta_ms:.0f} ms")
+                answer.append(delta)
+                yield sse_event({'delta': delta})
+
+            # Only complete LLM or demo answers are cached
+            if cached is None and not fallback:
+                response_cache.put(cache_key, ''.join(answer))
+
+            done = {
+                'timestamp': datetime.utcnow().isoformat(),
+                'time_to_first_delta_ms': first_delta_ms,
+                'total_ms': (time.perf_counter() - started) * 1000,
+                'cached': cached is not None
+            }
+            if fallback:
+                done['fallback'] = True
+            yield sse_event(done, event='done')
+
+        except Exception as e:
+            import traceback
+            logger.error(f"Chatbot stream error: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            yield sse_event({'error': 'Failed to process query', 'message': str(e)}, event='error')
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def generate_demo_response(query, stats, top_customers, at_risk, mentioned=None):
     """Generate demo responses when OpenAI API key is not available"""
     query_lower = query.lower()
 
@@ -857,13 +1040,10 @@ def generate_demo_response(query, stats, top_customers, at_risk, customers_df=No
         return "You're welcome! Is there anything else I can help you with?"
 
     # Specific customer queries - check if a customer name is mentioned
-    if customers_df is not None:
-        # Extract potential customer names from the query (simplified approach)
-        for _, customer in customers_df.iterrows():
-            customer_name = customer['account_name'].lower()
-            if customer_name in query_lower:
-                # Found a specific customer query
-                return f"""**{customer['account_name']}** ({customer['region']})
+    if mentioned is not None and not mentioned.empty:
+        # Matched by the name matcher; answer for the first customer in snapshot order
+        customer = mentioned.iloc[0]
+        return f"""**{customer['account_name']}** ({customer['region']})
 
 **Health Status**: {customer['health_status']}
 **Health Score**: {customer['health_score']:.1f}/100
@@ -992,21 +1172,10 @@ def get_subsidiary_stats(subsidiary_id: str):
     if customers.empty:
         return jsonify({})
 
-    total_customers = 0
-    total_revenue = 0
-    total_tickets = 0
-
-    for _, customer in customers.iterrows():
-        if customer.get('subsidiaries'):
-            try:
-                subs = json.loads(customer['subsidiaries'])
-                for sub in subs:
-                    if sub['subsidiary_id'] == subsidiary_id:
-                        total_customers += 1
-                        total_revenue += sub.get('annual_revenue', 0)
-                        total_tickets += sub.get('tickets_count', 0)
-            except:
-                continue
+    view = get_rollup_cube().slice(subsidiary=subsidiary_id)
+    total_customers = view.count
+    total_revenue = view.sum('subsidiary_revenue_sum')
+    total_tickets = int(view.sum('subsidiary_tickets_sum'))
 
     return jsonify({
         'subsidiary_id': subsidiary_id,
@@ -1038,16 +1207,15 @@ def get_opco_stats(opco_id: str):
     if customers.empty:
         return jsonify({})
 
-    # Filter customers by country
-    opco_customers = customers[customers['country'] == opco_id]
-
-    total_customers = len(opco_customers)
-    total_revenue = opco_customers['annual_revenue'].sum() if 'annual_revenue' in opco_customers else 0
+    # Served from the rollup cube sliced by country
+    view = get_rollup_cube().slice(country=opco_id)
+    total_customers = view.count
+    total_revenue = view.sum('annual_revenue_sum')
 
     return jsonify({
         'opco_id': opco_id,
         'total_customers': int(total_customers),
-        'total_revenue': float(total_revenue) if pd.notna(total_revenue) else 0,
+        'total_revenue': float(total_revenue),
         'avg_revenue_per_customer': float(total_revenue / total_customers) if total_customers > 0 else 0
     })
 
@@ -1086,111 +1254,9 @@ def get_opco_dashboard(opco_id: str):
     if customers.empty:
         return jsonify({})
 
-    # Filter customers by country
-    opco_customers = customers[customers['country'] == opco_id]
-
-    if opco_customers.empty:
-        return jsonify({
-            'opco_id': opco_id,
-            'total_customers': 0,
-            'total_revenue': 0,
-            'avg_health_score': 0,
-            'high_risk_customers': 0,
-            'health_distribution': {},
-            'risk_distribution': {},
-            'region_distribution': {},
-            'top_revenue_customers': [],
-            'at_risk_customers_sample': [],
-            'healthy_customers_sample': [],
-            'critical_customers_sample': [],
-            'region_samples': {},
-            'avg_nps': 0,
-            'avg_csat': 0,
-            'avg_ces': 0,
-            'avg_support_tickets': 0,
-            'avg_sla_compliance': 0,
-            'avg_revenue_per_customer': 0
-        })
-
-    # Helper function to add subsidiary info to customer records
-    def add_subsidiary_info(customer_df):
-        results = []
-        for _, customer in customer_df.iterrows():
-            customer_data = {
-                'account_id': customer['account_id'],
-                'account_name': customer['account_name'],
-                'annual_revenue': float(customer.get('annual_revenue', 0)) if pd.notna(customer.get('annual_revenue')) else None,
-                'health_status': customer.get('health_status'),
-                'region': customer.get('region'),
-                'churn_risk_score': float(customer.get('churn_risk_score', 0)) if pd.notna(customer.get('churn_risk_score')) else None,
-                'subsidiaries': []
-            }
-
-            # Parse and add subsidiary information
-            if customer.get('subsidiaries'):
-                try:
-                    subs = json.loads(customer['subsidiaries']) if isinstance(customer['subsidiaries'], str) else customer['subsidiaries']
-                    customer_data['subsidiaries'] = subs
-                    customer_data['subsidiary_count'] = len(subs)
-                except:
-                    pass
-
-            results.append(customer_data)
-        return results
-
-    # Get customers by health status
-    healthy_customers = add_subsidiary_info(
-        opco_customers[opco_customers['health_status'] == 'Healthy'].head(10)
-    )
-    at_risk_customers_health = add_subsidiary_info(
-        opco_customers[opco_customers['health_status'] == 'At-Risk'].head(10)
-    )
-    critical_customers = add_subsidiary_info(
-        opco_customers[opco_customers['health_status'] == 'Critical'].head(10)
-    )
-
-    # Get customers by region (sorted by revenue - top revenue customers)
-    region_samples = {}
-    for region in opco_customers['region'].unique():
-        region_customers = opco_customers[opco_customers['region'] == region].nlargest(5, 'annual_revenue')
-        region_samples[region] = add_subsidiary_info(region_customers)
-
-    # Customer satisfaction metrics
-    avg_nps = float(opco_customers['nps_score'].mean()) if 'nps_score' in opco_customers.columns else 0
-    avg_csat = float(opco_customers['csat_score'].mean()) if 'csat_score' in opco_customers.columns else 0
-    avg_ces = float(opco_customers['ces_score'].mean()) if 'ces_score' in opco_customers.columns else 0
-
-    # Service metrics
-    avg_support_tickets = float(opco_customers['support_tickets_open'].mean()) if 'support_tickets_open' in opco_customers.columns else 0
-    avg_sla_compliance = float(opco_customers['sla_compliance_rate'].mean()) if 'sla_compliance_rate' in opco_customers.columns else 0
-    total_revenue = float(opco_customers['annual_revenue'].sum())
-    total_customers_count = len(opco_customers)
-
-    summary = {
-        'opco_id': opco_id,
-        'total_customers': total_customers_count,
-        'total_revenue': total_revenue,
-        'avg_health_score': float(opco_customers['health_score'].mean()),
-        'high_risk_customers': len(opco_customers[opco_customers['churn_risk_level'] == 'HIGH']),
-        'health_distribution': opco_customers['health_status'].value_counts().to_dict(),
-        'risk_distribution': opco_customers['churn_risk_level'].value_counts().to_dict(),
-        'region_distribution': opco_customers['region'].value_counts().to_dict(),
-        'top_revenue_customers': add_subsidiary_info(
-            opco_customers.nlargest(10, 'annual_revenue')
-        ),
-        'at_risk_customers_sample': at_risk_customers_health,
-        'healthy_customers_sample': healthy_customers,
-        'critical_customers_sample': critical_customers,
-        'region_samples': region_samples,
-        # Customer satisfaction metrics
-        'avg_nps': avg_nps,
-        'avg_csat': avg_csat,
-        'avg_ces': avg_ces,
-        # Service metrics
-        'avg_support_tickets': avg_support_tickets,
-        'avg_sla_compliance': avg_sla_compliance,
-        'avg_revenue_per_customer': float(total_revenue / total_customers_count) if total_customers_count > 0 else 0
-    }
+    dashboard = get_dashboard_engine().dashboard(Segment(country=opco_id), exclude_zero_revenue=False)
+    summary = {'opco_id': opco_id}
+    summary.update({key: value for key, value in dashboard.items() if key != 'at_risk_customers'})
 
     return jsonify(summary)
 
@@ -1203,128 +1269,17 @@ def get_subsidiary_dashboard(subsidiary_id: str):
     if customers.empty:
         return jsonify({})
 
-    # Filter by OpCo if provided
+    # Filter by OpCo (its data region) if provided
+    region_filter = None
     opco_filter = request.args.get('opco')
     if opco_filter:
-        # Get OpCo configuration to find the data_region
-        config_path = Path(__file__).parent.parent / 'config' / 'opcos.json'
-        with open(config_path, 'r') as f:
-            opco_config = json.load(f)
-
-        # Find the matching OpCo
-        opco = next((o for o in opco_config['opcos'] if o['id'] == opco_filter), None)
-        if opco:
-            # Filter customers by exact region match
-            data_region = opco.get('data_region', opco['region'])
-            customers = customers[customers['region'] == data_region]
-        else:
-            # If OpCo not found, return empty results
-            customers = customers[customers['region'] == 'NONEXISTENT']
+        region_filter = resolve_opco_region(opco_filter)
 
-    # Filter customers who have relationship with this subsidiary
-    subsidiary_customers = []
-    subsidiary_revenues = {}  # Map of account_id to subsidiary-specific revenue
-
-    for _, customer in customers.iterrows():
-        if customer.get('subsidiaries'):
-            try:
-                subs = json.loads(customer['subsidiaries'])
-                for sub in subs:
-                    if sub['subsidiary_id'] == subsidiary_id:
-                        subsidiary_customers.append(customer)
-                        subsidiary_revenues[customer['account_id']] = sub.get('annual_revenue', 0)
-                        break  # Found this subsidiary, move to next customer
-            except:
-                continue
-
-    if not subsidiary_customers:
-        return jsonify({
-            'subsidiary_id': subsidiary_id,
-            'total_customers': 0,
-            'total_revenue': 0,
-            'avg_health_score': 0,
-            'high_risk_customers': 0,
-            'health_distribution': {},
-            'risk_distribution': {},
-            'region_distribution': {},
-            'top_revenue_customers': [],
-            'at_risk_customers': [],
-            'avg_nps': 0,
-            'avg_csat': 0,
-            'avg_ces': 0
-        })
+    segment = Segment(region=region_filter, subsidiary=subsidiary_id)
+    summary = {'subsidiary_id': subsidiary_id}
+    summary.update(get_dashboard_engine().dashboard(segment))
 
-    # Convert to DataFrame for easier aggregation
-    sub_df = pd.DataFrame(subsidiary_customers)
-
-    # Calculate aggregate metrics
-    total_revenue = sum(subsidiary_revenues.values())
-    avg_health_score = float(sub_df['health_score'].mean())
-    high_risk_customers = len(sub_df[sub_df['churn_risk_level'] == 'HIGH'])
-
-    # Distributions
-    health_distribution = sub_df['health_status'].value_counts().to_dict()
-    risk_distribution = sub_df['churn_risk_level'].value_counts().to_dict()
-    region_distribution = sub_df['region'].value_counts().to_dict()
-
-    # Top revenue customers (by subsidiary-specific revenue)
-    top_customers = []
-    for _, customer in sub_df.iterrows():
-        customer_data = {
-            'account_id': customer['account_id'],
-            'account_name': customer['account_name'],
-            'annual_revenue': subsidiary_revenues.get(customer['account_id'], 0),
-            'health_status': customer['health_status'],
-            'region': customer['region']
-        }
-        # Only include customer if they don't have zero-valued metrics
-        if not has_zero_metrics(customer_data):
-            top_customers.append(customer_data)
-    top_customers = sorted(top_customers, key=lambda x: x.get('annual_revenue', 0), reverse=True)[:10]
-
-    # At-risk customers
-    at_risk_df = sub_df[sub_df['churn_risk_level'] == 'HIGH']
-    at_risk_customers = []
-    for _, customer in at_risk_df.iterrows():
-        customer_data = {
-            'account_id': customer['account_id'],
-            'account_name': customer['account_name'],
-            'churn_risk_score': float(customer['churn_risk_score']),
-            'annual_revenue': subsidiary_revenues.get(customer['account_id'], 0),
-            'health_status': customer['health_status']
-        }
-        # Only include customer if they don't have zero-valued metrics
-        if not has_zero_metrics(customer_data):
-            at_risk_customers.append(customer_data)
-    at_risk_customers = sorted(at_risk_customers, key=lambda x: x.get('churn_risk_score', 0), reverse=True)[:10]
-
-    # Customer satisfaction metrics
-    avg_nps = float(sub_df['nps_score'].mean()) if 'nps_score' in sub_df.columns else 0
-    avg_csat = float(sub_df['csat_score'].mean()) if 'csat_score' in sub_df.columns else 0
-    avg_ces = float(sub_df['ces_score'].mean()) if 'ces_score' in sub_df.columns else 0
-
-    # Service metrics
-    avg_support_tickets = float(sub_df['support_tickets_open'].mean()) if 'support_tickets_open' in sub_df.columns else 0
-    avg_sla_compliance = float(sub_df['sla_compliance_rate'].mean()) if 'sla_compliance_rate' in sub_df.columns else 0
-
-    return jsonify({
-        'subsidiary_id': subsidiary_id,
-        'total_customers': len(sub_df),
-        'total_revenue': float(total_revenue),
-        'avg_health_score': avg_health_score,
-        'high_risk_customers': high_risk_customers,
-        'health_distribution': health_distribution,
-        'risk_distribution': risk_distribution,
-        'region_distribution': region_distribution,
-        'top_revenue_customers': top_customers,
-        'at_risk_customers': at_risk_customers,
-        'avg_nps': avg_nps,
-        'avg_csat': avg_csat,
-        'avg_ces': avg_ces,
-        'avg_support_tickets': avg_support_tickets,
-        'avg_sla_compliance': avg_sla_compliance,
-        'avg_revenue_per_customer': float(total_revenue / len(sub_df)) if len(sub_df) > 0 else 0
-    })
+    return jsonify(summary)
 
 
 if __name__ == '__main__':
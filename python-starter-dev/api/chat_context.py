@@ -0,0 +1,209 @@
+"""
+Chatbot Context
+Summary statistics, customer lists and the rendered LLM system prompt for one
+gold snapshot, built once and reused across chat messages. The prompt is
+assembled from sections under a token budget so new sections can be added
+without growing the prompt unboundedly.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 2000
+
+# Rough size of a token for English text and numbers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a prompt fragment"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class ContextSection:
+    """
+    Block of the system prompt
+
+    title and items are rendered one per line. Required sections are always
+    included; optional sections are added in order while they fit the budget,
+    and a section that does not fit whole keeps as many leading items as fit.
+    """
+    title: str
+    items: List[str] = field(default_factory=list)
+    required: bool = False
+
+    def render(self, items: Optional[List[str]] = None) -> str:
+        items = self.items if items is None else items
+        return '\n'.join([self.title] + items)
+
+
+def render_sections(sections: List[ContextSection], token_budget: int) -> str:
+    """
+    Join sections with blank lines, keeping the result within a token budget
+
+    Args:
+        sections: Sections in prompt order
+        token_budget: Maximum estimated tokens for the whole prompt
+
+    Returns:
+        Rendered prompt
+    """
+    separator_tokens = estimate_tokens('\n\n')
+    remaining = token_budget - sum(estimate_tokens(s.render()) + separator_tokens for s in sections if s.required)
+
+    rendered: Dict[int, str] = {i: s.render() for i, s in enumerate(sections) if s.required}
+    for i, section in enumerate(sections):
+        if section.required:
+            continue
+        cost = estimate_tokens(section.render()) + separator_tokens
+        if cost <= remaining:
+            rendered[i] = section.render()
+            remaining -= cost
+            continue
+
+        # Partial section: title plus the leading items that still fit
+        kept: List[str] = []
+        cost = estimate_tokens(section.title) + separator_tokens
+        for item in section.items:
+            item_cost = estimate_tokens(item) + 1
+            if cost + item_cost > remaining:
+                break
+            kept.append(item)
+            cost += item_cost
+        if kept:
+            rendered[i] = section.render(kept)
+            remaining -= cost
+        logger.info(f"Chat context section '{section.title}' trimmed to {len(kept)}/{len(section.items)} items")
+
+    return '\n\n'.join(rendered[i] for i in sorted(rendered))
+
+
+class ChatContext:
+    """Chatbot grounding data for one customer_360_metrics snapshot"""
+
+    def __init__(self, customers: pd.DataFrame, token_budget: int = DEFAULT_TOKEN_BUDGET):
+        self.customers = customers
+        self.token_budget = token_budget
+
+        self.summary_stats: Dict[str, Any] = {
+            'total_customers': len(customers),
+            'total_revenue': float(customers['annual_revenue'].sum()),
+            'avg_health_score': float(customers['health_score'].mean()),
+            'health_distribution': customers['health_status'].value_counts().to_dict(),
+            'region_distribution': customers['region'].value_counts().to_dict(),
+            'avg_churn_risk': float(customers['churn_risk_score'].mean()),
+            'high_risk_customers': int((customers['churn_risk_level'] == 'HIGH').sum()),
+            'avg_nps_score': float(customers['nps_score'].mean()),
+            'avg_csat_score': float(customers['csat_score'].mean()),
+            'avg_ces_score': float(customers['ces_score'].mean()),
+            'avg_clv': float(customers['customer_lifetime_value'].mean()),
+            'total_clv': float(customers['customer_lifetime_value'].sum()),
+        }
+
+        # Top customers by revenue
+        self.top_customers: List[Dict[str, Any]] = customers.nlargest(5, 'annual_revenue')[
+            ['account_name', 'annual_revenue', 'health_status', 'region']
+        ].to_dict('records')
+
+        # At-risk customers
+        self.at_risk: List[Dict[str, Any]] = customers[customers['health_status'].isin(['At-Risk', 'Critical'])][
+            ['account_name', 'health_status', 'health_score', 'churn_risk_score', 'region']
+        ].nlargest(5, 'churn_risk_score').to_dict('records')
+
+        self.sections = self._sections()
+        self.system_prompt = render_sections(self.sections, token_budget)
+        self.tool_system_prompt = render_sections([
+            self.sections[0],
+            ContextSection('Data Access:', [
+                f"- The current snapshot has {len(customers)} customers with "
+                f"${self.summary_stats['total_revenue']:,.2f} total annual revenue.",
+                '- Use the provided tools to look up customers, segment statistics, top customers and '
+                'account alerts; do not guess numbers the tools can provide.',
+            ], required=True),
+            self.sections[-1],
+        ], token_budget)
+        logger.info(
+            f"Built chat context: ~{estimate_tokens(self.system_prompt)} tokens "
+            f"(budget {token_budget}) from {len(customers)} customers"
+        )
+
+    def system_prompt_for(self, mentioned: pd.DataFrame, related: Optional[List[str]] = None) -> str:
+        """
+        System prompt grounded on the customers relevant to a message
+
+        Args:
+            mentioned: Customer rows named in the message
+            related: Prompt lines for customers retrieved as relevant to the message
+
+        The extra sections come first among the optional sections (mentioned,
+        then related), so they are kept ahead of the general lists when the
+        token budget is tight.
+        """
+        extra = []
+        if not mentioned.empty:
+            extra.append(ContextSection('Customers Mentioned in the Question:', [
+                f"- {c['account_name']} ({c['account_id']}, {c['region']}): {c['health_status']}, "
+                f"Health {c['health_score']:.1f}/100, Churn Risk {c['churn_risk_score']:.1f}% "
+                f"({c['churn_risk_level']}), Revenue ${c['annual_revenue']:,.2f}, "
+                f"CLV ${c['customer_lifetime_value']:,.2f}, NPS {c['nps_score']:.0f}, "
+                f"CSAT {c['csat_score']:.1f}, CES {c['ces_score']:.1f}"
+                for c in mentioned.to_dict('records')
+            ]))
+        if related:
+            extra.append(ContextSection('Other Customers Relevant to the Question:', related))
+        if not extra:
+            return self.system_prompt
+        return render_sections(self.sections[:1] + extra + self.sections[1:], self.token_budget)
+
+    def _sections(self) -> List[ContextSection]:
+        stats = self.summary_stats
+        return [
+            ContextSection(
+                'You are a helpful AI assistant for a Customer 360° analytics platform for Cassava Technologies.',
+                ['You have access to customer data and can answer questions about customer health, revenue, '
+                 'regions, satisfaction metrics, and recommendations.'],
+                required=True,
+            ),
+            ContextSection('Current Data Summary:', [
+                f"- Total Customers: {stats['total_customers']}",
+                f"- Total Annual Revenue: ${stats['total_revenue']:,.2f}",
+                f"- Average Health Score: {stats['avg_health_score']:.1f}/100",
+                f"- Health Distribution: {stats['health_distribution']}",
+                f"- Region Distribution: {stats['region_distribution']}",
+                f"- High Risk Customers: {stats['high_risk_customers']}",
+                f"- Average Churn Risk: {stats['avg_churn_risk']:.1f}%",
+            ]),
+            ContextSection('Customer Satisfaction Metrics:', [
+                f"- Average NPS (Net Promoter Score): {stats['avg_nps_score']:.1f}",
+                f"- Average CSAT (Customer Satisfaction): {stats['avg_csat_score']:.1f}/100",
+                f"- Average CES (Customer Effort Score): {stats['avg_ces_score']:.1f}/10 (measures ease of doing business)",
+                f"- Average CLV (Customer Lifetime Value): ${stats['avg_clv']:,.2f}",
+                f"- Total CLV: ${stats['total_clv']:,.2f}",
+            ]),
+            ContextSection('Top 5 Customers by Revenue:', [
+                f"- {c['account_name']}: ${c['annual_revenue']:,.2f} ({c['health_status']}, {c['region']})"
+                for c in self.top_customers
+            ]),
+            ContextSection('Top 5 At-Risk Customers:', [
+                f"- {c['account_name']}: {c['health_status']} (Health: {c['health_score']:.1f}, "
+                f"Churn Risk: {c['churn_risk_score']:.1f}%, {c['region']})"
+                for c in self.at_risk
+            ]),
+            ContextSection(
+                "Answer the user's question based on this data. Be concise, specific, and actionable.",
+                [
+                    'Use **bold** for emphasis on key metrics and customer names.',
+                    'If asked for recommendations, provide 2-3 specific, data-driven suggestions.',
+                    'If the question cannot be answered with the available data, politely explain what '
+                    'information is available.',
+                ],
+                required=True,
+            ),
+        ]
@@ -0,0 +1,243 @@
+"""
+Chatbot Tools
+Typed functions over the in-memory gold snapshot that the LLM calls through
+function calling (customer lookup, segment stats, top-K and account alerts),
+so answers can cover any customer or segment without growing the prompt
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from dashboard_engine import summary_fields
+from name_matcher import CustomerNameMatcher
+from rollup_cube import RollupCube, parse_subsidiaries
+from topk_index import SNAPSHOT_ORDER, SUBSIDIARY_REVENUE, TopKIndex
+
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS = 20
+
+# Customer fields returned by lookups
+CUSTOMER_FIELDS = [
+    'account_id', 'account_name', 'region', 'country', 'health_status', 'health_score',
+    'churn_risk_level', 'churn_risk_score', 'annual_revenue', 'customer_lifetime_value',
+    'monthly_recurring_revenue', 'nps_score', 'csat_score', 'ces_score', 'open_tickets',
+    'overdue_amount', 'pipeline_value', 'days_to_renewal', 'retention_probability',
+]
+
+_SEGMENT_PROPERTIES = {
+    'region': {'type': 'string', 'description': "Data region, e.g. 'West Africa'"},
+    'opco': {'type': 'string', 'description': "Operating company (country) id, e.g. 'kenya'"},
+    'subsidiary': {'type': 'string', 'description': "Subsidiary id, e.g. 'liquid_tech'"},
+    'health_status': {'type': 'string', 'enum': ['Healthy', 'At-Risk', 'Critical']},
+    'churn_risk_level': {'type': 'string', 'enum': ['LOW', 'MEDIUM', 'HIGH']},
+}
+
+
+def _json_value(value: Any) -> Any:
+    """Plain JSON value for a snapshot cell"""
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if np.isnan(value) else round(float(value), 2)
+    if isinstance(value, (np.bool_,)):
+        return bool(value)
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if value is None or (not isinstance(value, (str, list, dict)) and pd.isna(value)):
+        return None
+    return value
+
+
+class ChatTools:
+    """Function-calling tools over one gold snapshot"""
+
+    def __init__(self, customers: pd.DataFrame, alerts: pd.DataFrame, cube: RollupCube,
+                 topk: TopKIndex, matcher: CustomerNameMatcher):
+        self.customers = customers.reset_index(drop=True)
+        self.cube = cube
+        self.topk = topk
+        self.matcher = matcher
+        self._positions = {account_id: i for i, account_id in enumerate(self.customers['account_id'])}
+
+        self.alerts = alerts.reset_index(drop=True)
+        self._alert_positions: Dict[str, np.ndarray] = (
+            self.alerts.groupby('account_id', sort=False).indices if not alerts.empty else {}
+        )
+
+        self.functions: Dict[str, Callable[..., Dict[str, Any]]] = {
+            'lookup_customer': self.lookup_customer,
+            'segment_stats': self.segment_stats,
+            'top_customers': self.top_customers,
+            'account_alerts': self.account_alerts,
+        }
+
+    @property
+    def schemas(self) -> List[Dict[str, Any]]:
+        """OpenAI function-calling tool definitions"""
+        metrics = [m for m in self.topk.orders if m != SNAPSHOT_ORDER] + [SUBSIDIARY_REVENUE]
+        return [
+            {
+                'type': 'function',
+                'function': {
+                    'name': 'lookup_customer',
+                    'description': 'Find customers by account id or (part of) their name and return their key metrics.',
+                    'parameters': {
+                        'type': 'object',
+                        'properties': {
+                            'query': {'type': 'string', 'description': 'Account id or customer name'},
+                        },
+                        'required': ['query'],
+                    },
+                },
+            },
+            {
+                'type': 'function',
+                'function': {
+                    'name': 'segment_stats',
+                    'description': 'Customer count, revenue, health/risk distributions and average '
+                                   'satisfaction metrics for a customer segment (all customers if no filter).',
+                    'parameters': {'type': 'object', 'properties': dict(_SEGMENT_PROPERTIES)},
+                },
+            },
+            {
+                'type': 'function',
+                'function': {
+                    'name': 'top_customers',
+                    'description': 'Top customers in a segment ranked by a metric. health_score ranks '
+                                   'lowest first; the other metrics rank highest first. subsidiary_revenue '
+                                   'requires a subsidiary.',
+                    'parameters': {
+                        'type': 'object',
+                        'properties': {
+                            'metric': {'type': 'string', 'enum': metrics},
+                            'k': {'type': 'integer', 'minimum': 1, 'maximum': MAX_RESULTS},
+                            **_SEGMENT_PROPERTIES,
+                        },
+                        'required': ['metric'],
+                    },
+                },
+            },
+            {
+                'type': 'function',
+                'function': {
+                    'name': 'account_alerts',
+                    'description': 'Risk alerts for one customer account.',
+                    'parameters': {
+                        'type': 'object',
+                        'properties': {
+                            'account_id': {'type': 'string'},
+                            'severity': {'type': 'string', 'enum': ['HIGH', 'MEDIUM', 'LOW']},
+                            'limit': {'type': 'integer', 'minimum': 1, 'maximum': MAX_RESULTS},
+                        },
+                        'required': ['account_id'],
+                    },
+                },
+            },
+        ]
+
+    def call(self, name: str, arguments: str) -> Dict[str, Any]:
+        """
+        Run a tool call from the model
+
+        Args:
+            name: Tool name
+            arguments: JSON-encoded arguments
+
+        Returns:
+            JSON-ready result; invalid calls return {'error': ...} for the model to read
+        """
+        function = self.functions.get(name)
+        if function is None:
+            return {'error': f'Unknown tool: {name}'}
+        try:
+            kwargs = json.loads(arguments or '{}')
+            if not isinstance(kwargs, dict):
+                raise ValueError('arguments must be a JSON object')
+            return function(**kwargs)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid chatbot tool call {name}({arguments}): {e}")
+            return {'error': str(e)}
+
+    # ------------------------------------------------------------------
+    # Tools
+    # ------------------------------------------------------------------
+
+    def _customer(self, position: int) -> Dict[str, Any]:
+        row = self.customers.iloc[position]
+        record = {field: _json_value(row[field]) for field in CUSTOMER_FIELDS if field in row.index}
+        record['subsidiaries'] = [
+            s.get('subsidiary_id') for s in parse_subsidiaries(row.get('subsidiaries'))
+        ]
+        return record
+
+    def lookup_customer(self, query: str) -> Dict[str, Any]:
+        """Customers matching an account id, a full name in the query, or a name fragment"""
+        query = str(query).strip()
+        if query in self._positions:
+            positions = [self._positions[query]]
+        else:
+            positions = [self._positions[a] for a in self.matcher.match_ids(query)]
+            if not positions and query:
+                contains = self.customers['account_name'].str.contains(query, case=False, regex=False)
+                positions = np.flatnonzero(contains.to_numpy()).tolist()
+        return {
+            'match_count': len(positions),
+            'customers': [self._customer(p) for p in positions[:5]],
+        }
+
+    def segment_stats(self, region: Optional[str] = None, opco: Optional[str] = None,
+                      subsidiary: Optional[str] = None, health_status: Optional[str] = None,
+                      churn_risk_level: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregate stats for a segment, served from the rollup cube"""
+        view = self.cube.slice(subsidiary=subsidiary, country=opco, region=region,
+                               health_status=health_status, churn_risk_level=churn_risk_level)
+        if view.count == 0:
+            return {'total_customers': 0}
+        total_revenue = view.sum('subsidiary_revenue_sum') if subsidiary else None
+        stats = summary_fields(view, total_revenue=total_revenue)
+        return {key: _json_value(value) if not isinstance(value, dict) else value for key, value in stats.items()}
+
+    def top_customers(self, metric: str, k: int = 5, region: Optional[str] = None, opco: Optional[str] = None,
+                      subsidiary: Optional[str] = None, health_status: Optional[str] = None,
+                      churn_risk_level: Optional[str] = None) -> Dict[str, Any]:
+        """Top-k customers of a segment by a leaderboard metric"""
+        k = max(1, min(int(k), MAX_RESULTS))
+        positions = self.topk.top(metric, k, region=region, country=opco, subsidiary=subsidiary,
+                                  health_status=health_status, churn_risk_level=churn_risk_level)
+        customers = []
+        for p in positions:
+            record = {
+                'account_id': self.customers.at[p, 'account_id'],
+                'account_name': self.customers.at[p, 'account_name'],
+                'region': self.customers.at[p, 'region'],
+                'health_status': self.customers.at[p, 'health_status'],
+            }
+            if metric == SUBSIDIARY_REVENUE:
+                record[metric] = _json_value(self.topk.subsidiary_revenue(subsidiary)[p])
+            else:
+                record[metric] = _json_value(self.customers.at[p, metric])
+            customers.append(record)
+        return {'metric': metric, 'customers': customers}
+
+    def account_alerts(self, account_id: str, severity: Optional[str] = None, limit: int = 5) -> Dict[str, Any]:
+        """Risk alerts for one account, in gold table order"""
+        if account_id not in self._positions:
+            return {'error': f'Unknown account_id: {account_id}'}
+        limit = max(1, min(int(limit), MAX_RESULTS))
+        alerts = self.alerts.iloc[self._alert_positions.get(account_id, [])]
+        if severity:
+            alerts = alerts[alerts['severity'] == severity]
+        columns = [c for c in ['alert_id', 'alert_type', 'severity', 'message', 'recommendation'] if c in alerts.columns]
+        return {
+            'account_id': account_id,
+            'alert_count': len(alerts),
+            'alerts': [
+                {column: _json_value(value) for column, value in record.items()}
+                for record in alerts[columns].head(limit).to_dict('records')
+            ],
+        }
@@ -0,0 +1,246 @@
+"""
+Segment Dashboard Engine
+Computes the executive, OpCo and subsidiary dashboards from one code path,
+memoized per (segment, snapshot)
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from rollup_cube import CubeSlice, RollupCube, parse_subsidiaries
+from topk_index import SNAPSHOT_ORDER, SUBSIDIARY_REVENUE, TopKIndex
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SIZE = 10
+REGION_SAMPLE_SIZE = 5
+HEALTH_STATUSES = [
+    ('Healthy', 'healthy_customers_sample'),
+    ('At-Risk', 'at_risk_customers_sample'),
+    ('Critical', 'critical_customers_sample'),
+]
+
+EMPTY_DASHBOARD = {
+    'total_customers': 0,
+    'total_revenue': 0,
+    'avg_health_score': 0,
+    'high_risk_customers': 0,
+    'health_distribution': {},
+    'risk_distribution': {},
+    'region_distribution': {},
+    'top_revenue_customers': [],
+    'at_risk_customers': [],
+    'healthy_customers_sample': [],
+    'at_risk_customers_sample': [],
+    'critical_customers_sample': [],
+    'region_samples': {},
+    'avg_nps': 0,
+    'avg_csat': 0,
+    'avg_ces': 0,
+    'avg_support_tickets': 0,
+    'avg_sla_compliance': 0,
+    'avg_revenue_per_customer': 0
+}
+
+EMPTY_SUBSIDIARY_DASHBOARD = {
+    'total_customers': 0,
+    'total_revenue': 0,
+    'avg_health_score': 0,
+    'high_risk_customers': 0,
+    'health_distribution': {},
+    'risk_distribution': {},
+    'region_distribution': {},
+    'top_revenue_customers': [],
+    'at_risk_customers': [],
+    'avg_nps': 0,
+    'avg_csat': 0,
+    'avg_ces': 0
+}
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    Customer segment predicate; unset fields do not filter
+
+    country is the OpCo id assigned to each customer, region the data region,
+    and subsidiary restricts to customers with a relationship to that subsidiary.
+    """
+    country: Optional[str] = None
+    region: Optional[str] = None
+    subsidiary: Optional[str] = None
+
+
+def summary_fields(view: CubeSlice, total_revenue: Optional[float] = None) -> Dict[str, Any]:
+    """Aggregate dashboard fields served from a rollup cube slice"""
+    total_customers = view.count
+    if total_revenue is None:
+        total_revenue = view.sum('annual_revenue_sum')
+
+    return {
+        'total_customers': total_customers,
+        'total_revenue': float(total_revenue),
+        'avg_health_score': view.mean('health_score'),
+        'high_risk_customers': view.distribution('churn_risk_level').get('HIGH', 0),
+        'health_distribution': view.distribution('health_status'),
+        'risk_distribution': view.distribution('churn_risk_level'),
+        'region_distribution': view.distribution('region'),
+        # Customer satisfaction metrics
+        'avg_nps': view.mean('nps_score'),
+        'avg_csat': view.mean('csat_score'),
+        'avg_ces': view.mean('ces_score'),
+        # Service metrics
+        'avg_support_tickets': view.mean('support_tickets_open'),
+        'avg_sla_compliance': view.mean('sla_compliance_rate'),
+        'avg_revenue_per_customer': float(total_revenue / total_customers) if total_customers > 0 else 0
+    }
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    return float(value) if pd.notna(value) else None
+
+
+class SegmentDashboardEngine:
+    """
+    Dashboard builder over one customer_360_metrics snapshot
+
+    Aggregates come from the rollup cube and customer lists are slices of the
+    top-K leaderboard index. Results are memoized per non-empty segment, and
+    the engine itself is rebuilt only when the snapshot changes.
+    """
+
+    def __init__(self, customers: pd.DataFrame, cube: RollupCube, topk: TopKIndex):
+        self.customers = customers.reset_index(drop=True)
+        self.cube = cube
+        self.topk = topk
+        self._revenue = self.customers['annual_revenue'].to_numpy(dtype=float)
+        self._records: Dict[int, Dict[str, Any]] = {}
+        self._memo: Dict[Tuple[Segment, bool], Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------
+    # Customer records
+    # ------------------------------------------------------------------
+
+    def _record(self, position: int) -> Dict[str, Any]:
+        """Dashboard customer record with parsed subsidiaries (built once per row)"""
+        record = self._records.get(position)
+        if record is None:
+            customer = self.customers.iloc[position]
+            record = {
+                'account_id': customer['account_id'],
+                'account_name': customer['account_name'],
+                'annual_revenue': _optional_float(customer.get('annual_revenue')),
+                'health_status': customer.get('health_status'),
+                'region': customer.get('region'),
+                'churn_risk_score': _optional_float(customer.get('churn_risk_score')),
+                'subsidiaries': []
+            }
+            if customer.get('subsidiaries'):
+                subs = parse_subsidiaries(customer['subsidiaries'])
+                if subs:
+                    record['subsidiaries'] = subs
+                    record['subsidiary_count'] = len(subs)
+            self._records[position] = record
+        return record
+
+    def records(self, positions: np.ndarray, exclude_zero_revenue: bool = False) -> List[Dict[str, Any]]:
+        """Dashboard customer records for row positions, e.g. a top-K index slice"""
+        if exclude_zero_revenue:
+            positions = positions[self._revenue[positions] != 0]
+        return [self._record(int(p)) for p in positions]
+
+    # ------------------------------------------------------------------
+    # Dashboards
+    # ------------------------------------------------------------------
+
+    def dashboard(self, segment: Segment, exclude_zero_revenue: bool = True) -> Dict[str, Any]:
+        """
+        Full dashboard payload for a segment
+
+        Args:
+            segment: Segment predicate
+            exclude_zero_revenue: Drop zero-revenue customers from the customer lists
+
+        Returns:
+            Dashboard dict; treat as read-only, it is shared between requests
+        """
+        key = (segment, exclude_zero_revenue)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+
+        if segment.subsidiary is None:
+            dashboard = self._customer_dashboard(segment, exclude_zero_revenue)
+        else:
+            dashboard = self._subsidiary_dashboard(segment)
+        # Only segments with customers are memoized: ids come from request URLs,
+        # and unknown ones would otherwise grow the memo for the whole snapshot
+        if dashboard['total_customers']:
+            self._memo[key] = dashboard
+        return dashboard
+
+    def _customer_dashboard(self, segment: Segment, exclude_zero_revenue: bool) -> Dict[str, Any]:
+        view = self.cube.slice(country=segment.country, region=segment.region)
+        if view.count == 0:
+            return dict(EMPTY_DASHBOARD)
+
+        summary = summary_fields(view)
+        filters = {'country': segment.country, 'region': segment.region}
+        to_records = lambda positions: self.records(positions, exclude_zero_revenue)
+
+        summary['top_revenue_customers'] = to_records(self.topk.top('annual_revenue', SAMPLE_SIZE, **filters))
+        summary['at_risk_customers'] = to_records(
+            self.topk.top(SNAPSHOT_ORDER, SAMPLE_SIZE, churn_risk_level='HIGH', **filters)
+        )
+
+        # First customers per health status, in snapshot order
+        for status, field in HEALTH_STATUSES:
+            summary[field] = to_records(self.topk.top(SNAPSHOT_ORDER, SAMPLE_SIZE, health_status=status, **filters))
+
+        # Top revenue customers per region present in the segment
+        summary['region_samples'] = {
+            region: to_records(self.topk.top('annual_revenue', REGION_SAMPLE_SIZE, **{**filters, 'region': region}))
+            for region in summary['region_distribution']
+        }
+        return summary
+
+    def _subsidiary_dashboard(self, segment: Segment) -> Dict[str, Any]:
+        view = self.cube.slice(subsidiary=segment.subsidiary, country=segment.country, region=segment.region)
+        if view.count == 0:
+            return dict(EMPTY_SUBSIDIARY_DASHBOARD)
+
+        summary = summary_fields(view, total_revenue=view.sum('subsidiary_revenue_sum'))
+
+        # Customer lists rank by subsidiary-specific revenue and skip zero-revenue relationships
+        subsidiary_revenue = self.topk.subsidiary_revenue(segment.subsidiary)
+        nonzero = subsidiary_revenue != 0
+        filters = {'subsidiary': segment.subsidiary, 'country': segment.country, 'region': segment.region}
+
+        top = self.topk.top(SUBSIDIARY_REVENUE, SAMPLE_SIZE, predicate=nonzero, **filters)
+        summary['top_revenue_customers'] = [
+            {
+                'account_id': self.customers.at[p, 'account_id'],
+                'account_name': self.customers.at[p, 'account_name'],
+                'annual_revenue': float(subsidiary_revenue[p]),
+                'health_status': self.customers.at[p, 'health_status'],
+                'region': self.customers.at[p, 'region']
+            }
+            for p in top
+        ]
+
+        at_risk = self.topk.top('churn_risk_score', SAMPLE_SIZE, predicate=nonzero, churn_risk_level='HIGH', **filters)
+        summary['at_risk_customers'] = [
+            {
+                'account_id': self.customers.at[p, 'account_id'],
+                'account_name': self.customers.at[p, 'account_name'],
+                'churn_risk_score': float(self.customers.at[p, 'churn_risk_score']),
+                'annual_revenue': float(subsidiary_revenue[p]),
+                'health_status': self.customers.at[p, 'health_status']
+            }
+            for p in at_risk
+        ]
+        return summary
@@ -0,0 +1,294 @@
+"""
+LLM Client
+Process-wide OpenAI client for the chatbot: one pooled keep-alive connection
+pool, bounded concurrency, per-call timeouts, retries with jittered backoff and
+a circuit breaker so a failing upstream is skipped quickly instead of tying up
+API workers
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import openai
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+# Tool-calling rounds before the model is asked to answer with what it has
+MAX_TOOL_ROUNDS = 4
+
+# Runs one tool call: (name, JSON-encoded arguments) -> JSON-ready result
+ToolRunner = Callable[[str, str], Any]
+
+# Errors worth retrying: the request may succeed if sent again
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not answer: circuit open, too busy, or retries exhausted"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_seconds`; then lets a single trial call through (half-open), closing
+    again on success and re-opening on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self):
+        """Give up a half-open trial that ended without reaching the upstream"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        """Close the circuit"""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    reset = record_success
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LLMClient:
+    """
+    Shared chat completions client
+
+    Args:
+        timeout: Per-call timeout in seconds
+        max_retries: Retries after the first attempt for retryable errors
+        max_concurrency: Calls allowed in flight at once across the process
+        acquire_timeout: Seconds to wait for a concurrency slot before giving up
+        breaker: Circuit breaker guarding the upstream
+        backoff_base: First retry delay in seconds; doubles per retry, with full jitter
+    """
+
+    def __init__(self, timeout: float = 20.0, max_retries: int = 2, max_concurrency: int = 8,
+                 acquire_timeout: float = 5.0, breaker: Optional[CircuitBreaker] = None,
+                 backoff_base: float = 0.5, sleep: Callable[[float], None] = time.sleep):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.acquire_timeout = acquire_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.backoff_base = backoff_base
+        self._sleep = sleep
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._client: Optional[OpenAI] = None
+        self._client_config = None
+        self._client_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'LLMClient':
+        """Client configured from OPENAI_* environment variables"""
+        return cls(
+            timeout=float(os.getenv('OPENAI_TIMEOUT_SECONDS', 20)),
+            max_retries=int(os.getenv('OPENAI_MAX_RETRIES', 2)),
+            max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', 8)),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv('OPENAI_CIRCUIT_FAILURES', 5)),
+                reset_seconds=float(os.getenv('OPENAI_CIRCUIT_RESET_SECONDS', 30)),
+            ),
+        )
+
+    @property
+    def client(self) -> OpenAI:
+        """
+        The pooled OpenAI client
+
+        Created once and reused, so connections stay alive between requests;
+        rebuilt only if the API key or base URL in the environment changes.
+        """
+        config = (os.getenv('OPENAI_API_KEY'), os.getenv('OPENAI_BASE_URL'))
+        with self._client_lock:
+            if self._client is None or self._client_config != config:
+                if self._client is not None:
+                    self._client.close()
+                # Retries are handled here, with jitter and the circuit breaker
+                self._client = OpenAI(api_key=config[0], base_url=config[1], timeout=self.timeout, max_retries=0)
+                self._client_config = config
+            return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_base * 2 ** attempt)
+
+    @contextmanager
+    def _slot(self):
+        """Hold one of the process-wide concurrency slots"""
+        if not self.breaker.allow():
+            raise LLMUnavailable('LLM circuit is open')
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self.breaker.release_trial()
+            raise LLMUnavailable('Too many concurrent LLM requests')
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _with_retries(self, request: Callable[[], object]):
+        """Send a request, retrying retryable errors with jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = request()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    raise LLMUnavailable(f'LLM request failed after {attempt + 1} attempts: {e}') from e
+                delay = self._backoff(attempt)
+                logger.warning(f"LLM request failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                self._sleep(delay)
+            except openai.APIStatusError:
+                # The upstream answered (e.g. a 4xx); it is not down, the request is bad
+                self.breaker.record_success()
+                raise
+            except Exception:
+                self.breaker.release_trial()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def complete(self, messages: List[dict], tools: Optional[List[dict]] = None,
+                 call_tool: Optional[ToolRunner] = None, max_tool_rounds: int = MAX_TOOL_ROUNDS, **params) -> str:
+        """
+        Chat completion text for a message list
+
+        Args:
+            messages: Chat messages
+            tools: Optional function-calling tool definitions
+            call_tool: Runs a tool call, (name, JSON arguments) -> JSON-ready result
+            max_tool_rounds: Tool-calling rounds before the model must answer
+            **params: Completion parameters (model, temperature, ...)
+        """
+        messages = list(messages)
+        for round_number in range(max_tool_rounds + 1):
+            request = dict(params, **_tool_params(tools, final=round_number == max_tool_rounds))
+            with self._slot():
+                response = self._with_retries(
+                    lambda: self.client.chat.completions.create(messages=messages, **request)
+                )
+            message = response.choices[0].message
+            if not message.tool_calls:
+                return message.content
+            calls = [
+                {'id': call.id, 'name': call.function.name, 'arguments': call.function.arguments}
+                for call in message.tool_calls
+            ]
+            messages.extend(_tool_messages(message.content, calls, call_tool))
+
+    def stream(self, messages: List[dict], tools: Optional[List[dict]] = None,
+               call_tool: Optional[ToolRunner] = None, max_tool_rounds: int = MAX_TOOL_ROUNDS,
+               **params) -> Iterator[str]:
+        """
+        Streamed chat completion as text deltas
+
+        Arguments are as for `complete`. Each round's concurrency slot is held
+        until its stream ends; tool calls are accumulated from the stream and
+        run between rounds. Errors before a stream opens are retried; a
+        failure mid-stream is raised as LLMUnavailable, since part of the
+        answer may already have been sent.
+        """
+        messages = list(messages)
+        for round_number in range(max_tool_rounds + 1):
+            request = dict(params, stream=True, **_tool_params(tools, final=round_number == max_tool_rounds))
+            calls: Dict[int, Dict[str, str]] = {}
+            content = []
+            with self._slot():
+                stream = self._with_retries(
+                    lambda: self.client.chat.completions.create(messages=messages, **request)
+                )
+                try:
+                    for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            content.append(delta.content)
+                            yield delta.content
+                        for call in delta.tool_calls or []:
+                            # Tool calls arrive in fragments keyed by their index
+                            pending = calls.setdefault(call.index, {'id': '', 'name': '', 'arguments': ''})
+                            pending['id'] = call.id or pending['id']
+                            if call.function:
+                                pending['name'] += call.function.name or ''
+                                pending['arguments'] += call.function.arguments or ''
+                except RETRYABLE_ERRORS as e:
+                    self.breaker.record_failure()
+                    raise LLMUnavailable(f'LLM stream interrupted: {e}') from e
+                finally:
+                    stream.close()
+            if not calls:
+                return
+            messages.extend(_tool_messages(''.join(content) or None, [calls[i] for i in sorted(calls)], call_tool))
+
+
+def _tool_params(tools: Optional[List[dict]], final: bool) -> Dict[str, object]:
+    """Completion parameters offering the tools; on the final round the model must answer"""
+    if not tools:
+        return {}
+    return {'tools': tools, 'tool_choice': 'none' if final else 'auto'}
+
+
+def _tool_messages(content: Optional[str], calls: List[Dict[str, str]], call_tool: ToolRunner) -> List[dict]:
+    """The assistant's tool-call message followed by one result message per call"""
+    messages = [{
+        'role': 'assistant',
+        'content': content,
+        'tool_calls': [
+            {'id': c['id'], 'type': 'function', 'function': {'name': c['name'], 'arguments': c['arguments']}}
+            for c in calls
+        ],
+    }]
+    for call in calls:
+        result = call_tool(call['name'], call['arguments'])
+        logger.info(f"Chatbot tool call: {call['name']}({call['arguments']})")
+        messages.append({'role': 'tool', 'tool_call_id': call['id'], 'content': json.dumps(result, default=str)})
+    return messages
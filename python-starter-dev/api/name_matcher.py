@@ -0,0 +1,116 @@
+"""
+Customer Name Matcher
+Aho–Corasick automaton over normalized account names, built once per gold
+snapshot, that finds every customer mentioned in a chat message in a single
+pass over the message
+"""
+
+import logging
+import re
+from collections import deque
+from typing import Dict, List
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_name(text: str) -> str:
+    """Lower-case and collapse whitespace so names match regardless of spacing"""
+    return _WHITESPACE.sub(' ', str(text).lower()).strip()
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher
+
+    Built in O(total pattern length); `search` runs in
+    O(len(text) + number of matches).
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(pattern_id)
+
+        # Breadth-first failure links; outputs inherit the failure state's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def search(self, text: str) -> List[int]:
+        """
+        Ids of the patterns occurring in text
+
+        Returns:
+            Pattern ids in order of where each match ends; a pattern occurring
+            several times is reported once
+        """
+        found: List[int] = []
+        seen = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern_id in self._output[state]:
+                if pattern_id not in seen:
+                    seen.add(pattern_id)
+                    found.append(pattern_id)
+        return found
+
+
+class CustomerNameMatcher:
+    """Finds the customers of a customer_360_metrics snapshot mentioned in free text"""
+
+    def __init__(self, customers: pd.DataFrame):
+        self.accounts = customers.set_index('account_id', drop=False)
+
+        # One pattern per distinct normalized name; several accounts may share it
+        names = customers['account_name'].map(normalize_name)
+        grouped = customers['account_id'].groupby(names.to_numpy(), sort=False).agg(list)
+        self._account_ids: List[List[str]] = grouped.tolist()
+        self._automaton = AhoCorasick(grouped.index.tolist())
+
+        # Snapshot position per account, so matches can be reported in table order
+        self._position = {account_id: i for i, account_id in enumerate(customers['account_id'])}
+
+        logger.info(f"Built customer name matcher: {len(self._account_ids)} names over {len(customers)} customers")
+
+    def match_ids(self, text: str) -> List[str]:
+        """Account ids of every customer whose name occurs in text, in snapshot order"""
+        account_ids = [
+            account_id
+            for pattern_id in self._automaton.search(normalize_name(text))
+            for account_id in self._account_ids[pattern_id]
+        ]
+        return sorted(account_ids, key=self._position.__getitem__)
+
+    def match(self, text: str) -> pd.DataFrame:
+        """Customer rows mentioned in text, looked up in the account index"""
+        return self.accounts.loc[self.match_ids(text)]
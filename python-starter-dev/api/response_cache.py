@@ -0,0 +1,92 @@
+"""
+Chatbot Response Cache
+LRU cache with TTL for chatbot answers, keyed by the normalized question, the
+conversation history it was asked in and the gold snapshot it was answered from
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_PUNCTUATION = re.compile(r'[\s?!.]+$')
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation do not change the answer"""
+    return _TRAILING_PUNCTUATION.sub('', _WHITESPACE.sub(' ', query.strip().lower()))
+
+
+def history_hash(history: List[dict]) -> str:
+    """Stable hash of the (already trimmed) conversation history"""
+    payload = json.dumps(
+        [{'role': m.get('role'), 'content': m.get('content')} for m in history],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live
+
+    Args:
+        max_entries: Size cap; the least recently used entry is evicted first
+        ttl_seconds: Entries older than this are treated as misses
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 900):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, history: List[dict], snapshot: Hashable, *extra: Hashable) -> Tuple:
+        """Cache key for a question asked after `history` against `snapshot`"""
+        return (normalize_query(query), history_hash(history), snapshot) + extra
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        Look up an entry
+
+        Returns:
+            (value, age in seconds), or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], now - entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """Store an entry, evicting the least recently used ones over the size cap"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
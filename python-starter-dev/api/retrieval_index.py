@@ -0,0 +1,163 @@
+"""
+Customer Retrieval Index
+BM25 index over per-customer text (profile, risk alerts and recommendations),
+built once per gold snapshot, so the chatbot can pull the few accounts relevant
+to a question into its prompt instead of only the global top lists
+"""
+
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from rollup_cube import parse_subsidiaries
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset(
+    'a about an and any are as at be by can do does for from has have how i in is it me of on or our '
+    'show tell that the their them there these they this to us was we what when which who why with '
+    'you your'.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric terms, without stopwords"""
+    return [t for t in _TOKEN.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed document collection
+
+    Postings are stored per term as (document ids, term frequencies) arrays,
+    so a query only touches the documents containing its terms.
+    """
+
+    def __init__(self, documents: Iterable[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = []
+        for doc_id, terms in enumerate(documents):
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                ids, tfs = postings.setdefault(term, ([], []))
+                ids.append(doc_id)
+                tfs.append(tf)
+
+        self.size = len(lengths)
+        self.lengths = np.asarray(lengths, dtype=float)
+        avg_length = self.lengths.mean() if self.size and self.lengths.mean() > 0 else 1.0
+        # Per-document length normalization, shared by every term
+        self._norm = k1 * (1 - b + b * self.lengths / avg_length)
+
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        for term, (ids, tfs) in postings.items():
+            df = len(ids)
+            idf = np.log(1 + (self.size - df + 0.5) / (df + 0.5))
+            self.postings[term] = (np.asarray(ids), np.asarray(tfs, dtype=float), idf)
+
+    def scores(self, terms: List[str]) -> np.ndarray:
+        """BM25 score of every document for a tokenized query"""
+        scores = np.zeros(self.size)
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ids, tfs, idf = posting
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + self._norm[ids])
+        return scores
+
+    def search(self, terms: List[str], k: int) -> List[Tuple[int, float]]:
+        """Top-k (document id, score) pairs with a positive score, best first"""
+        scores = self.scores(terms)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        # Ties keep document (snapshot) order
+        matched = matched[np.lexsort((matched, -scores[matched]))]
+        return [(int(i), float(scores[i])) for i in matched]
+
+
+def _summary(customer: Dict) -> str:
+    """One-line customer profile, used both for indexing and in the prompt"""
+    subsidiaries = ', '.join(
+        s.get('subsidiary_short_name') or s.get('subsidiary_id', '') for s in parse_subsidiaries(customer.get('subsidiaries'))
+    )
+    country = f", {customer['country']}" if customer.get('country') else ''
+    return (
+        f"{customer['account_name']} ({customer['account_id']}, {customer['region']}{country}): "
+        f"{customer['health_status']}, Health {customer['health_score']:.1f}/100, "
+        f"Churn Risk {customer['churn_risk_score']:.1f}% ({customer['churn_risk_level']}), "
+        f"Revenue ${customer['annual_revenue']:,.2f}, NPS {customer['nps_score']:.0f}"
+        + (f", Subsidiaries: {subsidiaries}" if subsidiaries else '')
+    )
+
+
+class CustomerRetrievalIndex:
+    """BM25 retrieval over customers, their risk alerts and recommendations"""
+
+    def __init__(self, customers: pd.DataFrame, alerts: pd.DataFrame, recommendations: pd.DataFrame):
+        self.account_ids = customers['account_id'].tolist()
+        self._position = {account_id: i for i, account_id in enumerate(self.account_ids)}
+        self.summaries = [_summary(c) for c in customers.to_dict('records')]
+
+        # Alert and recommendation text per account, in their gold table order
+        self.alerts = self._text_by_account(alerts, ['severity', 'alert_type', 'message'])
+        self.recommendations = self._text_by_account(recommendations, ['priority', 'category', 'title', 'description'])
+
+        documents = []
+        for account_id, summary in zip(self.account_ids, self.summaries):
+            text = ' '.join([summary] + self.alerts.get(account_id, []) + self.recommendations.get(account_id, []))
+            documents.append(tokenize(text.replace('_', ' ')))
+        self.index = BM25Index(documents)
+
+        logger.info(
+            f"Built retrieval index: {self.index.size} customer documents, {len(self.index.postings)} terms"
+        )
+
+    @staticmethod
+    def _text_by_account(table: pd.DataFrame, columns: List[str]) -> Dict[str, List[str]]:
+        columns = [c for c in columns if c in table.columns]
+        if table.empty or not columns:
+            return {}
+        text = table[columns[0]].astype(str)
+        for column in columns[1:]:
+            text = text + ' ' + table[column].astype(str)
+        account_ids = table['account_id'].to_numpy()
+        grouped: Dict[str, List[str]] = {}
+        for account_id, value in zip(account_ids, text.tolist()):
+            grouped.setdefault(account_id, []).append(value)
+        return grouped
+
+    def search(self, query: str, k: int = 5, exclude: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Most relevant customers for a free-text query
+
+        Args:
+            query: User question
+            k: Number of customers
+            exclude: Account ids to leave out (e.g. customers already in the prompt)
+
+        Returns:
+            (account_id, score) pairs, best first
+        """
+        excluded = set(exclude) if exclude is not None else set()
+        hits = self.index.search(tokenize(query), k + len(excluded))
+        return [(self.account_ids[i], score) for i, score in hits if self.account_ids[i] not in excluded][:k]
+
+    def describe(self, account_id: str) -> str:
+        """Prompt line for a retrieved customer: profile plus its first alert and recommendation"""
+        line = f"- {self.summaries[self._position[account_id]]}"
+        if self.alerts.get(account_id):
+            line += f"; Alert: {self.alerts[account_id][0]}"
+        if self.recommendations.get(account_id):
+            line += f"; Recommendation: {self.recommendations[account_id][0]}"
+        return line
@@ -0,0 +1,220 @@
+"""
+Rollup Cube
+Pre-aggregated additive measures over customer segment dimensions, built once
+per gold snapshot so dashboard aggregates are answered from a few hundred cells
+instead of rescanning the customer table on every request
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Account-level dimensions (every customer falls in exactly one cell)
+DIMENSIONS = ['country', 'region', 'health_status', 'churn_risk_level']
+
+# Subsidiary is multi-valued per customer, so it lives in a separate exploded cube
+SUBSIDIARY_DIMENSION = 'subsidiary'
+
+# Columns served as means; each is stored as an additive (sum, count) pair
+MEAN_COLUMNS = [
+    'nps_score',
+    'csat_score',
+    'ces_score',
+    'health_score',
+    'churn_risk_score',
+    'support_tickets_open',
+    'sla_compliance_rate',
+]
+
+
+def parse_subsidiaries(value: Any) -> List[Dict[str, Any]]:
+    """Parse the JSON `subsidiaries` column into a list of relationship dicts"""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str) or not value:
+        return []
+    try:
+        subs = json.loads(value)
+    except ValueError:
+        return []
+    return subs if isinstance(subs, list) else []
+
+
+def explode_subsidiaries(customers: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (customer, subsidiary relationship)
+
+    The index is the customer's index label, so the frame joins straight back
+    onto the customer table. A subsidiary listed more than once for a customer
+    is one relationship, with the listed revenue and tickets summed.
+    """
+    columns = [SUBSIDIARY_DIMENSION, 'subsidiary_revenue', 'subsidiary_tickets']
+    if 'subsidiaries' not in customers.columns or customers.empty:
+        return pd.DataFrame(columns=columns)
+
+    exploded = customers['subsidiaries'].map(parse_subsidiaries).explode().dropna()
+    exploded = exploded[exploded.map(lambda s: isinstance(s, dict))]
+    if exploded.empty:
+        return pd.DataFrame(columns=columns)
+
+    relationships = pd.DataFrame({
+        SUBSIDIARY_DIMENSION: exploded.map(lambda s: s.get('subsidiary_id')),
+        'subsidiary_revenue': exploded.map(lambda s: s.get('annual_revenue', 0) or 0).astype(float),
+        'subsidiary_tickets': exploded.map(lambda s: s.get('tickets_count', 0) or 0).astype(float),
+    }, index=exploded.index)
+    if not relationships.set_index(SUBSIDIARY_DIMENSION, append=True).index.duplicated().any():
+        return relationships
+    return relationships.groupby(
+        [relationships.index, SUBSIDIARY_DIMENSION], sort=False, dropna=False
+    ).sum().reset_index(level=SUBSIDIARY_DIMENSION)
+
+
+def _measure_frame(customers: pd.DataFrame) -> pd.DataFrame:
+    """Build the per-account additive measure columns"""
+    measures = pd.DataFrame(index=customers.index)
+    measures['count'] = 1
+    measures['annual_revenue_sum'] = customers['annual_revenue'].fillna(0).astype(float)
+    for column in MEAN_COLUMNS:
+        if column in customers.columns:
+            values = pd.to_numeric(customers[column], errors='coerce')
+            measures[f'{column}_sum'] = values.fillna(0).astype(float)
+            measures[f'{column}_count'] = values.notna().astype(int)
+        else:
+            measures[f'{column}_sum'] = 0.0
+            measures[f'{column}_count'] = 0
+    return measures
+
+
+def _dimension_frame(customers: pd.DataFrame) -> pd.DataFrame:
+    """Select the dimension columns, filling in any that the snapshot lacks"""
+    dims = pd.DataFrame(index=customers.index)
+    for dim in DIMENSIONS:
+        dims[dim] = customers[dim] if dim in customers.columns else None
+    return dims
+
+
+class CubeSlice:
+    """Aggregated measures for the cells matching a slice of the cube"""
+
+    def __init__(self, cells: pd.DataFrame, available_columns: Iterable[str]):
+        self.cells = cells
+        self.available_columns = set(available_columns)
+        self._totals = cells.drop(columns=self._dimension_columns()).sum()
+
+    def _dimension_columns(self) -> List[str]:
+        return [c for c in self.cells.columns if c in DIMENSIONS or c == SUBSIDIARY_DIMENSION]
+
+    @property
+    def count(self) -> int:
+        """Number of customers in the slice"""
+        return int(self._totals.get('count', 0))
+
+    def sum(self, measure: str) -> float:
+        """Total of an additive measure, e.g. `annual_revenue_sum`"""
+        return float(self._totals.get(measure, 0.0))
+
+    def mean(self, column: str) -> float:
+        """
+        Mean of a customer column over the slice
+
+        Mirrors `float(df[column].mean()) if column in df.columns else 0`:
+        returns 0 when the snapshot has no such column.
+        """
+        if column not in self.available_columns:
+            return 0.0
+        count = self._totals.get(f'{column}_count', 0)
+        if not count:
+            return float('nan')
+        return float(self._totals[f'{column}_sum'] / count)
+
+    def distribution(self, dim: str) -> Dict[str, int]:
+        """Customer counts per value of a dimension (like `value_counts()`)"""
+        if self.cells.empty:
+            return {}
+        counts = self.cells.groupby(dim, sort=False)['count'].sum()
+        counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+        return {key: int(value) for key, value in counts.items()}
+
+
+class RollupCube:
+    """
+    Multi-dimensional rollup of customer_360_metrics
+
+    Cells are keyed by (country, region, health_status, churn_risk_level) and hold
+    counts plus sum/count pairs for every averaged metric, so any slice or
+    roll-up is a masked sum over the cells.
+    """
+
+    def __init__(self, cells: pd.DataFrame, subsidiary_cells: pd.DataFrame,
+                 available_columns: Iterable[str], relationships: Optional[pd.DataFrame] = None):
+        self.cells = cells
+        self.subsidiary_cells = subsidiary_cells
+        self.available_columns = set(available_columns)
+        self.relationships = relationships if relationships is not None else explode_subsidiaries(pd.DataFrame())
+
+    @classmethod
+    def from_customers(cls, customers: pd.DataFrame) -> 'RollupCube':
+        """Build the cube from a customer_360_metrics snapshot"""
+        if customers.empty:
+            empty = pd.DataFrame(columns=DIMENSIONS + ['count'])
+            return cls(empty, empty.assign(**{SUBSIDIARY_DIMENSION: None}), [])
+
+        dims = _dimension_frame(customers)
+        measures = _measure_frame(customers)
+        base = pd.concat([dims, measures], axis=1)
+
+        cells = base.groupby(DIMENSIONS, dropna=False, sort=False).sum().reset_index()
+
+        # Subsidiary cells aggregate one row per (account, subsidiary) relationship
+        relationships = explode_subsidiaries(customers)
+        sub_measures = relationships.rename(columns={
+            'subsidiary_revenue': 'subsidiary_revenue_sum',
+            'subsidiary_tickets': 'subsidiary_tickets_sum',
+        })
+        if sub_measures.empty:
+            subsidiary_cells = cells.iloc[0:0].assign(**{
+                SUBSIDIARY_DIMENSION: None,
+                'subsidiary_revenue_sum': 0.0,
+                'subsidiary_tickets_sum': 0.0,
+            })
+        else:
+            subsidiary_cells = sub_measures.join(base).groupby(
+                DIMENSIONS + [SUBSIDIARY_DIMENSION], dropna=False, sort=False
+            ).sum().reset_index()
+
+        logger.info(
+            f"Built rollup cube: {len(cells)} cells, {len(subsidiary_cells)} subsidiary cells "
+            f"from {len(customers)} customers"
+        )
+        return cls(cells, subsidiary_cells, customers.columns, relationships)
+
+    def slice(self, subsidiary: Optional[str] = None, **filters: Any) -> CubeSlice:
+        """
+        Select the cells matching the given dimension values
+
+        Args:
+            subsidiary: Restrict to customers related to this subsidiary
+            **filters: Dimension name to a value, or a list/tuple/set of values
+
+        Returns:
+            CubeSlice over the matching cells
+        """
+        cells = self.cells if subsidiary is None else self.subsidiary_cells
+        mask = np.ones(len(cells), dtype=bool)
+        if subsidiary is not None:
+            mask &= (cells[SUBSIDIARY_DIMENSION] == subsidiary).to_numpy()
+        for dim, value in filters.items():
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Unknown cube dimension: {dim}")
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                mask &= cells[dim].isin(list(value)).to_numpy()
+            else:
+                mask &= (cells[dim] == value).to_numpy()
+        return CubeSlice(cells[mask], self.available_columns)
@@ -0,0 +1,145 @@
+"""
+Segment Action Index
+Recommendations and risk alerts joined to customer segment attributes once per
+gold snapshot and pre-ranked by priority / severity, so segment lookups are a
+dictionary hit plus a top-k slice
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rank used for both recommendation priority and alert severity
+PRIORITY_RANK = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+
+# Segment type (API `type` parameter) -> customer attribute
+SEGMENT_TYPES = {
+    'health': 'health_status',
+    'region': 'region',
+    'opco': 'country',
+    'subsidiary': 'subsidiary',
+}
+
+
+def _to_records(rows: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert rows to JSON-ready dicts the same way the customer endpoints do"""
+    results = rows.to_dict('records')
+    for record in results:
+        for key, value in record.items():
+            if pd.api.types.is_datetime64_any_dtype(type(value)):
+                record[key] = value.isoformat()
+            elif pd.isna(value):
+                record[key] = None
+    return results
+
+
+class RankedSegmentTable:
+    """A gold table ranked by a HIGH/MEDIUM/LOW column, with row positions per segment"""
+
+    def __init__(self, table: pd.DataFrame, rank_column: str, output_columns: List[str],
+                 segments: pd.DataFrame, relationships: pd.DataFrame):
+        ranks = table[rank_column].map(PRIORITY_RANK)
+        order = np.argsort(ranks.fillna(len(PRIORITY_RANK)).to_numpy(), kind='stable')
+        self.table = table.iloc[order].reset_index(drop=True)
+        self.rank_column = rank_column
+        self.output_columns = output_columns
+        self._records: Dict[tuple, List[Dict[str, Any]]] = {}
+
+        # Join each row to its customer's segment attributes
+        positions = pd.DataFrame({
+            'position': np.arange(len(self.table)),
+            'account_id': self.table['account_id'].to_numpy(),
+        })
+        joined = positions.merge(segments, on='account_id', how='left').sort_values('position', kind='stable')
+
+        self.positions: Dict[str, Dict[Any, np.ndarray]] = {}
+        for attribute in SEGMENT_TYPES.values():
+            if attribute == 'subsidiary':
+                source = positions.merge(relationships, on='account_id').sort_values('position', kind='stable')
+            elif attribute in joined.columns:
+                source = joined
+            else:
+                continue
+            position_values = source['position'].to_numpy()
+            self.positions[attribute] = {
+                value: position_values[idx]
+                for value, idx in source.groupby(attribute, sort=False).indices.items()
+            }
+
+    def top(self, attribute: str, value: Any, k: int, rank_value: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Top-ranked rows for a segment as JSON-ready records (memoized)
+
+        Args:
+            attribute: Customer attribute, e.g. 'health_status' or 'subsidiary'
+            value: Segment value
+            k: Number of rows
+            rank_value: Only keep rows with this priority/severity, e.g. 'HIGH'
+        """
+        key = (attribute, value, k, rank_value)
+        cached = self._records.get(key)
+        if cached is None:
+            segment_positions = self.positions.get(attribute, {}).get(value, np.array([], dtype=int))
+            if rank_value is not None:
+                # Rows are ranked, so the matching rows form a prefix of the segment
+                matching = self.table[self.rank_column].to_numpy()[segment_positions] == rank_value
+                segment_positions = segment_positions[matching]
+            rows = self.table.iloc[segment_positions[:k]]
+            cached = _to_records(rows[self.output_columns])
+            self._records[key] = cached
+        return cached
+
+
+class SegmentActionIndex:
+    """Segment-indexed recommendations and alerts for one gold snapshot"""
+
+    def __init__(self, customers: pd.DataFrame, recommendations: pd.DataFrame,
+                 alerts: pd.DataFrame, relationships: pd.DataFrame):
+        segment_columns = ['account_id'] + [
+            c for c in SEGMENT_TYPES.values() if c != 'subsidiary' and c in customers.columns
+        ]
+        segments = customers[segment_columns].drop_duplicates('account_id')
+
+        # relationships is indexed by customer label; attach account ids
+        if len(relationships):
+            subsidiary_pairs = pd.DataFrame({
+                'account_id': customers.loc[relationships.index, 'account_id'].to_numpy(),
+                'subsidiary': relationships['subsidiary'].to_numpy(),
+            }).drop_duplicates()
+        else:
+            subsidiary_pairs = pd.DataFrame(columns=['account_id', 'subsidiary'])
+
+        self.recommendations = None
+        if not recommendations.empty:
+            # priority_order was historically part of the segment response
+            self.recommendations = RankedSegmentTable(
+                recommendations.assign(priority_order=recommendations['priority'].map(PRIORITY_RANK)),
+                'priority',
+                list(recommendations.columns) + ['priority_order'],
+                segments,
+                subsidiary_pairs,
+            )
+
+        self.alerts = None
+        if not alerts.empty:
+            self.alerts = RankedSegmentTable(alerts, 'severity', list(alerts.columns), segments, subsidiary_pairs)
+
+        logger.info(
+            f"Built segment action index: {len(recommendations)} recommendations, {len(alerts)} alerts"
+        )
+
+    def top_recommendations(self, attribute: str, value: Any, k: int = 5) -> List[Dict[str, Any]]:
+        """Highest-priority recommendations for customers in a segment"""
+        if self.recommendations is None:
+            return []
+        return self.recommendations.top(attribute, value, k)
+
+    def critical_alerts(self, attribute: str, value: Any, k: int = 5) -> List[Dict[str, Any]]:
+        """HIGH severity alerts for customers in a segment"""
+        if self.alerts is None:
+            return []
+        return self.alerts.top(attribute, value, k, rank_value='HIGH')
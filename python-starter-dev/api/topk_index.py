@@ -0,0 +1,223 @@
+"""
+Top-K Leaderboard Index
+Presorted customer permutations per (segment value, metric), built once per
+gold snapshot so leaderboard fields are array slices instead of per-request
+`nlargest` / `head` calls on freshly filtered frames
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SUBSIDIARY_SEGMENT = 'subsidiary'
+
+# Pseudo-metric: customers in snapshot order (the old `.head(n)` samples)
+SNAPSHOT_ORDER = 'snapshot_order'
+
+# Metric only defined within a subsidiary segment (relationship revenue)
+SUBSIDIARY_REVENUE = 'subsidiary_revenue'
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'leaderboards.json'
+
+
+def _ordered_positions(values: np.ndarray, descending: bool) -> np.ndarray:
+    """Stable sort of the non-NaN values; ties keep snapshot order like `nlargest`"""
+    valid = np.flatnonzero(~np.isnan(values))
+    keys = -values[valid] if descending else values[valid]
+    return valid[np.argsort(keys, kind='stable')]
+
+
+def _group_positions(positions: np.ndarray, codes: np.ndarray, labels) -> Dict[str, np.ndarray]:
+    """Split an ordered position array into per-label arrays, preserving order"""
+    if len(positions) == 0:
+        return {}
+    grouping = np.argsort(codes, kind='stable')
+    sorted_codes = codes[grouping]
+    bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+    groups = np.split(positions[grouping], bounds)
+    starts = np.concatenate([[0], bounds])
+    return {
+        labels[sorted_codes[start]]: group
+        for start, group in zip(starts, groups)
+        if sorted_codes[start] >= 0
+    }
+
+
+class TopKIndex:
+    """
+    Leaderboard index over one customer_360_metrics snapshot
+
+    For each configured segment column and metric, holds the row positions of
+    every segment value presorted by that metric. `top()` then returns the
+    first k positions; extra filters are applied by scanning the presorted
+    permutation of the most selective segment.
+    """
+
+    def __init__(self, customers: pd.DataFrame, relationships: pd.DataFrame,
+                 segments: List[str], metrics: Dict[str, str]):
+        self.size = len(customers)
+        self.segments = [s for s in segments if s == SUBSIDIARY_SEGMENT or s in customers.columns]
+        missing = set(segments) - set(self.segments)
+        if missing:
+            logger.warning(f"Leaderboard segments not in snapshot, skipped: {sorted(missing)}")
+
+        # Global orders per metric
+        self.orders: Dict[str, np.ndarray] = {SNAPSHOT_ORDER: np.arange(self.size)}
+        for metric, direction in metrics.items():
+            if metric in (SNAPSHOT_ORDER, SUBSIDIARY_REVENUE):
+                continue
+            if metric not in customers.columns:
+                logger.warning(f"Leaderboard metric not in snapshot, skipped: {metric}")
+                continue
+            values = pd.to_numeric(customers[metric], errors='coerce').to_numpy(dtype=float)
+            self.orders[metric] = _ordered_positions(values, descending=direction == 'desc')
+
+        # Segment values are matched as strings so query parameters can be used directly
+        self.columns: Dict[str, np.ndarray] = {
+            segment: customers[segment].astype(str).to_numpy()
+            for segment in self.segments if segment != SUBSIDIARY_SEGMENT
+        }
+
+        self.permutations: Dict[Tuple[str, str], Dict[str, np.ndarray]] = {}
+        for segment, column in self.columns.items():
+            codes, labels = pd.factorize(column)
+            for metric, order in self.orders.items():
+                self.permutations[(segment, metric)] = _group_positions(order, codes[order], labels)
+
+        # Subsidiary relationships: first relationship per (row position, subsidiary)
+        self.relationships = relationships
+        self._subsidiary_revenue: Dict[str, np.ndarray] = {}
+        if SUBSIDIARY_SEGMENT in self.segments:
+            self._index_subsidiaries()
+
+        logger.info(
+            f"Built top-K index: {len(self.segments)} segments x {len(self.orders)} metrics "
+            f"over {self.size} customers"
+        )
+
+    @classmethod
+    def from_snapshot(cls, customers: pd.DataFrame, relationships: pd.DataFrame,
+                      config_path: Optional[Path] = None) -> 'TopKIndex':
+        """
+        Build the index for a snapshot using the leaderboard configuration
+
+        Args:
+            customers: customer_360_metrics snapshot
+            relationships: Exploded subsidiary relationships indexed by customer label
+            config_path: Leaderboard config (defaults to config/leaderboards.json)
+        """
+        with open(config_path or DEFAULT_CONFIG_PATH, 'r') as f:
+            config = json.load(f)
+
+        metrics = {m['name']: m.get('order', 'desc') for m in config['metrics']}
+        positions = customers.index.get_indexer(relationships.index) if len(relationships) \
+            else np.array([], dtype=int)
+        relationships = relationships.reset_index(drop=True).assign(position=positions)
+        relationships = relationships.drop_duplicates(['position', SUBSIDIARY_SEGMENT])
+        relationships = relationships.sort_values('position', kind='stable').reset_index(drop=True)
+
+        return cls(customers.reset_index(drop=True), relationships, config['segments'], metrics)
+
+    def _index_subsidiaries(self):
+        rel = self.relationships
+        codes, labels = pd.factorize(rel[SUBSIDIARY_SEGMENT].astype(str))
+        rel_positions = rel['position'].to_numpy()
+
+        for metric, order in self.orders.items():
+            rank = np.full(self.size, -1)
+            rank[order] = np.arange(len(order))
+            rel_rank = rank[rel_positions]
+            ranked = np.flatnonzero(rel_rank >= 0)
+            ranked = ranked[np.argsort(rel_rank[ranked], kind='stable')]
+            self.permutations[(SUBSIDIARY_SEGMENT, metric)] = _group_positions(
+                rel_positions[ranked], codes[ranked], labels
+            )
+
+        revenue = rel['subsidiary_revenue'].to_numpy(dtype=float)
+        by_revenue = _ordered_positions(revenue, descending=True)
+        self.permutations[(SUBSIDIARY_SEGMENT, SUBSIDIARY_REVENUE)] = _group_positions(
+            rel_positions[by_revenue], codes[by_revenue], labels
+        )
+
+    def subsidiary_revenue(self, subsidiary: str) -> np.ndarray:
+        """Relationship revenue per row position for a subsidiary (NaN when unrelated)"""
+        values = self._subsidiary_revenue.get(subsidiary)
+        if values is None:
+            values = np.full(self.size, np.nan)
+            related = self.relationships[self.relationships[SUBSIDIARY_SEGMENT] == subsidiary]
+            values[related['position'].to_numpy()] = related['subsidiary_revenue'].to_numpy(dtype=float)
+            self._subsidiary_revenue[subsidiary] = values
+        return values
+
+    def _permutation(self, segment: str, value: Any, metric: str) -> np.ndarray:
+        if (segment, metric) not in self.permutations:
+            raise ValueError(f"No leaderboard index for segment '{segment}' and metric '{metric}'")
+        return self.permutations[(segment, metric)].get(str(value), np.array([], dtype=int))
+
+    def _matches(self, segment: str, value: Any, positions: np.ndarray) -> np.ndarray:
+        if segment == SUBSIDIARY_SEGMENT:
+            return ~np.isnan(self.subsidiary_revenue(str(value))[positions])
+        return self.columns[segment][positions] == str(value)
+
+    def top(self, metric: str, k: Optional[int] = None, predicate: Optional[np.ndarray] = None,
+            **filters: Any) -> np.ndarray:
+        """
+        Row positions of the top-k customers by a metric within a segment
+
+        Args:
+            metric: Configured metric name, `snapshot_order` or `subsidiary_revenue`
+            k: Number of positions to return (None for all)
+            predicate: Optional boolean mask over row positions
+            **filters: Segment column to value; None values are ignored
+
+        Returns:
+            Array of row positions, best first
+        """
+        filters = {segment: value for segment, value in filters.items() if value is not None}
+        unknown = set(filters) - set(self.segments)
+        if unknown:
+            raise ValueError(f"Unknown leaderboard segment(s): {sorted(unknown)}")
+        if metric == SUBSIDIARY_REVENUE and SUBSIDIARY_SEGMENT not in filters:
+            raise ValueError("subsidiary_revenue leaderboards require a subsidiary segment")
+        if metric not in self.orders and metric != SUBSIDIARY_REVENUE:
+            raise ValueError(f"Unknown leaderboard metric: {metric}")
+
+        # Drive the scan from the smallest presorted permutation
+        if filters:
+            drivers = [SUBSIDIARY_SEGMENT] if metric == SUBSIDIARY_REVENUE else list(filters)
+            candidates = [(segment, self._permutation(segment, filters[segment], metric)) for segment in drivers]
+            driver, perm = min(candidates, key=lambda c: len(c[1]))
+        else:
+            driver, perm = None, self.orders[metric]
+
+        rest = {segment: value for segment, value in filters.items() if segment != driver}
+        if not rest and predicate is None:
+            return perm[:k]
+
+        # Scan the permutation in growing blocks until k matches are found
+        matched = []
+        found = 0
+        start = 0
+        block_size = max(4 * k, 256) if k else len(perm)
+        while start < len(perm):
+            block = perm[start:start + block_size]
+            mask = np.ones(len(block), dtype=bool)
+            for segment, value in rest.items():
+                mask &= self._matches(segment, value, block)
+            if predicate is not None:
+                mask &= predicate[block]
+            matched.append(block[mask])
+            found += int(mask.sum())
+            if k is not None and found >= k:
+                break
+            start += block_size
+            block_size *= 2
+
+        result = np.concatenate(matched) if matched else np.array([], dtype=int)
+        return result[:k]
@@ -71,6 +71,48 @@ export const queryChatbot = async (query: string, history: any[]) => {
   return response.data;
 };
 
+// Streams the answer as Server-Sent Events; onDelta receives each text chunk
+export const streamChatbot = async (
+  query: string,
+  history: any[],
+  onDelta: (delta: string) => void
+) => {
+  const response = await fetch(`${API_BASE_URL}/chatbot/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ query, history }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Chatbot stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    const blocks = buffer.split('\n\n');
+    buffer = blocks.pop() ?? '';
+    for (const block of blocks) {
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice('event: '.length);
+        else if (line.startsWith('data: ')) data += line.slice('data: '.length);
+      }
+      if (!data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === 'error') throw new Error(payload.message || payload.error);
+      if (event === 'done') return payload;
+      onDelta(payload.delta);
+    }
+  }
+};
+
 export const getAllCustomers = async () => {
   const response = await api.get('/customers');
   return response.data;
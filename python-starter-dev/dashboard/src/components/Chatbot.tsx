@@ -1,6 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { X, Send, MessageSquare, Loader2 } from 'lucide-react';
-import { queryChatbot, getAllCustomers } from '../api/customer360';
+import { streamChatbot, getAllCustomers } from '../api/customer360';
 
 interface Message {
   role: 'user' | 'assistant';
@@ -163,15 +163,19 @@ export const Chatbot: React.FC<ChatbotProps> = ({ isOpen, onClose, onReset }) =>
         content: msg.content
       }));
 
-      const response = await queryChatbot(input.trim(), history);
-
-      const assistantMessage: Message = {
-        role: 'assistant',
-        content: response.response,
-        timestamp: new Date()
-      };
-
-      setMessages(prev => [...prev, assistantMessage]);
+      // Show the answer as it streams in: the first delta starts the message
+      let started = false;
+      await streamChatbot(input.trim(), history, (delta) => {
+        if (!started) {
+          started = true;
+          setMessages(prev => [...prev, { role: 'assistant', content: delta, timestamp: new Date() }]);
+        } else {
+          setMessages(prev => {
+            const last = prev[prev.length - 1];
+            return [...prev.slice(0, -1), { ...last, content: last.content + delta }];
+          });
+        }
+      });
     } catch (error) {
       console.error('Chatbot error:', error);
       const errorMessage: Message = {
@@ -275,7 +279,7 @@ export const Chatbot: React.FC<ChatbotProps> = ({ isOpen, onClose, onReset }) =>
             </div>
           </div>
         ))}
-        {isLoading && (
+        {isLoading && messages[messages.length - 1]?.role === 'user' && (
           <div className="flex justify-start">
             <div className="bg-gray-100 dark:bg-datacamp-dark-bg-secondary rounded-lg p-3">
               <Loader2 className="h-5 w-5 animate-spin text-datacamp-brand" />
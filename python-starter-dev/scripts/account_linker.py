@@ -8,7 +8,7 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 from difflib import SequenceMatcher
@@ -26,14 +26,20 @@ class AccountLinker:
 
     SIMILARITY_THRESHOLD = 0.85  # 85% similarity for fuzzy matching
 
-    def __init__(self, config_path: str):
-        """Initialize account linker"""
+    def __init__(self, config_path: str, silver_files: Optional[Dict[str, str]] = None):
+        """
+        Initialize account linker
+
+        silver_files names the file to read per silver table instead of the
+        latest one in silver_path.
+        """
         with open(config_path, 'r') as f:
             self.config = json.load(f)
 
         self.silver_path = Path(self.config.get('silver_path', './data/silver'))
         self.gold_path = Path(self.config.get('gold_path', './data/gold'))
         self.gold_path.mkdir(parents=True, exist_ok=True)
+        self.silver_files = silver_files or {}
 
         # Load accounts
         self.accounts = self.load_latest_silver('account')
@@ -45,6 +51,10 @@ class AccountLinker:
 
     def load_latest_silver(self, table_name: str) -> pd.DataFrame:
         """Load the most recent silver file for a table"""
+        if table_name in self.silver_files:
+            logger.info(f"Loading silver file: {self.silver_files[table_name]}")
+            return pd.read_parquet(self.silver_files[table_name])
+
         pattern = f"silver_{table_name}_*.parquet"
         files = list(self.silver_path.glob(pattern))
 
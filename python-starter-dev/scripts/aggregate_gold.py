@@ -4,13 +4,29 @@ Creates analytics-ready data with customer 360 metrics, risk scores, and recomme
 """
 
 import argparse
+import copy
+import hashlib
+import io
 import json
 import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from gold_expressions import Expression, compile_expression
+from gold_line_items import account_line_items, account_rollups
+from gold_rules import RuleSet
+from gold_simulation import AccountDraws, account_hashes, simulate_account_metrics
+from gold_timeline import CLOSED_TICKET_STATUSES, TIMELINE_SCHEMA, build_timeline, invoice_events, \
+    opportunity_events, sort_timeline, ticket_events
+from run_metrics import PROFILERS, RunMetrics, profiled
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,32 +34,348 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# customer_360_metrics columns, in output order
+CUSTOMER_360_COLUMNS = [
+    'account_id', 'account_name', 'region', 'customer_since',
+    # Financial Metrics
+    'customer_lifetime_value', 'monthly_recurring_revenue', 'annual_revenue', 'previous_year_revenue',
+    'yoy_growth', 'quarterly_revenue', 'three_year_revenue', 'revenue_concentration', 'profit_margin',
+    'total_cost_to_serve',
+    # Sales Metrics
+    'active_services', 'contracted_value', 'product_mix', 'win_rate', 'total_opportunities', 'won_opportunities',
+    'open_opportunities', 'pipeline_value', 'next_close_date', 'next_close_value', 'next_close_probability',
+    'avg_deal_size', 'avg_sales_cycle_days',
+    # Operational/Support Metrics
+    'open_tickets', 'closed_tickets', 'total_tickets', 'avg_resolution_time_hours', 'avg_response_time_hours',
+    'sla_compliance_pct', 'recurring_issues_count',
+    # Billing Metrics
+    'overdue_invoices', 'overdue_amount', 'days_overdue', 'disputed_invoices', 'credit_hold',
+    'billing_accuracy_pct', 'payment_terms',
+    # Account Management Metrics
+    'upcoming_renewals_count', 'upcoming_renewal_value', 'days_to_renewal', 'contract_end_date', 'nps_score',
+    'csat_score', 'ces_score', 'last_interaction_days', 'qbr_scheduled', 'executive_sponsor_engaged',
+    'retention_probability',
+    # Subsidiary Relationships
+    'subsidiaries', 'subsidiary_count', 'primary_subsidiary',
+]
+
+# Account metric columns risk alert and recommendation rules may read
+SCORED_METRIC_COLUMNS = CUSTOMER_360_COLUMNS + ['health_score', 'health_status', 'churn_risk_score',
+                                                'churn_risk_level']
+
+# Columns computed from silver data alone (the rest are simulated)
+SOURCE_METRIC_COLUMNS = [
+    'account_id', 'account_name', 'region', 'customer_since', 'customer_lifetime_value',
+    'monthly_recurring_revenue', 'annual_revenue', 'previous_year_revenue', 'yoy_growth', 'quarterly_revenue',
+    'three_year_revenue', 'revenue_concentration', 'active_services', 'contracted_value', 'product_mix',
+    'win_rate', 'total_opportunities', 'won_opportunities', 'open_opportunities', 'pipeline_value',
+    'next_close_date', 'next_close_value', 'next_close_probability', 'avg_deal_size', 'avg_sales_cycle_days',
+    'open_tickets', 'closed_tickets', 'total_tickets', 'avg_resolution_time_hours', 'avg_response_time_hours',
+    'sla_compliance_pct', 'recurring_issues_count', 'overdue_invoices', 'overdue_amount', 'days_overdue',
+    'disputed_invoices', 'credit_hold', 'billing_accuracy_pct', 'payment_terms', 'upcoming_renewals_count',
+    'upcoming_renewal_value',
+]
+
+# Silver ticket and invoice columns read for support and billing metrics (missing ones count as empty)
+TICKET_METRIC_COLUMNS = [
+    'account_id', 'status', 'category', 'created_date', 'response_time_hours', 'resolution_time_hours',
+    'is_sla_violated',
+]
+INVOICE_METRIC_COLUMNS = [
+    'account_id', 'status', 'invoice_date', 'due_date', 'balance', 'overdue_days', 'disputed',
+]
+
+# A ticket category is a recurring issue with this many tickets in the window
+RECURRING_ISSUE_TICKETS = 2
+RECURRING_ISSUE_WINDOW_DAYS = 90
+
+# Silver tables and the aggregator attributes holding them
+SILVER_TABLES = {
+    'account': 'accounts',
+    'opportunity': 'opportunities',
+    'opportunity_line_item': 'line_items',
+    'contact': 'contacts',
+    'ticket': 'tickets',
+    'invoice': 'invoices',
+}
+
+# Silver tables (by attribute) whose rows belong to an account through account_id
+ACCOUNT_ROW_TABLES = ['contacts', 'tickets', 'invoices']
+
+# Timeline events of these silver tables are written while a streaming build reads them
+TIMELINE_EVENTS = {
+    'opportunity': opportunity_events,
+    'ticket': ticket_events,
+    'invoice': invoice_events,
+}
+
+# Change timestamp columns, preferred first
+WATERMARK_COLUMNS = ['last_modified_date', '_processed_at']
+
+# Row id columns of the silver tables whose rows belong to one account (line items
+# through their opportunity). Each build records the owner of every row, so the
+# next incremental build also rebuilds accounts that lost a moved or deleted row.
+ROW_ID_COLUMNS = {
+    'opportunity': 'opportunity_id',
+    'opportunity_line_item': 'line_item_id',
+    'ticket': 'ticket_id',
+    'invoice': 'invoice_id',
+}
+
+# Gold tables and their row id columns
+GOLD_TABLE_IDS = {
+    'customer_360_metrics': 'account_id',
+    'risk_alerts': 'alert_id',
+    'recommendations': 'recommendation_id',
+    'customer_timeline': 'event_id',
+}
+
+# Columns holding when a row was built, which differ between an incremental and a full build
+BUILD_TIME_COLUMNS = ['_calculated_at', 'created_at']
+
+# Watermarks and snapshot files of the last build, next to the gold tables
+BUILD_STATE_FILE = 'gold_build_state.json'
+
+# Accounts aggregated together in a streaming build
+DEFAULT_STREAM_BATCH_SIZE = 100_000
+
+# Accounts with the most opportunities, listed in run metrics
+LARGEST_ACCOUNTS = 10
+
+# risk_alerts and recommendations columns, in output order
+RISK_ALERT_COLUMNS = [
+    'alert_id', 'account_id', 'account_name', 'alert_type', 'severity', 'message', 'recommendation',
+    'action_type', 'created_at',
+]
+RECOMMENDATION_COLUMNS = [
+    'recommendation_id', 'account_id', 'account_name', 'priority', 'category', 'title', 'description',
+    'expected_outcome', 'estimated_impact', 'action_type', 'action_data', 'created_at', 'status',
+]
+
+
+def total_won_revenue(opportunities: pd.DataFrame) -> float:
+    """Won deal value across all opportunities"""
+    won = (opportunities['is_won'] == True).to_numpy()
+    return np.nansum(opportunities['deal_value'].to_numpy(dtype=float)[won])
+
+
+def opportunity_accounts(opportunities: pd.DataFrame) -> pd.Series:
+    """
+    account_id per opportunity_id
+
+    A repeated opportunity id (e.g. a reprocessed row) maps to the account of
+    its first row, the row line items are joined to.
+    """
+    return opportunities.drop_duplicates('opportunity_id').set_index('opportunity_id')['account_id']
+
+
+def revenue_concentration(annual_revenue: Any, total_revenue_all: float) -> Any:
+    """Annual revenue as a percentage of all accounts' won revenue"""
+    return annual_revenue / total_revenue_all * 100 if total_revenue_all > 0 else 0
+
+
+def _labels(labels: List[str], codes: np.ndarray, index: pd.Index) -> pd.Series:
+    """String column holding labels[code] per row, without converting each string"""
+    return pd.Series(pd.array(labels).take(codes.astype(np.intp)), index=index)
+
+
+def shard_of(account_ids: Any, shards: int) -> np.ndarray:
+    """Shard number per account id; opportunities and line items follow their account"""
+    return account_hashes(account_ids) % np.uint64(shards)
+
+
+def _split(df: pd.DataFrame, parts: np.ndarray, shards: int) -> List[pd.DataFrame]:
+    """Rows of df per shard number in parts (-1 for none), in table order within each shard"""
+    order = np.argsort(parts, kind='stable')
+    bounds = np.searchsorted(parts[order], np.arange(shards + 1))
+    # One take for all shards; many small takes of string columns are far slower
+    grouped = df.take(order)
+    return [grouped.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _route(keys: np.ndarray, targets: np.ndarray, lookup: np.ndarray) -> np.ndarray:
+    """targets[i] for each lookup value equal to keys[i] (keys sorted), or -1 when absent"""
+    if len(keys) == 0:
+        return np.full(len(lookup), -1, dtype=targets.dtype)
+    position = np.minimum(np.searchsorted(keys, lookup), len(keys) - 1)
+    return np.where(keys[position] == lookup, targets[position], -1)
+
+
+def _build_shard(aggregator: 'GoldLayerAggregator',
+                 output_dir: Path) -> Tuple[Dict[str, Tuple[str, List[str]]], List[Dict[str, Any]]]:
+    """
+    Build one shard's gold tables and write them to parquet (runs in a worker process)
+
+    Columns of records or lists are written as JSON text, so the merge reads back
+    exactly the values a single-process build holds.
+
+    Returns:
+        ((file, JSON columns) per non-empty table, the shard's run metrics stages)
+    """
+    metrics = aggregator.run_metrics
+    with metrics.sampling(), metrics.stage(output_dir.name, rows=len(aggregator.accounts)):
+        tables = aggregator.build_gold_tables()
+
+    files = {}
+    for table_name, df in tables.items():
+        if df.empty:
+            continue
+        json_columns = [
+            column for column in df.columns
+            if df[column].dtype == object and df[column].map(lambda v: isinstance(v, (dict, list))).any()
+        ]
+        path = str(output_dir / f'{table_name}.parquet')
+        df.assign(**{column: df[column].map(json.dumps) for column in json_columns}).to_parquet(path, index=False)
+        files[table_name] = (path, json_columns)
+    return files, metrics.stages
+
+
+def _read_shard_table(path: str, json_columns: List[str]) -> pd.DataFrame:
+    """Table written by _build_shard"""
+    df = pd.read_parquet(path)
+    for column in json_columns:
+        df[column] = df[column].map(json.loads).astype(object)
+    return df
+
+
+def _range_boundaries(samples: List[np.ndarray], buckets: int) -> np.ndarray:
+    """Account ids splitting the sampled ids into `buckets` sorted ranges of about equal size"""
+    sample = np.sort(np.concatenate(samples)) if samples else np.array([], dtype=object)
+    if len(sample) == 0:
+        return sample
+    return sample[(np.arange(1, buckets) * len(sample)) // buckets]
+
+
+class _BatchWriters:
+    """Parquet files under a spill directory, one per batch, appended to as rows are routed"""
+
+    def __init__(self, spill: Path, name: str):
+        self.spill = spill
+        self.name = name
+        self.writers: Dict[int, pq.ParquetWriter] = {}
+
+    def __enter__(self) -> '_BatchWriters':
+        return self
+
+    def __exit__(self, *exc_info):
+        for writer in self.writers.values():
+            writer.close()
+
+    def append(self, table: pa.Table, target: np.ndarray):
+        """
+        Append each row to `<name>.parquet` in its target batch's directory
+
+        Rows with target -1 are dropped. Rows keep their order within a batch.
+        """
+        if len(target) == 0:
+            return
+        order = np.argsort(target, kind='stable')
+        target = target[order]
+        table = table.take(order)
+        starts = np.r_[0, np.flatnonzero(np.diff(target)) + 1]
+        ends = np.r_[starts[1:], len(target)]
+        for start, end in zip(starts, ends):
+            if target[start] < 0:
+                continue
+            if target[start] not in self.writers:
+                batch_dir = self.spill / f'batch_{target[start]:06d}'
+                batch_dir.mkdir(exist_ok=True)
+                self.writers[target[start]] = pq.ParquetWriter(batch_dir / f'{self.name}.parquet', table.schema)
+            self.writers[target[start]].write_table(table.slice(start, end - start))
+
 
 class GoldLayerAggregator:
     """Create Gold layer analytics from Silver layer data"""
 
-    def __init__(self, config_path: str, metrics_config_path: str):
-        """Initialize aggregator with configuration"""
+    def __init__(self, config_path: str, metrics_config_path: str, seed: Optional[int] = None,
+                 workers: int = 1, load_silver: bool = True, silver_files: Optional[Dict[str, str]] = None,
+                 trace_memory: bool = False, profile: Optional[str] = None):
+        """
+        Initialize aggregator with configuration
+
+        With load_silver False, silver tables are not loaded here; only
+        create_gold_layer_streaming can be used, which reads them in batches.
+        silver_files names the file to read per silver table instead of the
+        latest one in silver_path. Each build writes its stage timings and
+        memory to gold_run_metrics_<timestamp>.json; trace_memory adds
+        tracemalloc peaks and profile ('cprofile' or 'pyinstrument') a profile
+        of the build.
+        """
         with open(config_path, 'r') as f:
             self.config = json.load(f)
 
         with open(metrics_config_path, 'r') as f:
             self.metrics_config = json.load(f)
 
+        # Derived metrics and rules are compiled once, and their column references
+        # checked, before any data is read
+        self.derived_metrics = self._compile_derived_metrics()
+        self.alert_rules = RuleSet.from_config(self.metrics_config['alert_triggers'], RISK_ALERT_COLUMNS,
+                                               'alert_id', SCORED_METRIC_COLUMNS)
+        self.recommendation_rules = RuleSet.from_config(self.metrics_config['recommendation_rules'],
+                                                        RECOMMENDATION_COLUMNS, 'recommendation_id',
+                                                        SCORED_METRIC_COLUMNS)
+
+        # Simulated values are drawn per account from this seed and the account id,
+        # so they do not depend on the other accounts or on sharding
+        if seed is None:
+            seed = self.metrics_config.get('simulation', {}).get('seed')
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy)
+        self.seed = seed
+        self.workers = workers
+        self.silver_files = silver_files or {}
+        self.run_metrics = RunMetrics(trace_memory=trace_memory)
+        self.profile = profile
+        self.run_metrics_file: Optional[str] = None
+
+        # Reference times shared by every account and shard of a build
+        self.as_of = datetime.now()
+        self.built_at = datetime.utcnow()
+        # Won revenue of all accounts, set on aggregators restricted to some of them
+        # so revenue_concentration (and rules reading it) match a full build
+        self.won_revenue_total: Optional[float] = None
+
         self.silver_path = Path(self.config.get('silver_path', './data/silver'))
         self.gold_path = Path(self.config.get('gold_path', './data/gold'))
         self.gold_path.mkdir(parents=True, exist_ok=True)
 
         # Load silver data
-        self.accounts = self.load_latest_silver('account')
-        self.opportunities = self.load_latest_silver('opportunity')
-        self.line_items = self.load_latest_silver('opportunity_line_item')
-        self.contacts = self.load_latest_silver('contact')
+        if load_silver:
+            with self.run_metrics.stage('load_silver'):
+                self.accounts = self.load_latest_silver('account')
+                self.opportunities = self.load_latest_silver('opportunity')
+                self.line_items = self.load_latest_silver('opportunity_line_item')
+                self.contacts = self.load_latest_silver('contact')
+                self.tickets = self.load_latest_silver('ticket')
+                self.invoices = self.load_latest_silver('invoice')
 
         logger.info("Gold layer aggregator initialized")
 
-    def load_latest_silver(self, table_name: str) -> pd.DataFrame:
-        """Load the most recent silver file for a table"""
+    def _compile_derived_metrics(self) -> List[Tuple[str, Expression]]:
+        """
+        The derived_metrics of the metrics config as (column, compiled calculation)
+
+        Each calculation may read customer_360_metrics columns other than
+        derived metrics listed after it (or itself).
+        """
+        derived = [
+            (metric['name'], compile_expression(metric['calculation']))
+            for metric in self.metrics_config.get('derived_metrics', {}).get('metrics', [])
+        ]
+        pending = {name for name, _ in derived}
+        for name, expression in derived:
+            if name not in CUSTOMER_360_COLUMNS:
+                raise ValueError(f"Derived metric '{name}' is not a customer_360_metrics column")
+            expression.validate(set(CUSTOMER_360_COLUMNS) - pending)
+            pending.discard(name)
+        return derived
+
+    def latest_silver_file(self, table_name: str) -> Optional[Path]:
+        """Most recent silver file for a table, if any"""
+        if table_name in self.silver_files:
+            return Path(self.silver_files[table_name])
+
         # Use exact match pattern to avoid matching similar table names
         # e.g., 'opportunity' should not match 'opportunity_line_item'
         files = []
@@ -62,11 +394,20 @@ class GoldLayerAggregator:
 
         if not files:
             logger.warning(f"No silver files found for {table_name}")
+            return None
+        return max(files, key=lambda x: x.stat().st_mtime)
+
+    def load_latest_silver(self, table_name: str) -> pd.DataFrame:
+        """Load the most recent silver file for a table"""
+        latest_file = self.latest_silver_file(table_name)
+        if latest_file is None:
             return pd.DataFrame()
 
-        latest_file = max(files, key=lambda x: x.stat().st_mtime)
         logger.info(f"Loading silver file: {latest_file}")
-        return pd.read_parquet(latest_file)
+        with self.run_metrics.stage(table_name) as stage:
+            df = pd.read_parquet(latest_file)
+            stage['rows'] = len(df)
+        return df
 
     def calculate_customer_360_metrics(self) -> pd.DataFrame:
         """Calculate core Customer 360 KPIs with persona-based metrics"""
@@ -78,7 +419,6 @@ class GoldLayerAggregator:
             subsidiary_config = json.load(f)
 
         subsidiaries = subsidiary_config['subsidiaries']
-        subsidiary_ids = [sub['id'] for sub in subsidiaries]
 
         # Join opportunities with accounts
         opps_with_accounts = self.opportunities.merge(
@@ -87,360 +427,331 @@ class GoldLayerAggregator:
             how='left'
         )
 
-        # Calculate metrics per account
-        account_metrics = []
-
-        for account_id in self.accounts['account_id'].unique():
-            account_data = self.accounts[self.accounts['account_id'] == account_id].iloc[0]
-            account_opps = opps_with_accounts[opps_with_accounts['account_id'] == account_id]
-
-            # ===== FINANCIAL METRICS (Board, CEO, Billing) =====
-            # Calculate CLV (sum of all closed-won deals)
-            clv = account_opps[account_opps['is_won'] == True]['deal_value'].sum()
-
-            # Calculate Annual Revenue (current year closed-won)
-            current_year = datetime.now().year
-            annual_revenue = account_opps[
-                (account_opps['is_won'] == True) &
-                (pd.to_datetime(account_opps['close_date']).dt.year == current_year)
-            ]['deal_value'].sum()
-
-            # Previous year revenue for comparison
-            previous_year_revenue = account_opps[
-                (account_opps['is_won'] == True) &
-                (pd.to_datetime(account_opps['close_date']).dt.year == current_year - 1)
-            ]['deal_value'].sum()
-
-            # Last 3 years revenue for trend analysis (Board Chairman)
-            three_year_revenue = []
-            for year in range(current_year - 2, current_year + 1):
-                year_revenue = account_opps[
-                    (account_opps['is_won'] == True) &
-                    (pd.to_datetime(account_opps['close_date']).dt.year == year)
-                ]['deal_value'].sum()
-                three_year_revenue.append(year_revenue)
-
-            # Calculate MRR (assuming subscription-based revenue)
-            mrr = annual_revenue / 12 if annual_revenue > 0 else 0
-
-            # Quarterly revenue (last 4 quarters) for Sales Personnel
-            quarterly_revenue = []
-            for q in range(4):
-                quarter_end = datetime.now() - timedelta(days=q*90)
-                quarter_start = quarter_end - timedelta(days=90)
-                q_revenue = account_opps[
-                    (account_opps['is_won'] == True) &
-                    (pd.to_datetime(account_opps['close_date']) >= quarter_start) &
-                    (pd.to_datetime(account_opps['close_date']) <= quarter_end)
-                ]['deal_value'].sum()
-                quarterly_revenue.append(q_revenue)
-
-            # YoY Growth
-            yoy_growth = 0
-            if previous_year_revenue > 0:
-                yoy_growth = ((annual_revenue - previous_year_revenue) / previous_year_revenue) * 100
-
-            # Revenue concentration risk (Board Chairman)
-            total_revenue_all = opps_with_accounts[opps_with_accounts['is_won'] == True]['deal_value'].sum()
-            revenue_concentration = (annual_revenue / total_revenue_all * 100) if total_revenue_all > 0 else 0
-
-            # ===== OPERATIONAL METRICS (Operations, Service Management) =====
-            # Support tickets (simulated - would connect to actual support system)
-            open_tickets = np.random.randint(0, 15)
-            closed_tickets = np.random.randint(20, 100)
-            total_tickets = open_tickets + closed_tickets
-            avg_resolution_time = np.random.uniform(2, 48)  # hours
-            avg_response_time = np.random.uniform(0.5, 4)  # hours
-            sla_compliance = np.random.uniform(85, 99)  # percentage
-            recurring_issues = np.random.randint(0, 5)  # count of recurring problems
-
-            # ===== SALES METRICS (Sales Personnel) =====
-            # Calculate active services (unique products from line items)
-            account_line_items = self.line_items.merge(
-                account_opps[['opportunity_id']], on='opportunity_id'
-            )
-            active_services = account_line_items['product_id'].nunique()
-
-            # Pipeline metrics
-            open_opportunities = account_opps[account_opps['is_closed'] == False]
-            pipeline_value = open_opportunities['deal_value'].sum()
-            open_opps_count = len(open_opportunities)
-
-            # Next close opportunity
-            next_close_opp = open_opportunities.sort_values('close_date').head(1)
-            next_close_date = next_close_opp['close_date'].iloc[0] if len(next_close_opp) > 0 else None
-            next_close_value = next_close_opp['deal_value'].iloc[0] if len(next_close_opp) > 0 else 0
-            next_close_probability = next_close_opp['win_probability'].iloc[0] if len(next_close_opp) > 0 else 0
-
-            # Win rate
-            total_closed_opps = len(account_opps[account_opps['is_closed'] == True])
-            won_opps = len(account_opps[account_opps['is_won'] == True])
-            win_rate = (won_opps / total_closed_opps * 100) if total_closed_opps > 0 else 0
-
-            # Average deal size
-            avg_deal_size = account_opps[account_opps['is_won'] == True]['deal_value'].mean()
-
-            # Sales cycle length
-            closed_opps_with_dates = account_opps[account_opps['is_closed'] == True].copy()
-            if len(closed_opps_with_dates) > 0:
-                closed_opps_with_dates['cycle_days'] = (
-                    pd.to_datetime(closed_opps_with_dates['close_date']) -
-                    pd.to_datetime(closed_opps_with_dates.get('created_date', datetime.now()))
-                ).dt.days
-                avg_sales_cycle = closed_opps_with_dates['cycle_days'].mean()
-            else:
-                avg_sales_cycle = 0
-
-            # ===== BILLING METRICS (Billing Personnel) =====
-            # Payment metrics (simulated)
-            overdue_invoices = np.random.randint(0, 5)
-            overdue_amount = overdue_invoices * np.random.uniform(1000, 50000)
-            days_overdue = np.random.randint(0, 60) if overdue_invoices > 0 else 0
-            disputed_invoices = np.random.randint(0, 3)
-            credit_hold = overdue_amount > 100000 or days_overdue > 45
-            billing_accuracy = np.random.uniform(95, 100)  # percentage
-            payment_terms = np.random.choice(['Net 30', 'Net 45', 'Net 60'])
-
-            # ===== ACCOUNT MANAGEMENT METRICS (Account Management) =====
-            # Renewal opportunities
-            renewal_opps = account_opps[
-                (account_opps['is_closed'] == False) &
-                (pd.to_datetime(account_opps['close_date']) <= datetime.now() + timedelta(days=180))
-            ]
-            upcoming_renewals = len(renewal_opps)
-            renewal_value = renewal_opps['deal_value'].sum()
-
-            # Contract expiry (simulated)
-            contract_end_date = datetime.now() + timedelta(days=np.random.randint(30, 730))
-            days_to_renewal = (contract_end_date - datetime.now()).days
-
-            # Customer satisfaction (simulated - would use actual NPS/CSAT data)
-            nps_score = np.random.randint(-20, 80)
-            csat_score = np.random.uniform(3, 5)  # 1-5 scale
-
-            # CES (Customer Effort Score) - 1-7 scale (7 = very easy, 1 = very difficult)
-            # Simulated based on operational metrics: SLA compliance, support tickets, etc.
-            # Higher SLA compliance and fewer tickets = easier to do business with
-            base_ces = 5.0  # Average baseline
-            if sla_compliance > 90:
-                base_ces += 0.8
-            elif sla_compliance < 75:
-                base_ces -= 1.0
-            if open_tickets > 3:
-                base_ces -= 0.5
-            if recurring_issues > 0:
-                base_ces -= 0.3
-            # Add some randomness
-            ces_score = round(max(1.0, min(7.0, base_ces + np.random.uniform(-0.5, 0.5))), 1)
-
-            # Engagement metrics
-            last_interaction_days = np.random.randint(1, 90)
-            qbr_scheduled = np.random.choice([True, False])
-            executive_sponsor_engaged = np.random.choice([True, False])
-
-            # ===== RETENTION METRICS (CEO, Board) =====
-            # Customer segment profitability
-            total_cost_to_serve = annual_revenue * np.random.uniform(0.3, 0.7)  # Simulated
-            profit_margin = ((annual_revenue - total_cost_to_serve) / annual_revenue * 100) if annual_revenue > 0 else 0
-
-            # Retention probability (based on multiple factors)
-            retention_probability = np.random.uniform(60, 95)
-
-            # ===== SUBSIDIARY RELATIONSHIPS =====
-            # Assign 1-3 subsidiaries to this customer
-            num_subsidiaries = np.random.choice([1, 2, 3], p=[0.4, 0.4, 0.2])
-            customer_subsidiaries = np.random.choice(subsidiary_ids, size=num_subsidiaries, replace=False).tolist()
-
-            # Build subsidiary details with services and metrics
-            subsidiary_details = []
-            for sub_id in customer_subsidiaries:
-                subsidiary = next((s for s in subsidiaries if s['id'] == sub_id), None)
-                if not subsidiary:
-                    continue
-
-                # Assign 2-5 random services from this subsidiary
-                num_services = np.random.randint(2, min(6, len(subsidiary['services']) + 1))
-                assigned_services = np.random.choice(subsidiary['services'], size=num_services, replace=False).tolist()
-
-                # Calculate subsidiary-specific metrics (split overall metrics)
-                # Revenue distribution (weighted by number of services)
-                revenue_weight = num_services / sum([len(np.random.choice(next((s for s in subsidiaries if s['id'] == sid), {'services': []}).get('services', ['']), size=np.random.randint(2, 6), replace=False)) for sid in customer_subsidiaries])
-                sub_annual_revenue = annual_revenue * revenue_weight if len(customer_subsidiaries) > 0 else annual_revenue
-
-                # Service tickets distribution
-                sub_tickets = int(total_tickets * revenue_weight) if len(customer_subsidiaries) > 0 else total_tickets
-
-                subsidiary_details.append({
-                    'subsidiary_id': sub_id,
-                    'subsidiary_name': subsidiary['name'],
-                    'subsidiary_short_name': subsidiary['short_name'],
-                    'services': assigned_services,
-                    'service_count': len(assigned_services),
-                    'annual_revenue': round(sub_annual_revenue, 2),
-                    'tickets_count': sub_tickets,
-                    'relationship_start': (datetime.now() - timedelta(days=np.random.randint(365, 1825))).isoformat(),
-                    'primary': sub_id == customer_subsidiaries[0]  # First subsidiary is primary
-                })
-
-            # Identify primary subsidiary
-            primary_subsidiary = customer_subsidiaries[0] if customer_subsidiaries else None
-
-            account_metrics.append({
-                'account_id': account_id,
-                'account_name': account_data['account_name'],
-                'region': account_data.get('region', 'Unknown'),
-                'customer_since': account_data.get('customer_since'),
-
-                # Financial Metrics
-                'customer_lifetime_value': clv,
-                'monthly_recurring_revenue': mrr,
-                'annual_revenue': annual_revenue,
-                'previous_year_revenue': previous_year_revenue,
-                'yoy_growth': yoy_growth,
-                'quarterly_revenue': json.dumps([float(x) for x in quarterly_revenue]),  # Convert to proper JSON
-                'three_year_revenue': json.dumps([float(x) for x in three_year_revenue]),  # Convert to proper JSON
-                'revenue_concentration': revenue_concentration,
-                'profit_margin': profit_margin,
-                'total_cost_to_serve': total_cost_to_serve,
-
-                # Sales Metrics
-                'active_services': active_services,
-                'win_rate': win_rate,
-                'total_opportunities': len(account_opps),
-                'won_opportunities': won_opps,
-                'open_opportunities': open_opps_count,
-                'pipeline_value': pipeline_value,
-                'next_close_date': next_close_date,
-                'next_close_value': next_close_value,
-                'next_close_probability': next_close_probability,
-                'avg_deal_size': avg_deal_size,
-                'avg_sales_cycle_days': avg_sales_cycle,
-
-                # Operational/Support Metrics
-                'open_tickets': open_tickets,
-                'closed_tickets': closed_tickets,
-                'total_tickets': total_tickets,
-                'avg_resolution_time_hours': avg_resolution_time,
-                'avg_response_time_hours': avg_response_time,
-                'sla_compliance_pct': sla_compliance,
-                'recurring_issues_count': recurring_issues,
-
-                # Billing Metrics
-                'overdue_invoices': overdue_invoices,
-                'overdue_amount': overdue_amount,
-                'days_overdue': days_overdue,
-                'disputed_invoices': disputed_invoices,
-                'credit_hold': credit_hold,
-                'billing_accuracy_pct': billing_accuracy,
-                'payment_terms': payment_terms,
-
-                # Account Management Metrics
-                'upcoming_renewals_count': upcoming_renewals,
-                'upcoming_renewal_value': renewal_value,
-                'days_to_renewal': days_to_renewal,
-                'contract_end_date': contract_end_date,
-                'nps_score': nps_score,
-                'csat_score': csat_score,
-                'ces_score': ces_score,
-                'last_interaction_days': last_interaction_days,
-                'qbr_scheduled': qbr_scheduled,
-                'executive_sponsor_engaged': executive_sponsor_engaged,
-                'retention_probability': retention_probability,
-
-                # Subsidiary Relationships
-                'subsidiaries': json.dumps(subsidiary_details),  # JSON array of subsidiary relationships
-                'subsidiary_count': len(customer_subsidiaries),
-                'primary_subsidiary': primary_subsidiary,
-
-                '_calculated_at': datetime.utcnow()
-            })
-
-        return pd.DataFrame(account_metrics)
+        account_ids = self.accounts['account_id'].unique()
+        now = self.as_of
+        total_revenue_all = (self.won_revenue_total if self.won_revenue_total is not None
+                             else total_won_revenue(self.opportunities))
 
-    def calculate_health_score(self, account_metrics: pd.DataFrame) -> pd.DataFrame:
-        """Calculate customer health score (0-100)"""
-        logger.info("Calculating health scores...")
+        # Financial, sales, pipeline and renewal metrics in a few groupby passes
+        with self.run_metrics.stage('opportunity_metrics', rows=len(opps_with_accounts)):
+            opp_metrics = self._opportunity_metrics(opps_with_accounts, account_ids, now, total_revenue_all)
 
-        # Weights from config
-        weights = self.metrics_config['risk_metrics']['metrics'][1]['weights']
-
-        for idx, row in account_metrics.iterrows():
-            # Payment history score (simulated - randomized for diversity)
-            # 65% Healthy (80-100), 28.5% At-Risk (50-80), 6.5% Critical (0-50)
-            health_category = np.random.choice(['Healthy', 'At-Risk', 'Critical'], p=[0.65, 0.285, 0.065])
-            if health_category == 'Healthy':
-                base_score = np.random.uniform(80, 100)
-            elif health_category == 'At-Risk':
-                base_score = np.random.uniform(50, 80)
-            else:
-                base_score = np.random.uniform(20, 50)
+        # Active services, contracted value and product mix from line items joined to accounts once
+        with self.run_metrics.stage('line_item_rollups', rows=len(self.line_items)):
+            product_metrics = account_rollups(account_line_items(self.line_items, self.opportunities), account_ids)
 
-            payment_score = base_score + np.random.uniform(-5, 5)
-            support_score = base_score + np.random.uniform(-8, 8)
-            engagement_score = base_score + np.random.uniform(-10, 10)
+        # Support and billing metrics from tickets and invoices
+        with self.run_metrics.stage('support_billing_metrics', rows=len(self.tickets) + len(self.invoices)):
+            support_billing = self._support_billing_metrics(account_ids, now)
 
-            # Usage trend score (based on YoY growth)
-            usage_score = min(100, max(0, 50 + row['yoy_growth']))
+        # First account row per account_id
+        account_rows = self.accounts.drop_duplicates('account_id').set_index('account_id').reindex(account_ids)
 
-            # Calculate weighted health score
-            health_score = (
-                payment_score * weights['payment_history'] +
-                support_score * weights['support_tickets'] +
-                usage_score * weights['usage_trends'] +
-                engagement_score * weights['engagement']
+        # Simulated satisfaction, engagement and subsidiary metrics, one vectorized
+        # draw per column from each account's own streams
+        with self.run_metrics.stage('simulated_metrics', rows=len(account_ids)):
+            simulated = simulate_account_metrics(
+                account_ids, opp_metrics['annual_revenue'].to_numpy(), support_billing['total_tickets'].to_numpy(),
+                subsidiaries, now, self.seed
+            )
+            simulated['ces_score'] = self._customer_effort_scores(
+                support_billing, simulated.pop('ces_adjustment').to_numpy()
             )
 
-            # Categorize health status
-            if health_score >= 80:
-                health_status = 'Healthy'
-            elif health_score >= 50:
-                health_status = 'At-Risk'
-            else:
-                health_status = 'Critical'
+        account_metrics = pd.DataFrame({
+            'account_id': account_ids,
+            'account_name': account_rows['account_name'].to_numpy(),
+            'region': (account_rows['region'] if 'region' in account_rows.columns
+                       else pd.Series('Unknown', index=account_rows.index)).to_numpy(),
+            'customer_since': (account_rows['customer_since'] if 'customer_since' in account_rows.columns
+                               else pd.Series(None, index=account_rows.index, dtype=object)).to_numpy(),
+        })
+
+        derived = {name for name, _ in self.derived_metrics}
+        for column in CUSTOMER_360_COLUMNS[4:]:
+            if column in derived:
+                continue
+            source = next(df for df in (opp_metrics, product_metrics, support_billing, simulated)
+                          if column in df.columns)
+            account_metrics[column] = source[column].to_numpy()
+
+        # Derived metrics from the metrics config, in their configured order
+        for column, expression in self.derived_metrics:
+            account_metrics[column] = expression.evaluate(account_metrics)
+
+        # Column order follows the persona groups of the gold table
+        account_metrics = account_metrics[CUSTOMER_360_COLUMNS]
+        account_metrics['_calculated_at'] = self.built_at
+        return account_metrics
 
-            account_metrics.at[idx, 'health_score'] = round(health_score, 2)
-            account_metrics.at[idx, 'health_status'] = health_status
+    def _opportunity_metrics(self, opps: pd.DataFrame, account_ids: np.ndarray, now: datetime,
+                             total_revenue_all: float) -> pd.DataFrame:
+        """
+        Opportunity-derived metrics for every account in a few vectorized passes
+
+        Sums accumulate in table order per account (np.bincount), so they match
+        summing each account's opportunities one at a time.
+
+        Args:
+            opps: Opportunities joined to accounts
+            account_ids: Accounts to report, in output order
+            now: Reference time for current-year, quarter and renewal windows
+            total_revenue_all: Won revenue of all accounts, for revenue concentration
+
+        Returns:
+            DataFrame indexed by account_id
+        """
+        n = len(account_ids)
+        codes = pd.Index(account_ids).get_indexer(opps['account_id'])
+        known = codes >= 0
+        opps, codes = opps[known], codes[known]
+
+        current_year = now.year
+        close_date = pd.to_datetime(opps['close_date'])
+        close_year = close_date.dt.year.to_numpy()
+        won = (opps['is_won'] == True).to_numpy()
+        closed = (opps['is_closed'] == True).to_numpy()
+        deal_value = opps['deal_value'].to_numpy(dtype=float)
+
+        def count(mask: np.ndarray) -> np.ndarray:
+            return np.bincount(codes[mask], minlength=n)
+
+        def total(mask: np.ndarray, values: np.ndarray = deal_value) -> np.ndarray:
+            values = values[mask]
+            # NaN values are skipped, as in Series.sum(); bincount gives integers for an empty selection
+            present = ~np.isnan(values)
+            return np.bincount(codes[mask][present], weights=values[present], minlength=n).astype(float)
+
+        won_count = count(won)
+        closed_count = count(closed)
+        metrics = pd.DataFrame(index=pd.Index(account_ids, name='account_id'))
+
+        # Financial metrics
+        metrics['customer_lifetime_value'] = total(won)
+        metrics['annual_revenue'] = total(won & (close_year == current_year))
+        metrics['previous_year_revenue'] = total(won & (close_year == current_year - 1))
+        annual_revenue = metrics['annual_revenue'].to_numpy()
+
+        # Last 4 quarters (Sales Personnel) and last 3 years (Board Chairman)
+        quarterly_revenue = []
+        for q in range(4):
+            quarter_end = now - timedelta(days=q*90)
+            quarter_start = quarter_end - timedelta(days=90)
+            in_quarter = ((close_date >= quarter_start) & (close_date <= quarter_end)).to_numpy()
+            quarterly_revenue.append(total(won & in_quarter))
+        three_year_revenue = [total(won & (close_year == year)) for year in range(current_year - 2, current_year + 1)]
+        metrics['quarterly_revenue'] = [json.dumps([float(x) for x in row]) for row in zip(*quarterly_revenue)]
+        metrics['three_year_revenue'] = [json.dumps([float(x) for x in row]) for row in zip(*three_year_revenue)]
+
+        # Revenue concentration risk (Board Chairman)
+        metrics['revenue_concentration'] = revenue_concentration(annual_revenue, total_revenue_all)
+
+        # Sales metrics
+        open_opps = opps[~closed]
+        metrics['total_opportunities'] = count(np.ones(len(codes), dtype=bool))
+        metrics['won_opportunities'] = won_count
+        metrics['open_opportunities'] = count(~closed)
+        metrics['pipeline_value'] = total(~closed)
+
+        # Next close: earliest open opportunity per account
+        next_close = open_opps.sort_values('close_date', kind='stable').drop_duplicates('account_id') \
+            .set_index('account_id').reindex(account_ids)
+        has_next = metrics.index.isin(open_opps['account_id'])
+        metrics['next_close_date'] = np.where(has_next, next_close['close_date'].astype(object), None)
+        metrics['next_close_value'] = np.where(has_next, next_close['deal_value'], 0)
+        metrics['next_close_probability'] = np.where(has_next, next_close['win_probability'], 0)
+
+        won_values = count(won & ~np.isnan(deal_value))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['avg_deal_size'] = np.where(won_values > 0, total(won) / won_values, np.nan)
+
+        # Sales cycle length over closed opportunities
+        created_date = pd.to_datetime(opps['created_date']) if 'created_date' in opps.columns else pd.Timestamp(now)
+        cycle_days = (close_date - created_date).dt.days.to_numpy(dtype=float)
+        cycle_counts = count(closed & ~np.isnan(cycle_days))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['avg_sales_cycle_days'] = np.where(
+                closed_count > 0, total(closed, cycle_days) / cycle_counts, 0
+            )
 
-        return account_metrics
+        # Renewals: open opportunities closing within 180 days
+        renewal = ~closed & (close_date <= now + timedelta(days=180)).to_numpy()
+        metrics['upcoming_renewals_count'] = count(renewal)
+        metrics['upcoming_renewal_value'] = total(renewal)
+
+        return metrics
+
+    def _support_billing_metrics(self, account_ids: np.ndarray, now: datetime) -> pd.DataFrame:
+        """
+        Support and billing metrics for every account from the ticket and invoice tables
+
+        One groupby pass per table, joined onto account_ids in a single reindex.
+        Open tickets and overdue invoices are counted the way the dashboard
+        drill-downs list them. Accounts without tickets have no response,
+        resolution or SLA figures (NaN), as accounts without invoices have no
+        billing accuracy or payment terms.
+
+        Args:
+            account_ids: Accounts to report, in output order
+            now: End of the recurring issue window
+
+        Returns:
+            DataFrame indexed by account_id
+        """
+        tickets = self.tickets.reindex(columns=TICKET_METRIC_COLUMNS)
+        closed = tickets['status'].isin(CLOSED_TICKET_STATUSES)
+        ticket_rows = pd.DataFrame({
+            'account_id': tickets['account_id'],
+            'open': ~closed,
+            'closed': closed,
+            'response': tickets['response_time_hours'].astype(float),
+            'resolution': tickets['resolution_time_hours'].astype(float),
+            'violated': tickets['is_sla_violated'] == True,
+        })
+        support = ticket_rows.groupby('account_id').agg(
+            open_tickets=('open', 'sum'),
+            closed_tickets=('closed', 'sum'),
+            total_tickets=('open', 'size'),
+            avg_resolution_time_hours=('resolution', 'mean'),
+            avg_response_time_hours=('response', 'mean'),
+            sla_violations=('violated', 'sum'),
+        )
 
-    def calculate_churn_risk(self, account_metrics: pd.DataFrame) -> pd.DataFrame:
-        """Calculate churn risk score (0-100)"""
-        logger.info("Calculating churn risk scores...")
+        # Categories with repeated tickets in the window
+        created = pd.to_datetime(tickets['created_date'], errors='coerce')
+        recent = (created >= now - timedelta(days=RECURRING_ISSUE_WINDOW_DAYS)).to_numpy()
+        category_tickets = tickets.loc[recent, ['account_id', 'category']].value_counts()
+        recurring = (category_tickets >= RECURRING_ISSUE_TICKETS).groupby(level='account_id').sum()
+
+        invoices = self.invoices.reindex(columns=INVOICE_METRIC_COLUMNS)
+        overdue_days = invoices['overdue_days'].fillna(0).astype(int)
+        overdue = (invoices['status'] == 'Overdue') | (overdue_days > 0)
+        invoice_rows = pd.DataFrame({
+            'account_id': invoices['account_id'],
+            'overdue': overdue,
+            'overdue_balance': invoices['balance'].astype(float).where(overdue, 0.0),
+            'overdue_days': overdue_days.where(overdue, 0),
+            'disputed': invoices['disputed'] == True,
+            'terms': (pd.to_datetime(invoices['due_date'], errors='coerce')
+                      - pd.to_datetime(invoices['invoice_date'], errors='coerce')).dt.days,
+        })
+        billing = invoice_rows.groupby('account_id').agg(
+            overdue_invoices=('overdue', 'sum'),
+            overdue_amount=('overdue_balance', 'sum'),
+            days_overdue=('overdue_days', 'max'),
+            disputed_invoices=('disputed', 'sum'),
+            invoice_count=('overdue', 'size'),
+        )
 
-        weights = self.metrics_config['risk_metrics']['metrics'][0]['weights']
+        # Payment terms: the account's most common days from invoice to due date, shortest on ties
+        terms = invoice_rows.groupby(['account_id', 'terms']).size().sort_values(ascending=False, kind='stable')
+        terms = terms.reset_index().drop_duplicates('account_id').set_index('account_id')['terms']
+
+        metrics = pd.concat(
+            [support, recurring.rename('recurring_issues_count'), billing, terms.rename('payment_terms')], axis=1
+        ).reindex(pd.Index(account_ids, name='account_id'))
+
+        counts = [
+            'open_tickets', 'closed_tickets', 'total_tickets', 'sla_violations', 'recurring_issues_count',
+            'overdue_invoices', 'days_overdue', 'disputed_invoices', 'invoice_count',
+        ]
+        metrics[counts] = metrics[counts].fillna(0).astype(int)
+        metrics['overdue_amount'] = metrics['overdue_amount'].astype(float).fillna(0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['sla_compliance_pct'] = (1 - metrics['sla_violations'] / metrics['total_tickets']) * 100
+            metrics['billing_accuracy_pct'] = (1 - metrics['disputed_invoices'] / metrics['invoice_count']) * 100
+        metrics['payment_terms'] = ('Net ' + metrics['payment_terms'].astype('Int64').astype(str)) \
+            .astype(object).where(metrics['payment_terms'].notna(), None)
+        return metrics
+
+    @staticmethod
+    def _customer_effort_scores(support: pd.DataFrame, adjustment: np.ndarray) -> np.ndarray:
+        """
+        CES (Customer Effort Score) per account, 1-7 (7 = very easy, 1 = very difficult)
+
+        From a baseline of 5: higher SLA compliance and fewer open or recurring
+        tickets make the account easier to do business with. `adjustment` is
+        the simulated randomness added per account.
+        """
+        sla = support['sla_compliance_pct'].to_numpy(dtype=float)
+        base = 5.0 + np.where(sla > 90, 0.8, np.where(sla < 75, -1.0, 0.0))
+        base -= np.where(support['open_tickets'].to_numpy() > 3, 0.5, 0.0)
+        base -= np.where(support['recurring_issues_count'].to_numpy() > 0, 0.3, 0.0)
+        return np.round(np.clip(base + adjustment, 1.0, 7.0), 1)
+
+    def _risk_metric(self, name: str) -> Dict[str, Any]:
+        """Scoring config for one entry of risk_metrics"""
+        return next(m for m in self.metrics_config['risk_metrics']['metrics'] if m['name'] == name)
 
-        for idx, row in account_metrics.iterrows():
-            # Usage trend risk (negative growth = higher risk)
-            usage_risk = max(0, -row['yoy_growth']) if row['yoy_growth'] < 0 else 0
+    def calculate_health_score(self, account_metrics: pd.DataFrame) -> pd.DataFrame:
+        """Calculate customer health score (0-100)"""
+        logger.info("Calculating health scores...")
 
-            # Payment risk (simulated)
-            payment_risk = 15  # Low default risk
+        # Weights, thresholds and simulation parameters from config
+        config = self._risk_metric('health_score')
+        weights = config['weights']
+        thresholds = config['thresholds']
+        simulation = config['simulation']
+
+        # Payment, support and engagement scores (simulated - randomized for diversity):
+        # each account gets a health category, a base score in that category's range
+        # and per-component noise around it, drawn from its own seed
+        draws = AccountDraws(account_metrics['account_id'], self.seed)
+        probabilities = simulation['category_probabilities']
+        categories = list(probabilities)
+        category = draws.choice('health_category', np.arange(len(categories)), p=list(probabilities.values()))
+        ranges = np.array([simulation['base_score_ranges'][c] for c in categories], dtype=float)
+        base_score = ranges[category, 0] + (ranges[category, 1] - ranges[category, 0]) * draws.random('health_base')
+
+        noise = simulation['component_noise']
+        payment_score = base_score + draws.uniform('payment_noise', -1, 1) * noise['payment_history']
+        support_score = base_score + draws.uniform('support_noise', -1, 1) * noise['support_tickets']
+        engagement_score = base_score + draws.uniform('engagement_noise', -1, 1) * noise['engagement']
+
+        # Usage trend score (based on YoY growth)
+        yoy_growth = account_metrics['yoy_growth'].to_numpy(dtype=float)
+        usage_score = np.clip(np.nan_to_num(50 + yoy_growth, nan=0.0), 0, 100)
+
+        # Calculate weighted health score
+        health_score = (
+            payment_score * weights['payment_history'] +
+            support_score * weights['support_tickets'] +
+            usage_score * weights['usage_trends'] +
+            engagement_score * weights['engagement']
+        )
 
-            # Support issues risk (simulated)
-            support_risk = 10  # Low default risk
+        # Categorize health status
+        account_metrics['health_score'] = np.round(health_score, 2)
+        status = 2 - (health_score >= thresholds['healthy']) - (health_score >= thresholds['at_risk'])
+        account_metrics['health_status'] = _labels(['Healthy', 'At-Risk', 'Critical'], status, account_metrics.index)
 
-            # Engagement risk (inverse of engagement score)
-            engagement_risk = 25  # Moderate default risk
+        return account_metrics
 
-            # Calculate weighted churn risk
-            churn_risk = (
-                usage_risk * weights['usage_trend'] +
-                payment_risk * weights['payment_history'] +
-                support_risk * weights['support_issues'] +
-                engagement_risk * weights['engagement']
-            )
+    def calculate_churn_risk(self, account_metrics: pd.DataFrame) -> pd.DataFrame:
+        """Calculate churn risk score (0-100)"""
+        logger.info("Calculating churn risk scores...")
 
-            # Determine risk level
-            thresholds = self.metrics_config['risk_metrics']['metrics'][0]['thresholds']
-            if churn_risk >= thresholds['high']:
-                risk_level = 'HIGH'
-            elif churn_risk >= thresholds['medium']:
-                risk_level = 'MEDIUM'
-            else:
-                risk_level = 'LOW'
+        config = self._risk_metric('churn_risk_score')
+        weights = config['weights']
+        thresholds = config['thresholds']
+        defaults = config['default_risks']
+
+        # Usage trend risk (negative growth = higher risk)
+        yoy_growth = account_metrics['yoy_growth'].to_numpy(dtype=float)
+        usage_risk = np.where(yoy_growth < 0, -yoy_growth, 0)
+
+        # Payment, support and engagement risks are defaults until their sources are connected
+        churn_risk = (
+            usage_risk * weights['usage_trend'] +
+            defaults['payment_history'] * weights['payment_history'] +
+            defaults['support_issues'] * weights['support_issues'] +
+            defaults['engagement'] * weights['engagement']
+        )
 
-            account_metrics.at[idx, 'churn_risk_score'] = min(100, round(churn_risk, 2))
-            account_metrics.at[idx, 'churn_risk_level'] = risk_level
+        # Determine risk level
+        account_metrics['churn_risk_score'] = np.minimum(100, np.round(churn_risk, 2))
+        level = 2 - (churn_risk >= thresholds['high']) - (churn_risk >= thresholds['medium'])
+        account_metrics['churn_risk_level'] = _labels(['HIGH', 'MEDIUM', 'LOW'], level, account_metrics.index)
 
         return account_metrics
 
@@ -448,351 +759,806 @@ class GoldLayerAggregator:
         """Generate risk alerts based on configured rules"""
         logger.info("Generating risk alerts...")
 
-        alerts = []
-
-        for _, account in account_metrics.iterrows():
-            # High Churn Risk Alert
-            if account['churn_risk_score'] > 70:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A001",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'churn_risk',
-                    'severity': 'HIGH',
-                    'message': f"⚠️ HIGH CHURN RISK: {account['churn_risk_score']:.0f}% probability. Immediate action required.",
-                    'recommendation': 'Schedule Executive Business Review immediately',
-                    'action_type': 'schedule_meeting',
-                    'created_at': datetime.utcnow()
-                })
-
-            # Usage Decline Alert
-            if account['yoy_growth'] < -30:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A002",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'usage_decline',
-                    'severity': 'MEDIUM',
-                    'message': f"📉 Usage declined {abs(account['yoy_growth']):.0f}% year-over-year",
-                    'recommendation': 'Contact customer to understand reduced usage patterns',
-                    'action_type': 'schedule_meeting',
-                    'created_at': datetime.utcnow()
-                })
-
-            # Contract Expiring Soon Alert
-            if 0 < account['days_to_renewal'] < 30:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A003",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'renewal_urgent',
-                    'severity': 'HIGH',
-                    'message': f"🔔 CONTRACT EXPIRING in {account['days_to_renewal']} days!",
-                    'recommendation': 'Initiate renewal conversation immediately',
-                    'action_type': 'initiate_renewal',
-                    'created_at': datetime.utcnow()
-                })
-
-            # High Open Tickets Alert
-            if account['open_tickets'] > 10:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A004",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'service_issues',
-                    'severity': 'HIGH',
-                    'message': f"🎫 {account['open_tickets']} open support tickets - service quality concern",
-                    'recommendation': 'Launch service recovery plan with dedicated engineer',
-                    'action_type': 'assign_engineer',
-                    'created_at': datetime.utcnow()
-                })
-
-            # Payment Overdue Alert
-            if account['overdue_amount'] > 50000:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A005",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'payment_overdue',
-                    'severity': 'HIGH',
-                    'message': f"💰 ${account['overdue_amount']:,.0f} overdue for {account['days_overdue']} days",
-                    'recommendation': 'Escalate to collections team and contact finance lead',
-                    'action_type': 'contact_finance',
-                    'created_at': datetime.utcnow()
-                })
-            elif account['overdue_amount'] > 0:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A006",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'payment_overdue',
-                    'severity': 'MEDIUM',
-                    'message': f"💰 ${account['overdue_amount']:,.0f} overdue for {account['days_overdue']} days",
-                    'recommendation': 'Send payment reminder and follow up',
-                    'action_type': 'contact_finance',
-                    'created_at': datetime.utcnow()
-                })
-
-            # Low NPS Alert
-            if account['nps_score'] < 30:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A007",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'low_satisfaction',
-                    'severity': 'MEDIUM',
-                    'message': f"😞 Low NPS score: {account['nps_score']} - customer satisfaction at risk",
-                    'recommendation': 'Schedule voice-of-customer session to understand concerns',
-                    'action_type': 'schedule_meeting',
-                    'created_at': datetime.utcnow()
-                })
-
-            # Credit Hold Alert
-            if account['credit_hold']:
-                alerts.append({
-                    'alert_id': f"{account['account_id']}_A008",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'alert_type': 'credit_hold',
-                    'severity': 'HIGH',
-                    'message': f"🚫 ACCOUNT ON CREDIT HOLD - Service disruption risk",
-                    'recommendation': 'Resolve outstanding balance immediately',
-                    'action_type': 'contact_finance',
-                    'created_at': datetime.utcnow()
-                })
-
-        return pd.DataFrame(alerts) if alerts else pd.DataFrame()
+        return self.alert_rules.evaluate(account_metrics, created_at=self.built_at)
 
     def generate_recommendations(self, account_metrics: pd.DataFrame) -> pd.DataFrame:
-        """Generate next-best-action recommendations"""
+        """Generate next-best-action recommendations based on configured rules"""
         logger.info("Generating recommendations...")
 
-        recommendations = []
-
-        for _, account in account_metrics.iterrows():
-            # High Churn Risk - Schedule Retention Meeting
-            if account['churn_risk_score'] > 70:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R001",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'HIGH',
-                    'category': 'Retention',
-                    'title': 'Schedule Executive Business Review',
-                    'description': f"Customer has {account['churn_risk_score']:.0f}% churn risk. Schedule immediate EBR with executive sponsor to discuss concerns and renewal strategy.",
-                    'expected_outcome': 'Reduce churn risk by 30%',
-                    'estimated_impact': account['annual_revenue'] * 0.3,
-                    'action_type': 'schedule_meeting',
-                    'action_data': {'meeting_type': 'Executive Business Review', 'attendees': ['CSM', 'Executive Sponsor']},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-            # Contract Expiring Soon
-            if account['days_to_renewal'] < 90 and account['days_to_renewal'] > 0:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R002",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'HIGH' if account['days_to_renewal'] < 30 else 'MEDIUM',
-                    'category': 'Renewal',
-                    'title': 'Initiate Renewal Conversation',
-                    'description': f"Contract expires in {account['days_to_renewal']} days. Start renewal negotiations now to secure commitment.",
-                    'expected_outcome': 'Secure renewal 60 days before expiration',
-                    'estimated_impact': account['annual_revenue'],
-                    'action_type': 'initiate_renewal',
-                    'action_data': {'days_to_renewal': account['days_to_renewal'], 'contract_value': account['annual_revenue']},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-            # High Open Tickets - Service Recovery
-            if account['open_tickets'] > 10:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R003",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'HIGH',
-                    'category': 'Service',
-                    'title': 'Launch Service Recovery Plan',
-                    'description': f"Customer has {account['open_tickets']} open tickets. Assign dedicated support engineer and resolve top 3 critical issues within 48 hours.",
-                    'expected_outcome': 'Reduce open tickets by 50% within 1 week',
-                    'estimated_impact': account['annual_revenue'] * 0.05,
-                    'action_type': 'assign_engineer',
-                    'action_data': {'open_tickets': account['open_tickets'], 'critical_count': 3},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-            # Overdue Invoices - Collections
-            if account['overdue_amount'] > 0:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R004",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'HIGH' if account['overdue_amount'] > 50000 else 'MEDIUM',
-                    'category': 'Finance',
-                    'title': 'Escalate Collections Process',
-                    'description': f"${account['overdue_amount']:,.0f} overdue for {account['days_overdue']} days. Contact finance lead immediately to set up payment plan.",
-                    'expected_outcome': 'Collect 80% within 2 weeks',
-                    'estimated_impact': account['overdue_amount'] * 0.8,
-                    'action_type': 'contact_finance',
-                    'action_data': {'overdue_amount': account['overdue_amount'], 'days_overdue': account['days_overdue']},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-            # Low NPS - Feedback Session
-            if account['nps_score'] < 30:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R005",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'MEDIUM',
-                    'category': 'Experience',
-                    'title': 'Schedule Customer Feedback Session',
-                    'description': f"NPS score of {account['nps_score']} indicates dissatisfaction. Conduct voice-of-customer interview to understand pain points.",
-                    'expected_outcome': 'Improve NPS by 20 points',
-                    'estimated_impact': account['annual_revenue'] * 0.15,
-                    'action_type': 'schedule_meeting',
-                    'action_data': {'meeting_type': 'Voice of Customer', 'focus': 'Pain Points'},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-            # Strong Growth - Upsell Opportunity
-            if account['yoy_growth'] > 20:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R006",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'MEDIUM',
-                    'category': 'Expansion',
-                    'title': 'Present Expansion Opportunity',
-                    'description': f"Revenue grew {account['yoy_growth']:.0f}% YoY. Customer is scaling fast - schedule call to discuss premium tier or additional services.",
-                    'expected_outcome': 'Generate 25% upsell',
-                    'estimated_impact': account['annual_revenue'] * 0.25,
-                    'action_type': 'schedule_meeting',
-                    'action_data': {'meeting_type': 'Expansion Discussion', 'upsell_target': account['annual_revenue'] * 0.25},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-            # High Pipeline Value - Sales Acceleration
-            if account['pipeline_value'] > 100000:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R007",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'MEDIUM',
-                    'category': 'Sales',
-                    'title': 'Accelerate Pipeline Opportunities',
-                    'description': f"${account['pipeline_value']:,.0f} in pipeline. Assign senior sales engineer to help close top 2 deals faster.",
-                    'expected_outcome': 'Close 2 deals within 30 days',
-                    'estimated_impact': account['pipeline_value'] * 0.4,
-                    'action_type': 'assign_engineer',
-                    'action_data': {'pipeline_value': account['pipeline_value'], 'target_deals': 2},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-            # Low Engagement - Adoption Campaign
-            if account['last_interaction_days'] > 60:
-                recommendations.append({
-                    'recommendation_id': f"{account['account_id']}_R008",
-                    'account_id': account['account_id'],
-                    'account_name': account['account_name'],
-                    'priority': 'LOW',
-                    'category': 'Adoption',
-                    'title': 'Launch Product Adoption Campaign',
-                    'description': f"No interaction in {account['last_interaction_days']} days. Send personalized email campaign with product tips and success stories.",
-                    'expected_outcome': 'Increase engagement by 40%',
-                    'estimated_impact': account['annual_revenue'] * 0.1,
-                    'action_type': 'send_campaign',
-                    'action_data': {'last_interaction': account['last_interaction_days'], 'campaign_type': 'Adoption'},
-                    'created_at': datetime.utcnow(),
-                    'status': 'OPEN'
-                })
-
-        return pd.DataFrame(recommendations) if recommendations else pd.DataFrame()
+        return self.recommendation_rules.evaluate(account_metrics, created_at=self.built_at)
 
     def generate_customer_timeline(self) -> pd.DataFrame:
-        """Generate customer journey timeline events"""
+        """
+        Generate customer journey timeline events
+
+        Closed opportunities, support tickets (opened, resolved, SLA violated)
+        and invoices (issued, paid, overdue), sorted by account_id and then
+        newest first, so readers can slice one account's events as they are.
+        """
         logger.info("Generating customer timeline...")
+        return build_timeline(self.opportunities, self.tickets, self.invoices)
+
+    def build_gold_tables(self) -> Dict[str, pd.DataFrame]:
+        """Compute every gold table from the loaded silver data"""
+        if self.workers > 1:
+            return self.build_sharded()
+
+        tables = self.build_account_tables()
+        with self.run_metrics.stage('customer_timeline',
+                                    rows=len(self.opportunities) + len(self.tickets) + len(self.invoices)):
+            tables['customer_timeline'] = self.generate_customer_timeline()
+        return tables
+
+    def build_account_tables(self) -> Dict[str, pd.DataFrame]:
+        """Compute the per-account gold tables: customer 360 metrics, alerts and recommendations"""
+        stage = self.run_metrics.stage
+        with stage('customer_360_metrics', rows=len(self.accounts)):
+            customer_360 = self.calculate_customer_360_metrics()
+        with stage('health_score', rows=len(customer_360)):
+            customer_360 = self.calculate_health_score(customer_360)
+        with stage('churn_risk', rows=len(customer_360)):
+            customer_360 = self.calculate_churn_risk(customer_360)
+
+        with stage('risk_alerts', rows=len(customer_360)) as record:
+            risk_alerts = self.generate_risk_alerts(customer_360)
+            record['rows_out'] = len(risk_alerts)
+        with stage('recommendations', rows=len(customer_360)) as record:
+            recommendations = self.generate_recommendations(customer_360)
+            record['rows_out'] = len(recommendations)
+
+        return {
+            'customer_360_metrics': customer_360,
+            'risk_alerts': risk_alerts,
+            'recommendations': recommendations,
+        }
 
-        events = []
-
-        # Add opportunity events
-        for _, opp in self.opportunities.iterrows():
-            if opp['is_closed']:
-                event_type = 'RENEWAL' if opp['is_won'] else 'OPPORTUNITY_LOST'
-                severity = 'HIGH' if opp['is_won'] else 'MEDIUM'
-
-                events.append({
-                    'event_id': f"OPP_{opp['opportunity_id']}",
-                    'account_id': opp['account_id'],
-                    'event_type': event_type,
-                    'event_title': f"Opportunity: {opp['opportunity_name']}",
-                    'event_description': f"{opp['stage']} - ${opp['deal_value']:,.2f}",
-                    'event_date': opp['close_date'],
-                    'severity': severity,
-                    'related_amount': opp['deal_value'],
-                    'status': 'RESOLVED'
-                })
-
-        return pd.DataFrame(events) if events else pd.DataFrame()
-
-    def create_gold_layer(self) -> Dict[str, Any]:
-        """Create all gold layer tables"""
+    # ------------------------------------------------------------------
+    # Sharded builds
+    # ------------------------------------------------------------------
+
+    def shard_subsets(self, shards: int) -> List['GoldLayerAggregator']:
+        """
+        This aggregator split into hash partitions of the accounts, each built in a single process
+
+        Every silver table is hashed once and split into all shards in one pass.
+        """
+        won_revenue_total = (self.won_revenue_total if self.won_revenue_total is not None
+                             else total_won_revenue(self.opportunities))
+        parts = {'accounts': shard_of(self.accounts['account_id'], shards).astype(np.intp)}
+        # Opportunities without a known account still belong to exactly one shard
+        opportunity_parts = shard_of(self.opportunities['account_id'], shards).astype(np.intp)
+        parts['opportunities'] = opportunity_parts
+        # Line items follow the first row of their opportunity, the one a full build joins them to
+        opportunity_ids = self.opportunities['opportunity_id']
+        first = ~opportunity_ids.duplicated().to_numpy()
+        position = pd.Index(opportunity_ids[first]).get_indexer(self.line_items['opportunity_id'])
+        parts['line_items'] = np.where(position >= 0, opportunity_parts[first][position], -1)
+        for attribute in ACCOUNT_ROW_TABLES:
+            table = getattr(self, attribute)
+            if 'account_id' in table.columns:
+                parts[attribute] = shard_of(table['account_id'], shards).astype(np.intp)
+
+        tables = {attribute: _split(getattr(self, attribute), shard_parts, shards)
+                  for attribute, shard_parts in parts.items()}
+        subsets = []
+        for shard in range(shards):
+            subset = copy.copy(self)
+            subset.workers = 1
+            # Timed in the worker process and attached to this build's metrics
+            subset.run_metrics = RunMetrics(trace_memory=self.run_metrics.trace_memory)
+            subset.won_revenue_total = won_revenue_total
+            for attribute, shard_tables in tables.items():
+                setattr(subset, attribute, shard_tables[shard])
+            subsets.append(subset)
+        return subsets
+
+    def build_sharded(self) -> Dict[str, pd.DataFrame]:
+        """
+        Compute every gold table in a process pool, one shard of accounts per worker
+
+        Each shard writes its tables to parquet under a temporary directory in
+        gold_path; the merge reads them back in full-build order. Simulated
+        values are seeded per account, so the result does not depend on the
+        number of shards.
+        """
+        shards = self.workers
+        logger.info(f"Building gold tables in {shards} shards")
+
+        with tempfile.TemporaryDirectory(prefix='shards_', dir=self.gold_path) as tmp:
+            with self.run_metrics.stage('split_shards', rows=len(self.accounts)):
+                subsets = self.shard_subsets(shards)
+            with self.run_metrics.stage('shards', rows=len(self.accounts)):
+                with ProcessPoolExecutor(max_workers=shards) as pool:
+                    futures = []
+                    for shard, subset in enumerate(subsets):
+                        output_dir = Path(tmp) / f'shard_{shard:03d}'
+                        output_dir.mkdir()
+                        futures.append(pool.submit(_build_shard, subset, output_dir))
+                    shard_files = []
+                    for future in futures:
+                        files, stages = future.result()
+                        shard_files.append(files)
+                        self.run_metrics.attach(stages)
+
+            tables = {}
+            with self.run_metrics.stage('merge_shards'):
+                for table_name in GOLD_TABLE_IDS:
+                    frames = [_read_shard_table(*files[table_name]) for files in shard_files if table_name in files]
+                    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+                    tables[table_name] = self._order_like_full_build(table_name, merged)
+        return tables
+
+    def create_gold_layer(self, incremental: bool = False, verify: bool = False) -> Dict[str, Any]:
+        """
+        Create all gold layer tables
+
+        Args:
+            incremental: Recompute only accounts whose silver rows changed since the
+                last build and merge them into its snapshot; falls back to a full
+                build when there is no usable previous build
+            verify: After an incremental build, rebuild everything in memory and
+                check every gold table matches
+
+        Returns:
+            Records and file per saved table
+        """
         logger.info("Creating Gold layer tables...")
 
-        results = {}
-
-        # 1. Customer 360 Metrics
-        customer_360 = self.calculate_customer_360_metrics()
-        customer_360 = self.calculate_health_score(customer_360)
-        customer_360 = self.calculate_churn_risk(customer_360)
+        with self._instrumented() as run:
+            stage = self.run_metrics.stage
+            with stage('silver_watermarks'):
+                watermarks = self.silver_watermarks()
+                row_accounts = self.row_accounts()
+                won_revenue = total_won_revenue(self.opportunities)
+            previous = self.load_build_state() if incremental else None
+
+            if previous is not None:
+                # Kept rows were computed as of the previous build (same day), so rebuilt ones are too
+                self.as_of = datetime.fromisoformat(previous['as_of'])
+                with stage('incremental_build'):
+                    tables, changes = self.build_incremental(previous, watermarks, row_accounts, won_revenue)
+                mode = 'incremental'
+            else:
+                tables = self.build_gold_tables()
+                changes = {'accounts': {'rebuilt': len(tables['customer_360_metrics'])}}
+                mode = 'full'
+
+            if verify and mode == 'incremental':
+                with stage('verify'):
+                    changes['verification'] = self.verify_incremental(tables)
+
+            results = {}
+            with stage('save'):
+                for table_name, df in tables.items():
+                    # Alerts, recommendations and timeline are only written when they have rows
+                    if df.empty and table_name != 'customer_360_metrics':
+                        continue
+                    with stage(table_name, rows=len(df)):
+                        results[table_name] = {
+                            'records': len(df),
+                            'file': self.save_gold_table(df, table_name)
+                        }
+
+            self.save_build_state(mode, watermarks, results, previous, changes, row_accounts, won_revenue)
+            run.update(mode=mode, accounts=changes['accounts'], largest_accounts=self.largest_accounts())
+        return results
 
-        filepath = self.save_gold_table(customer_360, 'customer_360_metrics')
-        results['customer_360_metrics'] = {
-            'records': len(customer_360),
-            'file': filepath
-        }
+    def largest_accounts(self, limit: int = LARGEST_ACCOUNTS) -> List[Dict[str, Any]]:
+        """Accounts with the most opportunities and line items, the likeliest cause of a slow build"""
+        if self.opportunities.empty or 'account_id' not in self.opportunities.columns:
+            return []
+        opportunities = self.opportunities['account_id'].value_counts()
+        line_items = pd.Series(dtype=float)
+        if not self.line_items.empty and 'opportunity_id' in self.line_items.columns:
+            line_items = self.line_items['opportunity_id'].map(opportunity_accounts(self.opportunities)).value_counts()
+        return [
+            {'account_id': account_id, 'opportunities': int(count),
+             'line_items': int(line_items.get(account_id, 0))}
+            for account_id, count in opportunities.head(limit).items()
+        ]
+
+    @contextmanager
+    def _instrumented(self) -> Iterator[Dict[str, Any]]:
+        """
+        Sample memory, optionally profile, and write the run metrics of a build
+
+        Yields a dict of run fields to add to the metrics file. The metrics
+        are written even when the build fails, with the error.
+        """
+        started_at = datetime.utcnow()
+        timestamp = started_at.strftime('%Y%m%d_%H%M%S')
+        run: Dict[str, Any] = {'seed': self.seed, 'workers': self.workers}
+        status, error, profile = 'success', None, {}
+        try:
+            with self.run_metrics.sampling(), \
+                    profiled(self.profile, self.gold_path / f'gold_run_profile_{timestamp}') as profile:
+                yield run
+        except Exception as e:
+            status, error = 'failed', str(e)
+            raise
+        finally:
+            self.run_metrics_file = self.run_metrics.save(
+                self.gold_path / f'gold_run_metrics_{timestamp}.json',
+                started_at=started_at.isoformat(),
+                build_seconds=round((datetime.utcnow() - started_at).total_seconds(), 3),
+                status=status,
+                error=error,
+                profile=profile or None,
+                **run
+            )
 
-        # 2. Risk Alerts
-        alerts = self.generate_risk_alerts(customer_360)
-        if not alerts.empty:
-            filepath = self.save_gold_table(alerts, 'risk_alerts')
-            results['risk_alerts'] = {
-                'records': len(alerts),
-                'file': filepath
+    # ------------------------------------------------------------------
+    # Streaming builds
+    # ------------------------------------------------------------------
+
+    def create_gold_layer_streaming(self, batch_size: int = DEFAULT_STREAM_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Create all gold layer tables without loading the silver tables into memory
+
+        Silver files are read in record batches. Each batch of accounts is
+        spilled to a temporary directory under gold_path, and opportunities,
+        line items, tickets and invoices are routed to their account's batch.
+        Every batch is then aggregated on its own and appended to the gold
+        files as a row group. Timeline events are written while opportunities, tickets and
+        invoices stream by, split into account id ranges (sampled from the
+        account batches) that are sorted one at a time. Peak memory follows
+        batch_size, plus about 12 bytes per opportunity to route line items.
+
+        The gold files hold the same rows, in the same order, as a full build.
+        Row owners are not recorded, so the next incremental build is a full one.
+
+        Args:
+            batch_size: Accounts per batch; also the silver read batch size
+
+        Returns:
+            Records and file per saved table
+        """
+        logger.info(f"Creating Gold layer tables in batches of {batch_size} accounts...")
+        files = {table_name: self.latest_silver_file(table_name) for table_name in SILVER_TABLES}
+        for table_name in ('account', 'opportunity'):
+            if files[table_name] is None:
+                raise FileNotFoundError(f"No silver {table_name} file in {self.silver_path}")
+
+        with self._instrumented() as run, tempfile.TemporaryDirectory(prefix='stream_', dir=self.gold_path) as tmp:
+            stage = self.run_metrics.stage
+            with stage('silver_watermarks'):
+                watermarks = {table_name: self._file_watermark(path) for table_name, path in files.items()}
+
+            spill = Path(tmp)
+            with stage('spill_accounts'):
+                account_keys, account_batches, num_batches, boundaries = self._spill_accounts(
+                    files['account'], batch_size, spill
+                )
+            # Timeline events are written to account id ranges on the way
+            with _BatchWriters(spill, 'customer_timeline') as timeline:
+                with stage('spill_opportunities'):
+                    opportunity_keys, opportunity_batches, total_revenue_all = self._spill_opportunities(
+                        files['opportunity'], batch_size, spill, account_keys, account_batches, timeline, boundaries
+                    )
+                for table_name in ('ticket', 'invoice'):
+                    if files[table_name] is not None:
+                        with stage(f'spill_{table_name}s'):
+                            self._spill_by_batch(
+                                files[table_name], batch_size, spill, table_name,
+                                lambda number, batch, table_name=table_name: self._route_account_rows(
+                                    batch, account_keys, account_batches, timeline, boundaries, table_name)
+                            )
+            if files['opportunity_line_item'] is not None:
+                with stage('spill_line_items'):
+                    self._spill_by_batch(
+                        files['opportunity_line_item'], batch_size, spill, 'opportunity_line_item',
+                        lambda number, batch: _route(opportunity_keys, opportunity_batches, account_hashes(
+                            batch.column('opportunity_id').to_numpy(zero_copy_only=False)))
+                    )
+            del opportunity_keys, opportunity_batches
+
+            # Batches without rows of a table get an empty table with its silver columns
+            empty = {
+                'opportunity_line_item': pd.DataFrame(columns=['opportunity_id', 'product_id']),
+                'ticket': pd.DataFrame(),
+                'invoice': pd.DataFrame(),
             }
+            for name in ('opportunity', 'opportunity_line_item', 'ticket', 'invoice'):
+                if files[name] is not None:
+                    empty[name] = pq.read_schema(files[name]).empty_table().to_pandas()
+
+            def read_spilled(batch_dir: Path, name: str) -> pd.DataFrame:
+                batch_file = batch_dir / f'{name}.parquet'
+                return pd.read_parquet(batch_file) if batch_file.exists() else empty[name]
+
+            accounts = 0
+            for number in range(num_batches):
+                with stage(f'batch_{number:06d}') as record:
+                    batch_dir = spill / f'batch_{number:06d}'
+                    batch = copy.copy(self)
+                    batch.workers = 1
+                    batch.accounts = pd.read_parquet(batch_dir / 'account.parquet')
+                    # Accounts repeated across batches are aggregated in the batch of their first row
+                    first = _route(account_keys, account_batches, account_hashes(batch.accounts['account_id']))
+                    batch.accounts = batch.accounts[first == number]
+                    batch.opportunities = read_spilled(batch_dir, 'opportunity')
+                    batch.line_items = read_spilled(batch_dir, 'opportunity_line_item')
+                    batch.tickets = read_spilled(batch_dir, 'ticket')
+                    batch.invoices = read_spilled(batch_dir, 'invoice')
+                    batch.contacts = pd.DataFrame()
+                    batch.won_revenue_total = total_revenue_all
+                    record['rows'] = len(batch.accounts)
+                    record['opportunities'] = len(batch.opportunities)
+
+                    tables = batch.build_account_tables()
+                    accounts += len(tables['customer_360_metrics'])
+                    for table_name, df in tables.items():
+                        self._write_part(spill, table_name, number, df)
+
+            # Ranges are in account id order, so sorting each one sorts the whole timeline
+            with stage('sort_timeline'):
+                for bucket in range(len(boundaries) + 1):
+                    bucket_file = spill / f'batch_{bucket:06d}' / 'customer_timeline.parquet'
+                    if bucket_file.exists():
+                        self._write_part(spill, 'customer_timeline', bucket, sort_timeline(pd.read_parquet(bucket_file)))
+
+            results = {}
+            with stage('save'):
+                for table_name in GOLD_TABLE_IDS:
+                    with stage(table_name) as record:
+                        saved = self._write_parts(spill, table_name)
+                        record['rows'] = saved['records'] if saved is not None else 0
+                    if saved is not None:
+                        results[table_name] = saved
+                if 'customer_360_metrics' not in results:
+                    results['customer_360_metrics'] = {
+                        'records': 0,
+                        'file': self.save_gold_table(pd.DataFrame(), 'customer_360_metrics'),
+                    }
+
+            changes = {'accounts': {'rebuilt': accounts}, 'batches': num_batches, 'batch_size': batch_size}
+            self.save_build_state('full', watermarks, results, None, changes)
+            run.update(mode='streaming', accounts=changes['accounts'], batches=num_batches, batch_size=batch_size)
+        return results
 
-        # 3. Recommendations
-        recommendations = self.generate_recommendations(customer_360)
-        if not recommendations.empty:
-            filepath = self.save_gold_table(recommendations, 'recommendations')
-            results['recommendations'] = {
-                'records': len(recommendations),
-                'file': filepath
+    def _file_watermark(self, path: Optional[Path]) -> Dict[str, Optional[str]]:
+        """Latest change timestamp in a silver file, read one column batch at a time"""
+        names = pq.read_schema(path).names if path is not None else []
+        column = next((c for c in WATERMARK_COLUMNS if c in names), None)
+        latest = pd.NaT
+        if column:
+            for batch in pq.ParquetFile(path).iter_batches(columns=[column]):
+                value = pd.to_datetime(batch.column(0).to_pandas(), utc=True, errors='coerce').max()
+                if not pd.isna(value) and (pd.isna(latest) or value > latest):
+                    latest = value
+        return {'column': column, 'value': None if pd.isna(latest) else latest.isoformat()}
+
+    def _spill_accounts(self, path: Path, batch_size: int,
+                        spill: Path) -> Tuple[np.ndarray, np.ndarray, int, np.ndarray]:
+        """
+        Write each account record batch to its own batch directory
+
+        Returns:
+            (sorted account id hashes, batch of each hash's first row, number of
+            batches, account ids splitting the ids into one sorted range per batch)
+        """
+        hashes, batches, samples = [], [], []
+        number = -1
+        for number, batch in enumerate(pq.ParquetFile(path).iter_batches(batch_size=batch_size)):
+            batch_dir = spill / f'batch_{number:06d}'
+            batch_dir.mkdir()
+            pq.write_table(pa.Table.from_batches([batch]), batch_dir / 'account.parquet')
+            account_ids = batch.column('account_id').to_numpy(zero_copy_only=False)
+            hashes.append(account_hashes(account_ids))
+            batches.append(np.full(batch.num_rows, number, dtype=np.int32))
+            # Evenly spaced ids of each batch sample the id distribution
+            account_ids = np.sort(account_ids[pd.notna(account_ids)].astype(object))
+            if len(account_ids):
+                samples.append(account_ids[np.linspace(0, len(account_ids) - 1, min(len(account_ids), 64)).astype(int)])
+
+        hashes = np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64)
+        keys, first = np.unique(hashes, return_index=True)
+        return (keys, (np.concatenate(batches)[first] if batches else np.array([], dtype=np.int32)), number + 1,
+                _range_boundaries(samples, max(number + 1, 1)))
+
+    def _spill_opportunities(self, path: Path, batch_size: int, spill: Path, account_keys: np.ndarray,
+                             account_batches: np.ndarray, timeline: _BatchWriters,
+                             boundaries: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Route opportunities to their account's batch, writing timeline events on the way
+
+        Returns:
+            (sorted opportunity id hashes, batch of each, won revenue of all opportunities)
+        """
+        keys, batches = [], []
+        total_revenue_all = 0.0
+
+        def route(number: int, batch: pa.RecordBatch) -> np.ndarray:
+            nonlocal total_revenue_all
+            opportunities = batch.to_pandas()
+            total_revenue_all += total_won_revenue(opportunities)
+            self._spill_events(timeline, boundaries, 'opportunity', opportunities)
+
+            target = _route(account_keys, account_batches, account_hashes(opportunities['account_id']))
+            keys.append(account_hashes(opportunities['opportunity_id']))
+            batches.append(target)
+            return target
+
+        self._spill_by_batch(path, batch_size, spill, 'opportunity', route)
+        keys = np.concatenate(keys) if keys else np.array([], dtype=np.uint64)
+        order = np.argsort(keys, kind='stable')
+        batches = np.concatenate(batches)[order] if len(keys) else np.array([], dtype=np.int32)
+        return keys[order], batches, total_revenue_all
+
+    def _route_account_rows(self, batch: pa.RecordBatch, account_keys: np.ndarray, account_batches: np.ndarray,
+                            timeline: _BatchWriters, boundaries: np.ndarray, table_name: str) -> np.ndarray:
+        """Account batch of each ticket or invoice row, writing its timeline events on the way"""
+        rows = batch.to_pandas()
+        self._spill_events(timeline, boundaries, table_name, rows)
+        return _route(account_keys, account_batches, account_hashes(rows['account_id']))
+
+    def _spill_by_batch(self, path: Path, batch_size: int, spill: Path, name: str,
+                        route: Callable[[int, pa.RecordBatch], np.ndarray]):
+        """
+        Append the rows of a silver file to `<name>.parquet` in their account batch's directory
+
+        route(number, record_batch) gives each row's account batch, or -1 for
+        rows that belong to no batch, which are dropped. Rows keep their file
+        order within a batch.
+        """
+        with _BatchWriters(spill, name) as writers:
+            for number, batch in enumerate(pq.ParquetFile(path).iter_batches(batch_size=batch_size)):
+                writers.append(pa.Table.from_batches([batch]), route(number, batch))
+
+    def _spill_events(self, timeline: _BatchWriters, boundaries: np.ndarray, table_name: str, rows: pd.DataFrame):
+        """Write the timeline events of some silver rows to the spill file of their account id range"""
+        events = TIMELINE_EVENTS[table_name](rows)
+        if events.empty:
+            return
+        account_ids = events['account_id'].to_numpy(dtype=object)
+        known = pd.notna(account_ids)
+        # Events without an account sort last
+        bucket = np.full(len(events), len(boundaries), dtype=np.int64)
+        bucket[known] = np.searchsorted(boundaries, account_ids[known], side='right')
+        timeline.append(pa.Table.from_pandas(events, schema=TIMELINE_SCHEMA, preserve_index=False), bucket)
+
+    def _write_part(self, spill: Path, table_name: str, number: int, df: pd.DataFrame):
+        """Write one batch of a gold table to the spill directory"""
+        if df.empty:
+            return
+        (spill / table_name).mkdir(exist_ok=True)
+        df.to_parquet(spill / table_name / f'part_{number:06d}.parquet', index=False)
+
+    def _write_parts(self, spill: Path, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Concatenate a gold table's batches into its gold file, one row group each
+
+        Batches can infer different column types (a column that is empty in one
+        batch, records with different keys), so they are cast to a schema
+        unified across all batches.
+        """
+        parts = sorted((spill / table_name).glob('part_*.parquet'))
+        if not parts:
+            return None
+        schema = pa.unify_schemas([pq.read_schema(part) for part in parts], promote_options='permissive')
+        filepath = self.gold_table_path(table_name)
+        records = 0
+        with pq.ParquetWriter(filepath, schema, compression='snappy') as writer:
+            for part in parts:
+                table = pq.read_table(part).cast(schema)
+                writer.write_table(table)
+                records += table.num_rows
+        logger.info(f"Saved gold table: {filepath} ({len(parts)} batches)")
+        return {'records': records, 'file': str(filepath)}
+
+    # ------------------------------------------------------------------
+    # Incremental builds
+    # ------------------------------------------------------------------
+
+    def silver_watermarks(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Latest change timestamp per silver table, and the column it was read from"""
+        watermarks = {}
+        for table_name in SILVER_TABLES:
+            table = getattr(self, SILVER_TABLES[table_name])
+            column = next((c for c in WATERMARK_COLUMNS if c in table.columns), None)
+            latest = pd.to_datetime(table[column], utc=True, errors='coerce').max() if column else pd.NaT
+            watermarks[table_name] = {
+                'column': column,
+                'value': None if pd.isna(latest) else latest.isoformat(),
             }
+        return watermarks
+
+    def row_accounts(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Owning account_id per row id of each silver table in ROW_ID_COLUMNS
+
+        Line items belong to their opportunity's account. Tables without their
+        id column are left out; a repeated id keeps its first row's account.
+        """
+        if {'opportunity_id', 'account_id'} <= set(self.opportunities.columns):
+            owners_of_opportunities = opportunity_accounts(self.opportunities)
+        else:
+            owners_of_opportunities = pd.Series(dtype=object)
+
+        owners = {}
+        for table_name, id_column in ROW_ID_COLUMNS.items():
+            table = getattr(self, SILVER_TABLES[table_name])
+            owner_column = 'opportunity_id' if table_name == 'opportunity_line_item' else 'account_id'
+            if id_column not in table.columns or owner_column not in table.columns:
+                continue
+            table = table[table[id_column].notna()].drop_duplicates(id_column)
+            accounts = table[owner_column]
+            if table_name == 'opportunity_line_item':
+                accounts = accounts.map(owners_of_opportunities)
+            accounts = accounts.astype(object)
+            owners[table_name] = dict(zip(
+                table[id_column].astype(str).tolist(), accounts.where(accounts.notna(), None).tolist()
+            ))
+        return owners
+
+    def load_build_state(self) -> Optional[Dict[str, Any]]:
+        """
+        State of the previous build, if an incremental build can start from it
+
+        Metrics with time windows (current year, last 4 quarters, renewals in the
+        next 180 days) shift with the date, so a build from an earlier day is
+        not reused. Nor is a build that did not record its row owners and won
+        revenue (a streaming build), as moved and deleted rows could not be
+        found, or one with another simulation seed or metrics config.
+        """
+        state_file = self.gold_path / BUILD_STATE_FILE
+        if not state_file.exists():
+            logger.info("No previous gold build state, running a full build")
+            return None
+
+        with open(state_file, 'r') as f:
+            state = json.load(f)
+
+        if datetime.fromisoformat(state['built_at']).date() != datetime.utcnow().date():
+            logger.info(f"Previous gold build is from {state['built_at']}, running a full build")
+            return None
+        if 'customer_360_metrics' not in state['tables'] or any(
+            not Path(info['file']).exists() for info in state['tables'].values()
+        ):
+            logger.info("Previous gold snapshot files are missing, running a full build")
+            return None
+        if state.get('row_accounts') is None or state.get('won_revenue') is None:
+            logger.info("Previous gold build did not record row owners, running a full build")
+            return None
+        if state.get('seed') != self.seed or state.get('metrics_config') != self.metrics_config_hash():
+            logger.info("Simulation seed or metrics config changed since the previous gold build, running a full build")
+            return None
+        return state
+
+    def metrics_config_hash(self) -> str:
+        """Content hash of the metrics config, recorded with each build"""
+        return hashlib.sha256(json.dumps(self.metrics_config, sort_keys=True).encode()).hexdigest()
+
+    def changed_account_ids(self, previous_watermarks: Dict[str, Dict[str, Optional[str]]]) -> set:
+        """Accounts with silver rows changed after the previous build's watermarks"""
+        owners_of_opportunities = opportunity_accounts(self.opportunities)
+        changed = set()
+        for table_name, attribute in SILVER_TABLES.items():
+            table = getattr(self, attribute)
+            if table.empty:
+                continue
+            previous = previous_watermarks.get(table_name, {})
+            column = previous.get('column')
+            if column not in table.columns or previous.get('value') is None:
+                # No comparable watermark: every row counts as changed
+                rows = table
+            else:
+                modified = pd.to_datetime(table[column], utc=True, errors='coerce')
+                rows = table[~(modified <= pd.Timestamp(previous['value']))]
 
-        # 4. Customer Timeline
-        timeline = self.generate_customer_timeline()
-        if not timeline.empty:
-            filepath = self.save_gold_table(timeline, 'customer_timeline')
-            results['customer_timeline'] = {
-                'records': len(timeline),
-                'file': filepath
-            }
+            if table_name == 'opportunity_line_item':
+                account_ids = owners_of_opportunities.reindex(rows['opportunity_id'].unique()).dropna()
+            else:
+                account_ids = rows['account_id'] if 'account_id' in rows.columns else pd.Series(dtype=object)
+            changed.update(account_ids.unique().tolist())
+            logger.info(f"{table_name}: {len(rows)} changed rows")
+        return changed
+
+    def for_accounts(self, account_ids: set) -> 'GoldLayerAggregator':
+        """This aggregator restricted to some accounts, with their opportunities, line items, tickets and invoices"""
+        subset = copy.copy(self)
+        if subset.won_revenue_total is None:
+            subset.won_revenue_total = total_won_revenue(self.opportunities)
+        subset.accounts = self.accounts[self.accounts['account_id'].isin(account_ids)]
+        subset.opportunities = self.opportunities[self.opportunities['account_id'].isin(account_ids)]
+        subset.line_items = self.line_items[self.line_items['opportunity_id'].isin(subset.opportunities['opportunity_id'])]
+        for attribute in ACCOUNT_ROW_TABLES:
+            table = getattr(self, attribute)
+            if 'account_id' in table.columns:
+                setattr(subset, attribute, table[table['account_id'].isin(account_ids)])
+        return subset
+
+    @staticmethod
+    def moved_row_account_ids(previous: Dict[str, Dict[str, Optional[str]]],
+                              current: Dict[str, Dict[str, Optional[str]]]) -> set:
+        """
+        Accounts that gained or lost a row between two builds' row owners
+
+        A row moved to another account changes both accounts, a deleted row
+        its previous account and a new row its current one.
+        """
+        changed = set()
+        for table_name in ROW_ID_COLUMNS:
+            if table_name not in previous and table_name not in current:
+                continue
+            owners = pd.concat([
+                pd.Series(previous.get(table_name, {}), dtype=object).rename('previous'),
+                pd.Series(current.get(table_name, {}), dtype=object).rename('current'),
+            ], axis=1)
+            moved = owners[owners['previous'].ne(owners['current'])]
+            changed.update(moved['previous'].dropna().tolist())
+            changed.update(moved['current'].dropna().tolist())
+            logger.info(f"{table_name}: {len(moved)} rows added, deleted or moved between accounts")
+        return changed
+
+    def reads_revenue_concentration(self) -> bool:
+        """Whether a derived metric, score, alert or recommendation depends on revenue_concentration"""
+        dependent = {'revenue_concentration'}
+        # Derived metrics only read those listed before them
+        for name, expression in self.derived_metrics:
+            if expression.columns & dependent:
+                dependent.add(name)
+        if 'yoy_growth' in dependent:
+            # The health and churn scores read yoy_growth
+            dependent |= {'health_score', 'health_status', 'churn_risk_score', 'churn_risk_level'}
+        rules = self.alert_rules.columns_read() | self.recommendation_rules.columns_read()
+        return len(dependent) > 1 or bool(dependent & rules)
+
+    def build_incremental(self, previous: Dict[str, Any], watermarks: Dict[str, Dict[str, Optional[str]]],
+                          row_accounts: Dict[str, Dict[str, Optional[str]]],
+                          won_revenue: float) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+        """
+        Recompute changed accounts and merge them into the previous snapshot
+
+        revenue_concentration of unchanged accounts follows the current won
+        revenue of all accounts. When that changed and something else reads
+        revenue_concentration, every account is recomputed.
+
+        Args:
+            previous: State of the previous build
+            watermarks: Current silver watermarks
+            row_accounts: Current row owners, from row_accounts()
+            won_revenue: Won revenue of all accounts
+
+        Returns:
+            (gold tables, change summary)
+        """
+        previous_tables = {
+            table_name: pd.read_parquet(previous['tables'][table_name]['file'])
+            if table_name in previous['tables'] else pd.DataFrame()
+            for table_name in GOLD_TABLE_IDS
+        }
+        previous_ids = set(previous_tables['customer_360_metrics']['account_id'])
+        current_ids = set(self.accounts['account_id'])
+
+        changed = self.changed_account_ids(previous['watermarks'])
+        changed |= self.moved_row_account_ids(previous['row_accounts'], row_accounts)
+        if won_revenue != previous['won_revenue'] and self.reads_revenue_concentration():
+            logger.info("Won revenue changed and the metrics config reads revenue_concentration, "
+                        "recomputing every account")
+            changed |= current_ids
+        added = current_ids - previous_ids
+        removed = previous_ids - current_ids
+        updated = (changed & current_ids) - added
+        # Removed accounts and changed opportunities without an account still
+        # have timeline events, as in a full build
+        rebuild = added | removed | changed
+        logger.info(
+            f"Incremental build: {len(added)} added, {len(updated)} updated, {len(removed)} removed accounts"
+        )
 
-        return results
+        updated_tables = self.for_accounts(rebuild).build_gold_tables() if rebuild else {}
+        tables = {}
+        for table_name in GOLD_TABLE_IDS:
+            kept = previous_tables[table_name]
+            if not kept.empty:
+                kept = kept[~kept['account_id'].isin(rebuild)]
+            frames = [f for f in [kept, updated_tables.get(table_name)] if f is not None and not f.empty]
+            merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            tables[table_name] = self._order_like_full_build(table_name, merged)
+
+        # Unchanged accounts' shares of a won revenue total that may have changed; nothing else read them
+        customer_360 = tables['customer_360_metrics']
+        if not customer_360.empty:
+            customer_360['revenue_concentration'] = revenue_concentration(customer_360['annual_revenue'], won_revenue)
+
+        changes = {
+            'accounts': {
+                'added': sorted(added),
+                'updated': sorted(updated),
+                'removed': sorted(removed),
+                'unchanged': len(current_ids - added - updated),
+            },
+        }
+        return tables, changes
+
+    def _order_like_full_build(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows in the order a full build writes them"""
+        if df.empty:
+            return df
+        if table_name == 'customer_timeline':
+            return sort_timeline(df)
+        # Per-account tables follow the account table; rows within an account keep their order
+        order = pd.Index(self.accounts['account_id'].unique())
+        position = order.get_indexer(df['account_id'])
+        return df.take(np.argsort(position, kind='stable')).reset_index(drop=True)
+
+    def verify_incremental(self, tables: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Compare an incremental result with a full rebuild
+
+        Every gold table is compared in full, as written to parquet (kept rows
+        are read back from it), except the build times of kept rows.
+        """
+        def as_saved(df: pd.DataFrame) -> pd.DataFrame:
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, index=False)
+            return pd.read_parquet(buffer)
+
+        full = self.build_gold_tables()
+        mismatches = {}
+        for table_name in GOLD_TABLE_IDS:
+            expected, actual = full[table_name], tables[table_name]
+            if expected.empty and actual.empty:
+                continue
+            columns = [column for column in expected.columns if column not in BUILD_TIME_COLUMNS]
+            try:
+                pd.testing.assert_frame_equal(
+                    as_saved(actual[columns]), as_saved(expected[columns]), check_dtype=False,
+                )
+            except (AssertionError, KeyError) as e:
+                mismatches[table_name] = str(e)
+
+        if mismatches:
+            logger.error(f"Incremental build differs from a full rebuild: {sorted(mismatches)}")
+        else:
+            logger.info("Incremental build verified against a full rebuild")
+        return {'matches_full_build': not mismatches, 'mismatches': mismatches}
+
+    def save_build_state(self, mode: str, watermarks: Dict[str, Any], results: Dict[str, Any],
+                         previous: Optional[Dict[str, Any]], changes: Dict[str, Any],
+                         row_accounts: Optional[Dict[str, Dict[str, Optional[str]]]] = None,
+                         won_revenue: Optional[float] = None) -> str:
+        """
+        Record this build for the next incremental run and write its change log
+
+        Without row_accounts and won_revenue, the next incremental run falls
+        back to a full build.
+        """
+        built_at = datetime.utcnow()
+        state = {
+            'built_at': built_at.isoformat(),
+            'as_of': self.as_of.isoformat(),
+            'seed': self.seed,
+            'metrics_config': self.metrics_config_hash(),
+            'mode': mode,
+            'watermarks': watermarks,
+            'tables': results,
+        }
+        with open(self.gold_path / BUILD_STATE_FILE, 'w') as f:
+            json.dump(dict(state, row_accounts=row_accounts, won_revenue=won_revenue), f, indent=2)
+
+        change_log = dict(
+            state,
+            previous_build=previous['built_at'] if previous else None,
+            previous_watermarks=previous['watermarks'] if previous else None,
+            **changes
+        )
+        change_log_file = self.gold_path / f"gold_change_log_{built_at.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(change_log_file, 'w') as f:
+            json.dump(change_log, f, indent=2, default=str)
+
+        logger.info(f"Gold {mode} build complete. Change log saved to: {change_log_file}")
+        return str(change_log_file)
+
+    def gold_table_path(self, table_name: str) -> Path:
+        """New timestamped file for a gold table"""
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        return self.gold_path / f"gold_{table_name}_{timestamp}.parquet"
 
     def save_gold_table(self, df: pd.DataFrame, table_name: str) -> str:
         """Save gold layer table"""
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        filename = f"gold_{table_name}_{timestamp}.parquet"
-        filepath = self.gold_path / filename
+        filepath = self.gold_table_path(table_name)
 
         df.to_parquet(filepath, compression='snappy', index=False)
 
@@ -814,16 +1580,70 @@ def main():
         default='./config/silver_to_gold_metrics.json',
         help='Path to metrics configuration file'
     )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Recompute only accounts changed since the last build and merge them into its snapshot'
+    )
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Check an incremental build against a full rebuild'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Random seed for simulated scores (overrides the metrics configuration)'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Read silver in batches and write gold tables batch by batch, for data larger than memory'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_STREAM_BATCH_SIZE,
+        help='Accounts per batch in a streaming build'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Build in this many processes, each over a hash partition of the accounts'
+    )
+    parser.add_argument(
+        '--profile',
+        choices=PROFILERS,
+        default=None,
+        help='Profile the build and save the profile next to the gold tables'
+    )
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help='Record per-stage peak Python/numpy allocations with tracemalloc (slower)'
+    )
 
     args = parser.parse_args()
 
-    aggregator = GoldLayerAggregator(args.config, args.metrics)
-    results = aggregator.create_gold_layer()
+    if args.stream and (args.incremental or args.workers > 1):
+        parser.error('--stream builds every account in one process; it cannot be combined with '
+                     '--incremental or --workers')
+
+    aggregator = GoldLayerAggregator(args.config, args.metrics, seed=args.seed, workers=args.workers,
+                                     load_silver=not args.stream, trace_memory=args.trace_memory,
+                                     profile=args.profile)
+    if args.stream:
+        results = aggregator.create_gold_layer_streaming(args.batch_size)
+    else:
+        results = aggregator.create_gold_layer(incremental=args.incremental, verify=args.verify)
 
     print(f"\n✅ Gold Layer Creation Complete!")
     print(f"Tables created:")
     for table_name, info in results.items():
         print(f"  - {table_name}: {info['records']} records")
+    print(f"Run metrics: {aggregator.run_metrics_file}")
 
 
 if __name__ == '__main__':
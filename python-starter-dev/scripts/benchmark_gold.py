@@ -0,0 +1,185 @@
+"""
+Gold Layer Benchmark
+Times GoldLayerAggregator stages on synthetic data of increasing size, to
+check that each stage scales linearly with the number of accounts. Silver
+tables are built by replicating the sample tables with fresh ids.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from aggregate_gold import GoldLayerAggregator
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SILVER_PATH = Path(__file__).parent.parent / 'data' / 'silver'
+METRICS_CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'silver_to_gold_metrics.json'
+
+# Tables read by GoldLayerAggregator, with the id columns that must stay unique per copy
+SILVER_TABLES = {
+    'account': ['account_id'],
+    'opportunity': ['opportunity_id', 'account_id'],
+    'opportunity_line_item': ['line_item_id', 'opportunity_id'],
+    'contact': ['contact_id', 'account_id'],
+    'ticket': ['ticket_id', 'account_id'],
+    'invoice': ['invoice_id', 'account_id'],
+}
+
+
+def write_synthetic_silver(silver_path: Path, num_accounts: int) -> int:
+    """
+    Write silver tables with about `num_accounts` accounts
+
+    Args:
+        silver_path: Output directory
+        num_accounts: Target account count; rounded up to whole copies of the sample
+
+    Returns:
+        Number of accounts written
+    """
+    silver_path.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for table_name, id_columns in SILVER_TABLES.items():
+        sample = pd.read_parquet(SAMPLE_SILVER_PATH / f'silver_{table_name}_sample.parquet')
+        if table_name == 'account':
+            copies = max(1, -(-num_accounts // len(sample)))
+        frames = []
+        for copy in range(copies):
+            frame = sample.copy()
+            for column in id_columns:
+                frame[column] = frame[column] + f'_{copy}'
+            frames.append(frame)
+        table = pd.concat(frames, ignore_index=True)
+        if table_name == 'account':
+            table = table.head(num_accounts)
+            written = len(table)
+        table.to_parquet(silver_path / f'silver_{table_name}_benchmark.parquet', index=False)
+    return written
+
+
+def benchmark(num_accounts: int, seed: int = 42) -> dict:
+    """Time calculate_customer_360_metrics at one data size"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        accounts = write_synthetic_silver(tmp_path / 'silver', num_accounts)
+        config_path = tmp_path / 'config.json'
+        with open(config_path, 'w') as f:
+            json.dump({'silver_path': str(tmp_path / 'silver'), 'gold_path': str(tmp_path / 'gold')}, f)
+
+        aggregator = GoldLayerAggregator(str(config_path), str(METRICS_CONFIG_PATH), seed=seed)
+        start = time.perf_counter()
+        metrics = aggregator.calculate_customer_360_metrics()
+        elapsed = time.perf_counter() - start
+
+    return {
+        'accounts': accounts,
+        'opportunities': len(aggregator.opportunities),
+        'rows': len(metrics),
+        'seconds': round(elapsed, 3),
+        'accounts_per_second': round(accounts / elapsed),
+    }
+
+
+def benchmark_scoring(num_accounts: int, seed: int = 42) -> dict:
+    """Time health score and churn risk scoring over `num_accounts` accounts"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        config_path = tmp_path / 'config.json'
+        with open(config_path, 'w') as f:
+            json.dump({'silver_path': str(SAMPLE_SILVER_PATH), 'gold_path': str(tmp_path / 'gold')}, f)
+        aggregator = GoldLayerAggregator(str(config_path), str(METRICS_CONFIG_PATH), seed=seed)
+
+    rng = np.random.default_rng(seed)
+    metrics = pd.DataFrame({
+        'account_id': [f'ACC{i:07d}' for i in range(num_accounts)],
+        'yoy_growth': rng.normal(0, 40, num_accounts),
+    })
+    start = time.perf_counter()
+    aggregator.calculate_health_score(metrics)
+    aggregator.calculate_churn_risk(metrics)
+    elapsed = time.perf_counter() - start
+
+    return {'accounts': num_accounts, 'seconds': round(elapsed, 3)}
+
+
+def benchmark_workers(num_accounts: int, workers: int, seed: int = 42) -> dict:
+    """Time build_gold_tables with `workers` processes at one data size"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        accounts = write_synthetic_silver(tmp_path / 'silver', num_accounts)
+        config_path = tmp_path / 'config.json'
+        with open(config_path, 'w') as f:
+            json.dump({'silver_path': str(tmp_path / 'silver'), 'gold_path': str(tmp_path / 'gold')}, f)
+
+        aggregator = GoldLayerAggregator(str(config_path), str(METRICS_CONFIG_PATH), seed=seed, workers=workers)
+        start = time.perf_counter()
+        aggregator.build_gold_tables()
+        elapsed = time.perf_counter() - start
+
+    return {'accounts': accounts, 'workers': workers, 'seconds': round(elapsed, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Gold layer aggregation')
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[3000, 30000, 300000],
+        help='Account counts to benchmark'
+    )
+    parser.add_argument(
+        '--scoring-sizes',
+        type=int,
+        nargs='+',
+        default=[1000000],
+        help='Account counts to benchmark health and churn scoring at'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=[],
+        help='Worker counts to time a full build with, at the largest of --sizes'
+    )
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for simulated metrics')
+
+    args = parser.parse_args()
+
+    # Importing aggregate_gold already configured logging at INFO; keep stage logs out of the table
+    logging.basicConfig(level=logging.WARNING, force=True)
+    print('Customer 360 metrics')
+    print(f"{'accounts':>10} {'opportunities':>14} {'seconds':>10} {'accounts/s':>12}")
+    for size in args.sizes:
+        result = benchmark(size, seed=args.seed)
+        print(f"{result['accounts']:>10} {result['opportunities']:>14} "
+              f"{result['seconds']:>10.2f} {result['accounts_per_second']:>12}")
+
+    print('\nHealth score and churn risk')
+    print(f"{'accounts':>10} {'seconds':>10}")
+    for size in args.scoring_sizes:
+        result = benchmark_scoring(size, seed=args.seed)
+        print(f"{result['accounts']:>10} {result['seconds']:>10.3f}")
+
+    if args.workers:
+        print('\nFull build by worker count')
+        print(f"{'accounts':>10} {'workers':>8} {'seconds':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            result = benchmark_workers(max(args.sizes), workers, seed=args.seed)
+            baseline = baseline or result['seconds']
+            print(f"{result['accounts']:>10} {result['workers']:>8} "
+                  f"{result['seconds']:>10.2f} {baseline / result['seconds']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Gold Expressions
+A small, safe expression language for silver_to_gold_metrics.json: rule
+conditions such as "churn_risk_score > 70" and derived metric calculations,
+compiled once into vectorized pandas/NumPy operations over a metrics frame
+"""
+
+import ast
+import io
+import logging
+import operator
+import tokenize
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_BINARY_OPERATORS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_COMPARISONS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+def _where(condition: Any, value: Any, otherwise: Any) -> np.ndarray:
+    return np.where(_mask(condition), value, otherwise)
+
+
+# Functions an expression may call, all elementwise
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'abs': np.abs,
+    'round': np.round,
+    'min': np.minimum,
+    'max': np.maximum,
+    'where': _where,
+    'isnull': pd.isna,
+    'notnull': pd.notna,
+}
+
+# SQL spellings accepted alongside Python's
+_SQL_KEYWORDS = {'AND': 'and', 'OR': 'or', 'NOT': 'not', 'TRUE': 'True', 'FALSE': 'False', 'NULL': 'None'}
+
+_Plan = Callable[[pd.DataFrame], Any]
+
+
+def _mask(values: Any) -> np.ndarray:
+    """Boolean array of a condition; missing values are False"""
+    if isinstance(values, pd.Series):
+        values = values.fillna(False) if values.dtype == object else values
+        return values.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(values, dtype=bool)
+
+
+def _python_source(source: str) -> str:
+    """Source with SQL keywords and '=' equality rewritten to Python, leaving string literals alone"""
+    tokens = []
+    for token in tokenize.generate_tokens(io.StringIO(source.strip()).readline):
+        if token.type == tokenize.NAME and token.string in _SQL_KEYWORDS:
+            token = token._replace(string=_SQL_KEYWORDS[token.string])
+        elif token.type == tokenize.OP and token.string == '=':
+            token = token._replace(string='==')
+        tokens.append((token.type, token.string))
+    return tokenize.untokenize(tokens).strip()
+
+
+class Expression:
+    """
+    A compiled expression over the columns of a metrics frame
+
+    Names are columns; constants are numbers, strings, True, False and None.
+    Arithmetic (+ - * / % **), comparisons (chained too), and/or/not and the
+    calls in FUNCTIONS are allowed, nothing else. Comparisons with missing
+    values are False. Use compile_expression, which caches compiled plans.
+
+    Args:
+        source: Expression text
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        try:
+            tree = ast.parse(_python_source(source), mode='eval')
+        except (SyntaxError, tokenize.TokenError) as e:
+            raise ValueError(f"Invalid expression '{source}': {e}") from None
+        self._columns: List[str] = []
+        self._plan = self._compile(tree.body)
+        self.columns: FrozenSet[str] = frozenset(self._columns)
+
+    def __reduce__(self):
+        # Sent to worker processes as source and recompiled there
+        return compile_expression, (self.source,)
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+    def evaluate(self, metrics: pd.DataFrame) -> Any:
+        """Values for every row of metrics (an array or Series), or a constant"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._plan(metrics)
+
+    def mask(self, metrics: pd.DataFrame) -> np.ndarray:
+        """Rows where the expression holds"""
+        result = self.evaluate(metrics)
+        if np.ndim(result) == 0:
+            return np.full(len(metrics), bool(result))
+        return _mask(result)
+
+    def validate(self, columns: Iterable[str]):
+        """Raise ValueError if the expression reads a column not in `columns`"""
+        unknown = self.columns - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown column(s) {sorted(unknown)} in expression '{self.source}'")
+
+    def _compile(self, node: ast.AST) -> _Plan:
+        if isinstance(node, ast.Constant) and (node.value is None or isinstance(node.value, (bool, int, float, str))):
+            value = node.value
+            return lambda metrics: value
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            self._columns.append(name)
+            return lambda metrics: metrics[name]
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd, ast.Not)):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda metrics: ~_mask(operand(metrics))
+            sign = -1 if isinstance(node.op, ast.USub) else 1
+            return lambda metrics: sign * operand(metrics)
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            op = _BINARY_OPERATORS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda metrics: op(left(metrics), right(metrics))
+
+        if isinstance(node, ast.BoolOp):
+            operands = [self._compile(value) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda metrics: combine.reduce([_mask(operand(metrics)) for operand in operands])
+
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            operands = [self._compile(node.left)] + [self._compile(value) for value in node.comparators]
+            ops = [_COMPARISONS[type(op)] for op in node.ops]
+
+            def compare(metrics: pd.DataFrame) -> Any:
+                values = [operand(metrics) for operand in operands]
+                masks = [_mask(op(a, b)) for op, a, b in zip(ops, values, values[1:])]
+                return masks[0] if len(masks) == 1 else np.logical_and.reduce(masks)
+            return compare
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS \
+                and not node.keywords:
+            function = FUNCTIONS[node.func.id]
+            arguments = [self._compile(argument) for argument in node.args]
+            return lambda metrics: function(*[argument(metrics) for argument in arguments])
+
+        raise ValueError(f"Unsupported syntax '{ast.unparse(node)}' in expression '{self.source}'")
+
+
+@lru_cache(maxsize=None)
+def compile_expression(source: str) -> Expression:
+    """Compiled expression for a source string, compiled once per process"""
+    return Expression(source)
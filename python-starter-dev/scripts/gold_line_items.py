@@ -0,0 +1,103 @@
+"""
+Gold Line Items
+Opportunity line items rolled up per account and product: distinct products
+(active services), product mix and contracted value, shared by the gold
+aggregator and the API's product drill-down
+"""
+
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Silver line item columns read for rollups (missing ones count as empty)
+LINE_ITEM_COLUMNS = ['opportunity_id', 'product_id', 'product_name', 'quantity', 'total_price']
+
+# Product rollup columns, one row per account and product
+PRODUCT_COLUMNS = ['account_id', 'product_id', 'product_name', 'line_items', 'quantity', 'value', 'contracted_value']
+
+
+def account_line_items(line_items: pd.DataFrame, opportunities: pd.DataFrame) -> pd.DataFrame:
+    """
+    Line items with their opportunity's account_id and is_won, joined once
+
+    Line items of opportunities that are not in `opportunities` are dropped.
+    """
+    items = line_items.reindex(columns=LINE_ITEM_COLUMNS)
+    opportunity_accounts = opportunities.reindex(columns=['opportunity_id', 'account_id', 'is_won']) \
+        .drop_duplicates('opportunity_id')
+    return items.merge(opportunity_accounts, on='opportunity_id')
+
+
+def product_rollup(items: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per account and product, in account and product order
+
+    value sums the line items' total_price; contracted_value only those of
+    won opportunities.
+
+    Args:
+        items: Line items from account_line_items
+    """
+    value = items['total_price'].astype(float)
+    rows = pd.DataFrame({
+        'account_id': items['account_id'],
+        'product_id': items['product_id'],
+        'product_name': items['product_name'],
+        'quantity': items['quantity'].astype(float),
+        'value': value,
+        'contracted_value': value.where((items['is_won'] == True).to_numpy(), 0.0),
+    })
+    products = rows.groupby(['account_id', 'product_id']).agg(
+        product_name=('product_name', 'first'),
+        line_items=('product_name', 'size'),
+        quantity=('quantity', 'sum'),
+        value=('value', 'sum'),
+        contracted_value=('contracted_value', 'sum'),
+    )
+    return products.reset_index()[PRODUCT_COLUMNS]
+
+
+def account_rollups(items: pd.DataFrame, account_ids: Any) -> pd.DataFrame:
+    """
+    Product metrics per account from a single product rollup
+
+    active_services counts distinct products and contracted_value sums won
+    line items. product_mix is a JSON list of the account's products, by
+    value descending.
+
+    Args:
+        items: Line items from account_line_items
+        account_ids: Accounts to report, in output order
+
+    Returns:
+        DataFrame indexed by account_id
+    """
+    products = product_rollup(items)
+    products = products.sort_values(['account_id', 'value'], ascending=[True, False], kind='stable')
+    by_account = products.groupby('account_id', sort=False)
+    product_counts = by_account.size()
+
+    # One JSON object per product row, encoded at once; each account's products
+    # are contiguous after the sort, so their lines join into the account's array
+    lines = products.drop(columns='account_id').to_json(
+        orient='records', lines=True, double_precision=15
+    ).splitlines()
+    starts = np.r_[0, np.cumsum(product_counts.to_numpy())]
+    product_mix = pd.Series(
+        ['[' + ','.join(lines[start:end]) + ']' for start, end in zip(starts[:-1], starts[1:])],
+        index=product_counts.index, dtype=object,
+    )
+
+    metrics = pd.DataFrame({
+        'active_services': product_counts,
+        'contracted_value': by_account['contracted_value'].sum(),
+        'product_mix': product_mix,
+    }).reindex(pd.Index(account_ids, name='account_id'))
+    metrics['active_services'] = metrics['active_services'].fillna(0).astype(int)
+    metrics['contracted_value'] = metrics['contracted_value'].astype(float).fillna(0.0)
+    metrics['product_mix'] = metrics['product_mix'].fillna('[]')
+    return metrics
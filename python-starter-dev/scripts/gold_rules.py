@@ -0,0 +1,283 @@
+"""
+Gold Rules
+Declarative rules from silver_to_gold_metrics.json (risk alerts and
+recommendations), evaluated as boolean masks over the whole account metrics
+frame, with output rows built column-wise. Conditions are expressions
+compiled by gold_expressions, or [column, operator, value] triples
+"""
+
+import logging
+import operator
+import re
+from string import Formatter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from gold_expressions import compile_expression
+
+logger = logging.getLogger(__name__)
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# Functions allowed in template fields, e.g. "{abs(yoy_growth):.0f}"
+TEMPLATE_FUNCTIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'abs': np.abs,
+}
+
+_CALL = re.compile(r'^(\w+)\((\w+)\)$')
+
+# Rule keys that are not output columns
+_RULE_KEYS = {'rule_id', 'name', 'condition', 'conditions'}
+
+
+def conditions_of(spec: Dict[str, Any]) -> List[Any]:
+    """A rule's or case's conditions: its "conditions" list and its "condition" expression"""
+    conditions = list(spec.get('conditions', []))
+    if 'condition' in spec:
+        conditions.append(spec['condition'])
+    return conditions
+
+
+def condition_mask(metrics: pd.DataFrame, conditions: Any) -> np.ndarray:
+    """
+    Rows meeting every condition
+
+    A condition is an expression string, e.g. "0 < days_to_renewal < 30", or
+    a [column, operator, value] triple. A single expression may be passed
+    instead of a list. Comparisons with missing values are False, as they
+    are for scalars.
+    """
+    if isinstance(conditions, str):
+        conditions = [conditions]
+    mask = np.ones(len(metrics), dtype=bool)
+    for condition in conditions:
+        if isinstance(condition, str):
+            mask &= compile_expression(condition).mask(metrics)
+            continue
+        column, op, value = condition
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}' in rule condition on {column}")
+        mask &= np.asarray(OPERATORS[op](metrics[column], value), dtype=bool)
+    return mask
+
+
+def condition_columns(conditions: Any) -> Set[str]:
+    """Metrics columns a condition list reads"""
+    if isinstance(conditions, str):
+        conditions = [conditions]
+    return set().union(*(
+        compile_expression(c).columns if isinstance(c, str) else {c[0]} for c in conditions
+    ))
+
+
+def render_template(template: str, metrics: pd.DataFrame) -> Any:
+    """
+    Format a message template for every row
+
+    Fields name metrics columns, optionally wrapped in one of TEMPLATE_FUNCTIONS,
+    with standard format specs. Templates without fields are returned as is.
+    """
+    parsed = list(Formatter().parse(template))
+    if all(field is None for _, field, _, _ in parsed):
+        return template
+
+    pieces: List[List[str]] = []
+    for literal, field, spec, _ in parsed:
+        if literal:
+            pieces.append([literal] * len(metrics))
+        if field is None:
+            continue
+        call = _CALL.match(field)
+        if call:
+            values = TEMPLATE_FUNCTIONS[call.group(1)](metrics[call.group(2)].to_numpy())
+        else:
+            values = metrics[field].to_numpy()
+        pieces.append([format(v, spec) for v in values.tolist()])
+    return _per_row([''.join(parts) for parts in zip(*pieces)])
+
+
+def evaluate_value(spec: Any, metrics: pd.DataFrame) -> Any:
+    """
+    Output value of a rule field for the matching rows
+
+    A field is one of:
+        - a string, formatted as a template
+        - a number, list or boolean constant
+        - {"column": name, "factor": f}: a metrics column, optionally scaled
+        - {"expression": e}: an expression over metrics columns
+        - {"cases": [{"condition": e, "value": v}, ...], "default": v}:
+          the value of the first case whose condition (or "conditions") holds
+        - any other object: a record per row, whose values are fields themselves
+
+    Returns:
+        An ndarray with one value per row, or any other value as a constant
+    """
+    if isinstance(spec, str):
+        return render_template(spec, metrics)
+    if not isinstance(spec, dict):
+        return spec
+    if 'column' in spec:
+        values = metrics[spec['column']].to_numpy()
+        return values * spec['factor'] if 'factor' in spec else values
+    if 'expression' in spec:
+        value = compile_expression(spec['expression']).evaluate(metrics)
+        return np.asarray(value) if np.ndim(value) else value
+    if 'cases' in spec:
+        result = _broadcast(evaluate_value(spec.get('default'), metrics), len(metrics))
+        # Later cases are applied first so earlier ones win
+        for case in reversed(spec['cases']):
+            mask = condition_mask(metrics, conditions_of(case))
+            result = np.where(mask, _broadcast(evaluate_value(case['value'], metrics), len(metrics)), result)
+        return result
+
+    keys = list(spec)
+    columns = [_broadcast(evaluate_value(spec[key], metrics), len(metrics)).tolist() for key in keys]
+    return _per_row([dict(zip(keys, values)) for values in zip(*columns)])
+
+
+def referenced_columns(spec: Any) -> Set[str]:
+    """Metrics columns a rule field or condition list reads"""
+    if isinstance(spec, str):
+        columns = set()
+        for _, field, _, _ in Formatter().parse(spec):
+            if field is not None:
+                call = _CALL.match(field)
+                columns.add(call.group(2) if call else field)
+        return columns
+    if isinstance(spec, dict):
+        if 'column' in spec:
+            return {spec['column']}
+        if 'expression' in spec:
+            return set(compile_expression(spec['expression']).columns)
+        if 'cases' in spec:
+            columns = referenced_columns(spec.get('default'))
+            for case in spec['cases']:
+                columns |= condition_columns(conditions_of(case)) | referenced_columns(case['value'])
+            return columns
+        return set().union(*(referenced_columns(v) for v in spec.values()))
+    return set()
+
+
+def _per_row(values: List[Any]) -> np.ndarray:
+    """Object array of per-row values (strings, records or containers)"""
+    result = np.empty(len(values), dtype=object)
+    result[:] = values
+    return result
+
+
+def _broadcast(value: Any, length: int) -> np.ndarray:
+    """Per-row values for a field result, repeating constants"""
+    if isinstance(value, np.ndarray):
+        return value
+    return _per_row([value] * length)
+
+
+class RuleSet:
+    """
+    Ordered rules producing one output row per (account, matching rule)
+
+    Args:
+        rules: Rule definitions, each with a rule_id, a condition and output fields
+        columns: Output columns in order; id_column and created_at are filled here,
+            account_id and account_name come from the metrics, the rest from rules
+        id_column: Output id column, set to "<account_id>_<rule_id>"
+        defaults: Output fields shared by every rule unless a rule overrides them
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], columns: List[str], id_column: str,
+                 defaults: Optional[Dict[str, Any]] = None):
+        self.rules = rules
+        self.columns = columns
+        self.id_column = id_column
+        self.defaults = defaults or {}
+
+        known = set(columns) | _RULE_KEYS
+        for rule in rules:
+            unknown = set(rule) - known
+            if unknown:
+                raise ValueError(f"Rule {rule.get('rule_id')} has unknown fields: {sorted(unknown)}")
+            # Compiles (and caches) every expression, so syntax errors surface here
+            self._rule_columns(rule)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], columns: List[str], id_column: str,
+                    available_columns: Optional[Iterable[str]] = None) -> 'RuleSet':
+        """
+        Rule set from a config section with "rules" and optional "defaults"
+
+        If available_columns is given, rules reading any other metrics column
+        are rejected here rather than when evaluated.
+        """
+        rule_set = cls(config['rules'], columns, id_column, config.get('defaults'))
+        if available_columns is not None:
+            rule_set.validate(available_columns)
+        return rule_set
+
+    def validate(self, available_columns: Iterable[str]):
+        """Raise ValueError if a rule reads a metrics column not in available_columns"""
+        available = set(available_columns)
+        for rule in self.rules:
+            unknown = self._rule_columns(rule) - available
+            if unknown:
+                raise ValueError(f"Rule {rule.get('rule_id')} reads unknown column(s): {sorted(unknown)}")
+
+    def columns_read(self) -> Set[str]:
+        """Metrics columns any rule reads"""
+        return set().union(*(self._rule_columns(rule) for rule in self.rules))
+
+    def _rule_columns(self, rule: Dict[str, Any]) -> Set[str]:
+        """Metrics columns a rule's conditions and output fields read"""
+        fields = dict(self.defaults, **{k: v for k, v in rule.items() if k not in _RULE_KEYS})
+        return condition_columns(conditions_of(rule)).union(
+            *(referenced_columns(fields[column]) for column in self.columns if column in fields)
+        )
+
+    def evaluate(self, metrics: pd.DataFrame, created_at: Any = None) -> pd.DataFrame:
+        """
+        Output rows for every account and matching rule
+
+        Rows are ordered by account (metrics order), then rule order.
+        """
+        metrics = metrics.reset_index(drop=True)
+        frames = []
+        for rule_index, rule in enumerate(self.rules):
+            positions = np.flatnonzero(condition_mask(metrics, conditions_of(rule)))
+            if len(positions) == 0:
+                continue
+            fields = dict(self.defaults, **{k: v for k, v in rule.items() if k not in _RULE_KEYS})
+            # Only the columns this rule reads are gathered for its matching rows
+            needed = ['account_id', 'account_name'] + sorted(referenced_columns(fields) - {'account_id', 'account_name'})
+            matched = metrics[needed].take(positions).reset_index(drop=True)
+
+            frame = {
+                '_position': positions,
+                '_rule': rule_index,
+                self.id_column: matched['account_id'].astype(str) + f"_{rule['rule_id']}",
+            }
+            for column in self.columns:
+                if column in ('account_id', 'account_name'):
+                    frame[column] = matched[column]
+                elif column == 'created_at':
+                    frame[column] = created_at
+                elif column != self.id_column:
+                    value = evaluate_value(fields.get(column), matched)
+                    # Constant containers are repeated per row, not spread across rows
+                    frame[column] = _broadcast(value, len(matched)) if isinstance(value, (list, dict)) else value
+            frames.append(pd.DataFrame(frame))
+
+        if not frames:
+            return pd.DataFrame()
+
+        rows = pd.concat(frames, ignore_index=True)
+        order = np.lexsort((rows['_rule'].to_numpy(), rows['_position'].to_numpy()))
+        return rows.take(order)[self.columns].reset_index(drop=True)
+
@@ -0,0 +1,205 @@
+"""
+Gold Simulation
+Simulated customer_360 metrics (satisfaction, engagement, contracts and
+subsidiary relationships) for sources that are not connected yet, drawn one
+column at a time from per-account random streams
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+# Subsidiaries per account and their probabilities
+SUBSIDIARY_COUNTS = [1, 2, 3]
+SUBSIDIARY_COUNT_PROBABILITIES = [0.4, 0.4, 0.2]
+
+
+def _splitmix64(values: Any) -> np.ndarray:
+    """SplitMix64 finalizer: a well-mixed 64-bit value per input"""
+    z = np.atleast_1d(np.asarray(values, dtype=np.uint64)) + _GOLDEN_GAMMA
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def account_hashes(account_ids: Any) -> np.ndarray:
+    """Stable 64-bit hash per account id, the same in every process and run"""
+    return pd.util.hash_array(np.asarray(account_ids, dtype=object))
+
+
+def account_seeds(account_ids: Any, seed: int) -> np.ndarray:
+    """Random seed per account, from its id and the run seed"""
+    return _splitmix64(account_hashes(account_ids) ^ _splitmix64(seed % 2**64)[0])
+
+
+def account_uniforms(seeds: np.ndarray, streams: int) -> np.ndarray:
+    """(accounts, streams) uniform draws in [0, 1) that depend only on each account's seed"""
+    counters = seeds[:, None] + _GOLDEN_GAMMA * np.arange(1, streams + 1, dtype=np.uint64)
+    return (_splitmix64(counters) >> np.uint64(11)) * 2.0 ** -53
+
+
+def _stream_key(name: str) -> np.uint64:
+    """Stable 64-bit key of a stream name"""
+    return np.uint64(int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'little'))
+
+
+class AccountDraws:
+    """
+    Random draws for a set of accounts, one independent stream per name
+
+    Each draw is a single vectorized call over all accounts, with the
+    Generator-like uniform, integers and choice. An account's values depend
+    only on its id, the run seed and the stream name: not on the other
+    accounts of a build, sharding or batching, nor on which other streams
+    are drawn.
+
+    Args:
+        account_ids: Accounts to draw for, in output order
+        seed: Run seed
+    """
+
+    def __init__(self, account_ids: Any, seed: int):
+        self.seeds = account_seeds(account_ids, seed)
+
+    def random(self, name: str, size: Optional[int] = None) -> np.ndarray:
+        """Uniform draws in [0, 1): one per account, or (accounts, size)"""
+        draws = account_uniforms(_splitmix64(self.seeds ^ _stream_key(name)), size or 1)
+        return draws if size is not None else draws[:, 0]
+
+    def uniform(self, name: str, low: float, high: float) -> np.ndarray:
+        """Uniform floats in [low, high), one per account"""
+        return low + (high - low) * self.random(name)
+
+    def integers(self, name: str, low: Any, high: Any) -> np.ndarray:
+        """Integers in [low, high), one per account; bounds may be per-account arrays"""
+        return low + np.floor(self.random(name) * (np.asarray(high) - low)).astype(np.int64)
+
+    def choice(self, name: str, options: Sequence[Any], p: Optional[Sequence[float]] = None) -> np.ndarray:
+        """One of options per account, with probabilities p (uniform by default)"""
+        cumulative = np.cumsum(p if p is not None else np.ones(len(options)))
+        picked = np.searchsorted(cumulative / cumulative[-1], self.random(name), side='right')
+        return np.asarray(options)[np.minimum(picked, len(options) - 1)]
+
+    def permutation(self, name: str, n: int) -> np.ndarray:
+        """(accounts, n) random order of n items per account; a prefix is a sample without replacement"""
+        return np.argsort(self.random(name, n), axis=1, kind='stable')
+
+
+def _split(total: np.ndarray, weights: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Split each row's total by its weights, rounded so the parts add up to the rounded total
+
+    Parts are differences of rounded cumulative shares, so rounding never
+    gains or loses a cent (or ticket) across a row.
+    """
+    cumulative = np.round(total[:, None] * np.cumsum(weights, axis=1), decimals)
+    return np.round(np.diff(cumulative, axis=1, prepend=0.0), decimals)
+
+
+def simulate_account_metrics(account_ids: Any, annual_revenue: np.ndarray, total_tickets: np.ndarray,
+                             subsidiaries: List[Dict[str, Any]], now: datetime, seed: int) -> pd.DataFrame:
+    """
+    Simulated metrics for every account until their sources are connected
+
+    Args:
+        account_ids: Accounts to simulate, in output order
+        annual_revenue: Each account's annual revenue, split across its subsidiaries
+        total_tickets: Each account's ticket count, split the same way
+        subsidiaries: Subsidiary configs (id, name, short_name, services)
+        now: Reference time for contract and relationship dates
+        seed: Run seed
+
+    Returns:
+        One row per account, in account_ids order
+    """
+    draws = AccountDraws(account_ids, seed)
+    n = len(draws.seeds)
+    annual_revenue = np.asarray(annual_revenue, dtype=float)
+    now = pd.Timestamp(now)
+
+    # ===== ACCOUNT MANAGEMENT METRICS (Account Management) =====
+    days_to_renewal = draws.integers('days_to_renewal', 30, 730)
+    metrics = pd.DataFrame({
+        'days_to_renewal': days_to_renewal,
+        'contract_end_date': now + pd.to_timedelta(days_to_renewal, unit='D'),
+        # Customer satisfaction (would use actual NPS/CSAT data)
+        'nps_score': draws.integers('nps_score', -20, 80),
+        'csat_score': draws.uniform('csat_score', 3, 5),  # 1-5 scale
+        # Randomness added to the CES (Customer Effort Score) derived from support metrics
+        'ces_adjustment': draws.uniform('ces_adjustment', -0.5, 0.5),
+        # Engagement metrics
+        'last_interaction_days': draws.integers('last_interaction_days', 1, 90),
+        'qbr_scheduled': draws.random('qbr_scheduled') < 0.5,
+        'executive_sponsor_engaged': draws.random('executive_sponsor_engaged') < 0.5,
+        # ===== RETENTION METRICS (CEO, Board) =====
+        'retention_probability': draws.uniform('retention_probability', 60, 95),
+    })
+
+    # Customer segment profitability
+    metrics['total_cost_to_serve'] = annual_revenue * draws.uniform('cost_to_serve', 0.3, 0.7)
+
+    # ===== SUBSIDIARY RELATIONSHIPS =====
+    # 1-3 subsidiaries per account, the first one primary
+    count = draws.choice('subsidiary_count', SUBSIDIARY_COUNTS, p=SUBSIDIARY_COUNT_PROBABILITIES)
+    count = np.minimum(count, len(subsidiaries))
+    slots = max(count.max(initial=0), 1)
+    picked = draws.permutation('subsidiaries', len(subsidiaries))[:, :slots] if subsidiaries \
+        else np.zeros((n, slots), dtype=np.intp)
+    in_use = np.arange(slots) < count[:, None]
+
+    # 2-5 services from each subsidiary; revenue and tickets split by service count
+    service_counts = np.stack([
+        draws.integers(f"service_count:{sub['id']}", 2, min(6, len(sub['services']) + 1))
+        for sub in subsidiaries
+    ], axis=1) if subsidiaries else np.zeros((n, 1), dtype=np.int64)
+    service_orders = [draws.permutation(f"services:{sub['id']}", len(sub['services'])) for sub in subsidiaries]
+    relationship_days = np.stack([
+        draws.integers(f"relationship_start:{sub['id']}", 365, 1825) for sub in subsidiaries
+    ], axis=1) if subsidiaries else np.zeros((n, 1), dtype=np.int64)
+
+    rows = np.arange(n)[:, None]
+    slot_services = np.where(in_use, service_counts[rows, picked], 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = np.nan_to_num(slot_services / slot_services.sum(axis=1, keepdims=True))
+    slot_revenue = _split(annual_revenue, weights, 2)
+    slot_tickets = _split(np.asarray(total_tickets, dtype=float), weights, 0).astype(np.int64)
+    slot_starts = np.datetime_as_string(
+        np.datetime64(now.to_datetime64(), 'us') - relationship_days[rows, picked].astype('timedelta64[D]')
+    )
+
+    details = []
+    for account in range(n):
+        account_details = []
+        for slot in range(count[account]):
+            sub_index = picked[account, slot]
+            subsidiary = subsidiaries[sub_index]
+            services = [subsidiary['services'][i]
+                        for i in service_orders[sub_index][account, :slot_services[account, slot]]]
+            account_details.append({
+                'subsidiary_id': subsidiary['id'],
+                'subsidiary_name': subsidiary['name'],
+                'subsidiary_short_name': subsidiary['short_name'],
+                'services': services,
+                'service_count': len(services),
+                'annual_revenue': float(slot_revenue[account, slot]),
+                'tickets_count': int(slot_tickets[account, slot]),
+                'relationship_start': str(slot_starts[account, slot]),
+                'primary': slot == 0,
+            })
+        details.append(json.dumps(account_details))
+
+    metrics['subsidiaries'] = details  # JSON array of subsidiary relationships
+    metrics['subsidiary_count'] = count
+    metrics['primary_subsidiary'] = pd.Series(
+        [subsidiaries[picked[account, 0]]['id'] if count[account] else None for account in range(n)], dtype=object
+    )
+    return metrics
@@ -0,0 +1,225 @@
+"""
+Gold Timeline
+Customer journey events from silver opportunities, support tickets and
+invoices, built column-wise and sorted by account with the newest events first
+"""
+
+import logging
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# customer_timeline columns, in output order
+TIMELINE_COLUMNS = [
+    'event_id', 'account_id', 'event_type', 'event_title', 'event_description', 'event_date', 'severity',
+    'related_amount', 'status',
+]
+
+# Arrow schema of timeline event batches written by streaming builds
+TIMELINE_SCHEMA = pa.schema([
+    ('event_id', pa.string()),
+    ('account_id', pa.string()),
+    ('event_type', pa.string()),
+    ('event_title', pa.string()),
+    ('event_description', pa.string()),
+    ('event_date', pa.timestamp('ns')),
+    ('severity', pa.string()),
+    ('related_amount', pa.float64()),
+    ('status', pa.string()),
+])
+
+# Sort keys of the timeline: account, newest first, then event id for ties
+TIMELINE_SORT = ['account_id', 'event_date', 'event_id']
+
+TICKET_SEVERITY = {'Critical': 'HIGH', 'High': 'HIGH', 'Medium': 'MEDIUM', 'Low': 'LOW'}
+CLOSED_TICKET_STATUSES = ['Resolved', 'Closed']
+
+
+def _column(df: pd.DataFrame, name: str, default: Any = None) -> pd.Series:
+    """A column, or `default` on every row when the source does not have it"""
+    return df[name] if name in df.columns else pd.Series(default, index=df.index)
+
+
+def _text(values: pd.Series) -> pd.Series:
+    return values.astype(str)
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    """Naive nanosecond timestamps; unparseable values become NaT"""
+    dates = pd.to_datetime(values, errors='coerce')
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_convert(None)
+    return dates.astype('datetime64[ns]')
+
+
+def _money(values: pd.Series) -> pd.Series:
+    return values.astype(float).map('${:,.2f}'.format).astype(str)
+
+
+def _events(rows: pd.DataFrame, **columns: Any) -> pd.DataFrame:
+    """Event frame for `rows`, one column per keyword, in TIMELINE_COLUMNS order"""
+    events = pd.DataFrame(index=rows.index)
+    for column in TIMELINE_COLUMNS:
+        events[column] = columns[column]
+    events['event_date'] = _dates(events['event_date'])
+    events['related_amount'] = events['related_amount'].astype(float)
+    return events
+
+
+def opportunity_events(opportunities: pd.DataFrame) -> pd.DataFrame:
+    """A renewal or lost-opportunity event per closed opportunity"""
+    if opportunities.empty:
+        return pd.DataFrame(columns=TIMELINE_COLUMNS)
+    closed = opportunities[(opportunities['is_closed'] == True).to_numpy()]
+    won = (closed['is_won'] == True).to_numpy()
+    return _events(
+        closed,
+        event_id='OPP_' + _text(closed['opportunity_id']),
+        account_id=closed['account_id'],
+        event_type=np.where(won, 'RENEWAL', 'OPPORTUNITY_LOST'),
+        event_title='Opportunity: ' + _text(closed['opportunity_name']),
+        event_description=_text(closed['stage']) + ' - ' + _money(closed['deal_value']),
+        event_date=closed['close_date'],
+        severity=np.where(won, 'HIGH', 'MEDIUM'),
+        related_amount=closed['deal_value'],
+        status='RESOLVED',
+    )
+
+
+def ticket_events(tickets: pd.DataFrame) -> pd.DataFrame:
+    """Opened, resolved and SLA-violated events of support tickets"""
+    if tickets.empty:
+        return pd.DataFrame(columns=TIMELINE_COLUMNS)
+    ticket_id = _text(tickets['ticket_id'])
+    subject = _text(_column(tickets, 'subject', 'Support ticket'))
+    priority = _column(tickets, 'priority', 'Medium')
+    created = _dates(tickets['created_date'])
+    closed_date = _dates(_column(tickets, 'closed_date'))
+    is_closed = closed_date.notna() | _column(tickets, 'status').isin(CLOSED_TICKET_STATUSES)
+    status = np.where(is_closed, 'RESOLVED', 'OPEN')
+
+    opened = _events(
+        tickets,
+        event_id='TKT_' + ticket_id + '_OPENED',
+        account_id=tickets['account_id'],
+        event_type='SUPPORT',
+        event_title='Ticket opened: ' + subject,
+        event_description=_text(priority) + ' priority - ' + _text(_column(tickets, 'category', 'General')),
+        event_date=created,
+        severity=priority.map(TICKET_SEVERITY).fillna('MEDIUM'),
+        related_amount=np.nan,
+        status=status,
+    )
+
+    resolved_rows = closed_date.notna().to_numpy()
+    hours = _column(tickets, 'resolution_time_hours').astype(float) \
+        .fillna((closed_date - created).dt.total_seconds() / 3600)
+    resolved = _events(
+        tickets[resolved_rows],
+        event_id='TKT_' + ticket_id[resolved_rows] + '_RESOLVED',
+        account_id=tickets['account_id'][resolved_rows],
+        event_type='SUPPORT',
+        event_title='Ticket resolved: ' + subject[resolved_rows],
+        event_description='Resolved in ' + hours[resolved_rows].map('{:.1f}'.format).astype(str) + ' hours',
+        event_date=closed_date[resolved_rows],
+        severity='LOW',
+        related_amount=np.nan,
+        status='RESOLVED',
+    )
+
+    violated_rows = (_column(tickets, 'is_sla_violated', False) == True).to_numpy()
+    violated = _events(
+        tickets[violated_rows],
+        event_id='TKT_' + ticket_id[violated_rows] + '_SLA',
+        account_id=tickets['account_id'][violated_rows],
+        event_type='SUPPORT',
+        event_title='SLA violated: ' + subject[violated_rows],
+        event_description=_text(priority[violated_rows]) + ' priority ticket missed its SLA',
+        # When the ticket closed, or when it was opened if it is still open
+        event_date=closed_date[violated_rows].fillna(created[violated_rows]),
+        severity='HIGH',
+        related_amount=np.nan,
+        status=status[violated_rows],
+    )
+    return pd.concat([opened, resolved, violated], ignore_index=True)
+
+
+def invoice_events(invoices: pd.DataFrame) -> pd.DataFrame:
+    """Issued, paid and overdue events of invoices"""
+    if invoices.empty:
+        return pd.DataFrame(columns=TIMELINE_COLUMNS)
+    invoice_id = _text(invoices['invoice_id'])
+    number = _text(_column(invoices, 'invoice_number', '')).where(
+        _column(invoices, 'invoice_number').notna(), invoice_id)
+    amount = invoices['invoice_amount'].astype(float)
+    balance = _column(invoices, 'balance', 0.0).astype(float)
+    due = _dates(_column(invoices, 'due_date'))
+
+    issued = _events(
+        invoices,
+        event_id='INV_' + invoice_id + '_ISSUED',
+        account_id=invoices['account_id'],
+        event_type='BILLING',
+        event_title='Invoice issued: ' + number,
+        event_description=_money(amount) + ' due ' + due.dt.strftime('%Y-%m-%d').fillna('on receipt'),
+        event_date=invoices['invoice_date'],
+        severity='LOW',
+        related_amount=amount,
+        status=np.where(balance > 0, 'OPEN', 'RESOLVED'),
+    )
+
+    paid_date = _dates(_column(invoices, 'paid_date'))
+    paid_rows = paid_date.notna().to_numpy()
+    paid_amount = _column(invoices, 'paid_amount', np.nan).astype(float)[paid_rows]
+    method = _column(invoices, 'payment_method')[paid_rows]
+    paid = _events(
+        invoices[paid_rows],
+        event_id='INV_' + invoice_id[paid_rows] + '_PAID',
+        account_id=invoices['account_id'][paid_rows],
+        event_type='BILLING',
+        event_title='Invoice paid: ' + number[paid_rows],
+        event_description=('Paid ' + _money(paid_amount) + (' via ' + _text(method)).where(method.notna(), '')),
+        event_date=paid_date[paid_rows],
+        severity='LOW',
+        related_amount=paid_amount,
+        status='RESOLVED',
+    )
+
+    overdue_days = _column(invoices, 'overdue_days', 0).fillna(0).astype(int)
+    overdue_rows = ((overdue_days > 0) & (balance > 0)).to_numpy()
+    overdue = _events(
+        invoices[overdue_rows],
+        event_id='INV_' + invoice_id[overdue_rows] + '_OVERDUE',
+        account_id=invoices['account_id'][overdue_rows],
+        event_type='BILLING',
+        event_title='Invoice overdue: ' + number[overdue_rows],
+        event_description=_money(balance[overdue_rows]) + ' overdue for ' + _text(overdue_days[overdue_rows]) + ' days',
+        event_date=due[overdue_rows],
+        severity='HIGH',
+        related_amount=balance[overdue_rows],
+        status='OPEN',
+    )
+    return pd.concat([issued, paid, overdue], ignore_index=True)
+
+
+def sort_timeline(events: pd.DataFrame) -> pd.DataFrame:
+    """Events by account_id, newest first within an account; events without a date come last"""
+    if events.empty:
+        return events
+    return events.sort_values(TIMELINE_SORT, ascending=[True, False, True], kind='stable',
+                              na_position='last').reset_index(drop=True)
+
+
+def build_timeline(opportunities: pd.DataFrame, tickets: pd.DataFrame, invoices: pd.DataFrame) -> pd.DataFrame:
+    """Every timeline event of the given silver rows, sorted"""
+    frames: List[pd.DataFrame] = [
+        frame for frame in (opportunity_events(opportunities), ticket_events(tickets), invoice_events(invoices))
+        if not frame.empty
+    ]
+    if not frames:
+        return pd.DataFrame()
+    return sort_timeline(pd.concat(frames, ignore_index=True))
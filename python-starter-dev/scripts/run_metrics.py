@@ -0,0 +1,252 @@
+"""
+Run Metrics
+Wall time, throughput and memory of nested pipeline stages, with optional
+cProfile or pyinstrument profiles, for run metrics files such as
+gold_run_metrics_<timestamp>.json
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ['cprofile', 'pyinstrument']
+
+# Functions listed in run metrics from a cProfile run, by cumulative time
+PROFILE_TOP_FUNCTIONS = 25
+
+_MB = 1024 * 1024
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, where /proc is available"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process so far, in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RunMetrics:
+    """
+    Timings and memory of nested stages
+
+    Each stage records wall seconds, rows processed and rows per second, and
+    the peak RSS seen while it was open: sampled when stages start and end,
+    and in the background inside sampling(). With trace_memory, the peak of
+    Python and numpy allocations (tracemalloc) is recorded too; it is exact
+    but slows allocation-heavy code down.
+
+    Args:
+        trace_memory: Trace allocations with tracemalloc
+        sample_interval: Seconds between background RSS samples
+    """
+
+    def __init__(self, trace_memory: bool = False, sample_interval: float = 0.05):
+        self.trace_memory = trace_memory
+        self.sample_interval = sample_interval
+        self.stages: List[Dict[str, Any]] = []
+        self._open: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self._start_tracing()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Sent to worker processes without the lock or open stages
+        state = dict(self.__dict__, _open=[], stages=[], _started_tracing=False)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._start_tracing()
+
+    def _start_tracing(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def _tracing(self) -> bool:
+        return self.trace_memory and tracemalloc.is_tracing()
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            for record in self._open:
+                record['_peak_rss'] = max(record['_peak_rss'], rss)
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Time a stage nested in the currently open one
+
+        Yields the stage record; set record['rows'] (or any other field) inside
+        the block when the row count is only known there.
+        """
+        parent = self._open[-1]['stages'] if self._open else self.stages
+        record = {'name': name, 'rows': rows, 'stages': []}
+        parent.append(record)
+        record['_peak_rss'] = current_rss() or 0
+        if self._tracing():
+            self._record_traced_peak()
+            record['_peak_traced'] = tracemalloc.get_traced_memory()[0]
+        with self._lock:
+            self._open.append(record)
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            self._sample()
+            if self._tracing():
+                self._record_traced_peak()
+            with self._lock:
+                self._open.remove(record)
+            if '_peak_traced' in record:
+                record['peak_traced_mb'] = round(record.pop('_peak_traced') / _MB, 1)
+
+            record['seconds'] = round(seconds, 4)
+            if record['rows'] is not None:
+                record['rows_per_second'] = round(record['rows'] / seconds) if seconds > 0 else None
+            # Without /proc, the process peak so far is the best available figure
+            record['peak_rss_mb'] = round((record.pop('_peak_rss') or peak_rss()) / _MB, 1)
+            if not record['stages']:
+                del record['stages']
+
+    def _record_traced_peak(self):
+        """Fold the traced peak since the last reset into every open stage, then reset it"""
+        _, peak = tracemalloc.get_traced_memory()
+        for record in self._open:
+            if '_peak_traced' in record:
+                record['_peak_traced'] = max(record['_peak_traced'], peak)
+        tracemalloc.reset_peak()
+
+    def attach(self, stages: List[Dict[str, Any]]):
+        """Add stage records measured elsewhere (e.g. in a worker process) under the open stage"""
+        (self._open[-1]['stages'] if self._open else self.stages).extend(stages)
+
+    @contextmanager
+    def sampling(self) -> Iterator[None]:
+        """
+        Sample RSS in a background thread while the block runs
+
+        Allocation tracing, when enabled, also ends with the block.
+        """
+        self._start_tracing()
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(self.sample_interval):
+                self._sample()
+
+        thread = threading.Thread(target=sample, name='rss-sampler', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'peak_rss_mb': round(peak_rss() / _MB, 1),
+            'trace_memory': self.trace_memory,
+            'stages': self.stages,
+        }
+
+    def save(self, path: Path, **fields: Any) -> str:
+        """Write the stages and any extra run fields as JSON"""
+        with open(path, 'w') as f:
+            json.dump(dict(fields, **self.to_dict()), f, indent=2, default=str)
+        logger.info(f"Run metrics saved to: {path}")
+        return str(path)
+
+
+@contextmanager
+def profiled(profiler: Optional[str], path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Profile the block with cProfile or pyinstrument
+
+    cProfile stats are written to <path>.prof (for pstats or snakeviz) and the
+    top functions by cumulative time are added to the yielded summary;
+    pyinstrument writes an HTML report to <path>.html.
+
+    Args:
+        profiler: One of PROFILERS, or None to not profile
+        path: Output file path without extension
+
+    Yields:
+        Summary filled in when the block ends (empty without a profiler)
+    """
+    summary: Dict[str, Any] = {}
+    if profiler is None:
+        yield summary
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}'; expected one of {PROFILERS}")
+    if profiler == 'pyinstrument' and not PYINSTRUMENT_AVAILABLE:
+        raise RuntimeError("pyinstrument is not installed. Install it or use --profile cprofile.")
+
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield summary
+        finally:
+            profile.disable()
+            summary['file'] = f'{path}.prof'
+            profile.dump_stats(summary['file'])
+            stats = pstats.Stats(profile, stream=io.StringIO()).sort_stats('cumulative')
+            summary['top_functions'] = [
+                {
+                    'function': f'{filename}:{line}({name})',
+                    'calls': calls,
+                    'total_seconds': round(total, 4),
+                    'cumulative_seconds': round(cumulative, 4),
+                }
+                for (filename, line, name), (_, calls, total, cumulative, _) in
+                sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+            ]
+    else:
+        profile = PyinstrumentProfiler()
+        profile.start()
+        try:
+            yield summary
+        finally:
+            profile.stop()
+            summary['file'] = f'{path}.html'
+            with open(summary['file'], 'w') as f:
+                f.write(profile.output_html())
+    logger.info(f"Profile saved to: {summary['file']}")
@@ -0,0 +1,516 @@
+"""
+Pipeline Runner
+Runs bronze → silver → gold as a DAG of stages with declared inputs and
+outputs. A stage is skipped when the content hashes of its inputs, config
+and code match its last successful run, independent stages run in parallel
+processes, and every run writes a report with per-stage wall time, rows in
+and out, and peak RSS.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_PATH = Path(__file__).parent
+CONFIG_PATH = SCRIPTS_PATH.parent / 'config'
+
+TABLES = ['account', 'opportunity', 'opportunity_line_item', 'contact']
+
+# Silver tables the gold stage reads as they are; no bronze source produces them
+GOLD_ONLY_SILVER_TABLES = ['ticket', 'invoice']
+
+# Tables with currency fields (see CurrencyNormalizer.normalize_table)
+CURRENCY_TABLES = ['account', 'opportunity', 'opportunity_line_item']
+
+# Stage cache and run reports, under the configured pipeline_path
+CACHE_FILE = 'pipeline_cache.json'
+
+# Bumped when the cache key recipe changes, so old entries are not reused
+CACHE_VERSION = 1
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step, run in its own process
+
+    Args:
+        name: Unique stage name
+        run: Module-level function called as run(inputs, **options); returns
+            {'outputs': {name: file}, 'rows_in': int, 'rows_out': int}
+        inputs: Input name -> file
+        upstream: Input name -> (stage, output name) of another stage
+        hashed_files: Config and code files that are part of the cache key
+        options: Keyword arguments for run, also part of the cache key
+        cacheable: False for stages reading external systems, which always run
+    """
+    name: str
+    run: Callable[..., Dict[str, Any]]
+    inputs: Dict[str, str] = field(default_factory=dict)
+    upstream: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    hashed_files: List[str] = field(default_factory=list)
+    options: Dict[str, Any] = field(default_factory=dict)
+    cacheable: bool = True
+
+
+# ----------------------------------------------------------------------
+# Stage functions (run in worker processes)
+# ----------------------------------------------------------------------
+
+def extract_bronze(inputs: Dict[str, str], config_path: str, table: str) -> Dict[str, Any]:
+    """Extract one Salesforce table to bronze"""
+    from extract_bronze import SalesforceBronzeExtractor
+
+    extractor = SalesforceBronzeExtractor(config_path)
+    df = extractor.extract_table(table)
+    return {'outputs': {'bronze': extractor.save_to_parquet(df, table)}, 'rows_in': len(df), 'rows_out': len(df)}
+
+
+def transform_silver(inputs: Dict[str, str], config_path: str, mapping_path: str, table: str) -> Dict[str, Any]:
+    """Transform one bronze table to silver"""
+    import pandas as pd
+    from transform_silver import SilverLayerTransformer
+
+    transformer = SilverLayerTransformer(config_path, mapping_path)
+    bronze_df = pd.read_parquet(inputs['bronze'])
+    silver_df = transformer.transform_table(table, bronze_df)
+    return {
+        'outputs': {'silver': transformer.save_silver(silver_df, table)},
+        'rows_in': len(bronze_df),
+        'rows_out': len(silver_df),
+    }
+
+
+def normalize_currency(inputs: Dict[str, str], config_path: str, table: str) -> Dict[str, Any]:
+    """Convert one silver table's currency fields to USD"""
+    import pandas as pd
+    from currency_normalizer import CurrencyNormalizer
+
+    normalizer = CurrencyNormalizer(config_path)
+    df = pd.read_parquet(inputs['silver'])
+    rows_in = len(df)
+    normalized_df = normalizer.normalize_table(table, df)
+    return {
+        'outputs': {'silver': normalizer.save_normalized(normalized_df, table)},
+        'rows_in': rows_in,
+        'rows_out': len(normalized_df),
+    }
+
+
+def link_accounts(inputs: Dict[str, str], config_path: str) -> Dict[str, Any]:
+    """Link accounts across regions"""
+    from account_linker import AccountLinker
+
+    linker = AccountLinker(config_path, silver_files=inputs)
+    results = linker.link_accounts()
+    return {
+        'outputs': {table_name: info['file'] for table_name, info in results.items()},
+        'rows_in': len(linker.accounts),
+        'rows_out': sum(info['records'] for info in results.values()),
+    }
+
+
+def aggregate_gold(inputs: Dict[str, str], config_path: str, metrics_path: str, as_of: str) -> Dict[str, Any]:
+    """
+    Build the gold tables from the silver tables
+
+    Time windows are computed as of the start of as_of (an ISO date), which
+    is part of the stage's cache key, so a cached result is always for the
+    date it is keyed under.
+    """
+    from aggregate_gold import SILVER_TABLES, GoldLayerAggregator
+
+    aggregator = GoldLayerAggregator(config_path, metrics_path, silver_files=inputs)
+    aggregator.as_of = datetime.fromisoformat(as_of)
+    results = aggregator.create_gold_layer()
+    return {
+        'outputs': {table_name: info['file'] for table_name, info in results.items()},
+        'rows_in': sum(len(getattr(aggregator, attribute)) for attribute in SILVER_TABLES.values()),
+        'rows_out': sum(info['records'] for info in results.values()),
+    }
+
+
+def _run_stage(run: Callable[..., Dict[str, Any]], inputs: Dict[str, str],
+               options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a stage function and measure it; each call gets a fresh process"""
+    start = time.perf_counter()
+    result = run(inputs, **options)
+    result['wall_seconds'] = round(time.perf_counter() - start, 3)
+    # ru_maxrss is in kilobytes on Linux
+    result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Pipeline definition
+# ----------------------------------------------------------------------
+
+def _latest_layer_file(path: Path, layer: str, table: str) -> Optional[str]:
+    """
+    Most recent <layer>_<table>_<timestamp or suffix>.parquet in path
+
+    The exact pattern keeps 'opportunity' from picking up opportunity_line_item files.
+    """
+    pattern = re.compile(rf'^{layer}_{table}_(\d{{8}}_\d{{6}}|[a-z0-9]+)\.parquet$')
+    files = [f for f in path.glob(f'{layer}_{table}_*.parquet') if pattern.match(f.name)]
+    return str(max(files, key=lambda f: f.stat().st_mtime)) if files else None
+
+
+def latest_bronze_file(bronze_path: Path, table: str) -> Optional[str]:
+    """Most recent bronze file for a table"""
+    return _latest_layer_file(bronze_path, 'bronze', table)
+
+
+def latest_silver_file(silver_path: Path, table: str) -> Optional[str]:
+    """Most recent silver file for a table"""
+    return _latest_layer_file(silver_path, 'silver', table)
+
+
+def pipeline_stages(config_path: str, mapping_path: str, metrics_path: str, tables: List[str] = TABLES,
+                    extract: bool = False, normalize: bool = True, link: bool = True) -> List[Stage]:
+    """
+    Stages of the bronze → silver → gold pipeline
+
+    Args:
+        config_path: Pipeline configuration (paths and Salesforce credentials)
+        mapping_path: Bronze to silver mapping
+        metrics_path: Silver to gold metrics configuration
+        tables: Tables to process
+        extract: Extract bronze from Salesforce; otherwise the latest bronze files are inputs
+        normalize: Convert currency fields to USD before aggregating
+        link: Link accounts across regions
+    """
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    bronze_path = Path(config.get('bronze_path', './data/bronze'))
+    silver_path = Path(config.get('silver_path', './data/silver'))
+
+    stages = []
+    silver = {}
+    for table in tables:
+        if extract:
+            stages.append(Stage(
+                name=f'extract_bronze:{table}',
+                run=extract_bronze,
+                options={'config_path': config_path, 'table': table},
+                cacheable=False,
+            ))
+            bronze = {'upstream': {'bronze': (f'extract_bronze:{table}', 'bronze')}}
+        else:
+            bronze_file = latest_bronze_file(bronze_path, table)
+            if bronze_file is None:
+                raise FileNotFoundError(f"No bronze file for {table} in {bronze_path}; run with --extract")
+            bronze = {'inputs': {'bronze': bronze_file}}
+
+        stages.append(Stage(
+            name=f'transform_silver:{table}',
+            run=transform_silver,
+            hashed_files=[config_path, mapping_path, str(SCRIPTS_PATH / 'transform_silver.py'),
+                          str(SCRIPTS_PATH / 'silver_transformations.py')],
+            options={'config_path': config_path, 'mapping_path': mapping_path, 'table': table},
+            **bronze
+        ))
+        silver[table] = (f'transform_silver:{table}', 'silver')
+
+        if normalize and table in CURRENCY_TABLES:
+            stages.append(Stage(
+                name=f'normalize_currency:{table}',
+                run=normalize_currency,
+                upstream={'silver': silver[table]},
+                hashed_files=[config_path, str(SCRIPTS_PATH / 'currency_normalizer.py')],
+                options={'config_path': config_path, 'table': table},
+            ))
+            silver[table] = (f'normalize_currency:{table}', 'silver')
+
+    if link and 'account' in silver:
+        stages.append(Stage(
+            name='link_accounts',
+            run=link_accounts,
+            upstream={table: silver[table] for table in ['account', 'contact'] if table in silver},
+            hashed_files=[config_path, str(SCRIPTS_PATH / 'account_linker.py')],
+            options={'config_path': config_path},
+        ))
+
+    # Tickets and invoices are inputs too, so the gold stage reruns when they change.
+    # Its metrics have time windows (current year, renewals in the next 180 days),
+    # so it also reruns when the date changes.
+    external = {table: latest_silver_file(silver_path, table) for table in GOLD_ONLY_SILVER_TABLES}
+    stages.append(Stage(
+        name='aggregate_gold',
+        run=aggregate_gold,
+        inputs={table: path for table, path in external.items() if path is not None},
+        upstream=silver,
+        hashed_files=[config_path, metrics_path, str(CONFIG_PATH / 'subsidiaries.json'),
+                      str(SCRIPTS_PATH / 'aggregate_gold.py'), str(SCRIPTS_PATH / 'gold_rules.py'),
+                      str(SCRIPTS_PATH / 'gold_expressions.py'), str(SCRIPTS_PATH / 'gold_line_items.py'),
+                      str(SCRIPTS_PATH / 'gold_simulation.py'), str(SCRIPTS_PATH / 'gold_timeline.py'),
+                      str(SCRIPTS_PATH / 'run_metrics.py')],
+        options={'config_path': config_path, 'metrics_path': metrics_path,
+                 'as_of': datetime.now().date().isoformat()},
+    ))
+    return stages
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+class PipelineRunner:
+    """
+    Run stages in dependency order, skipping those that are up to date
+
+    A stage's cache key hashes its name, function, options, input files
+    (including upstream outputs) and hashed_files. It is up to date when the
+    key matches its last successful run and that run's outputs are unchanged.
+    """
+
+    def __init__(self, stages: List[Stage], state_path: Path, workers: Optional[int] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Pipeline stage names must be unique")
+        self.order = self._topological_order()
+        self.state_path = Path(state_path)
+        self.state_path.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+
+        self.cache = self._load_cache()
+        # Content hash per file, reused while size and mtime are unchanged
+        self.file_hashes: Dict[str, Dict[str, Any]] = self.cache.pop('_files', {})
+
+    def _topological_order(self) -> List[str]:
+        """Stage names with every stage after its upstream stages"""
+        order, state = [], {}
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Pipeline has a cycle: {' -> '.join(path + (name,))}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown upstream stage '{name}' of {path[-1]}")
+            state[name] = 'visiting'
+            for upstream, _ in self.stages[name].upstream.values():
+                visit(upstream, path + (name,))
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    def _load_cache(self) -> Dict[str, Any]:
+        cache_file = self.state_path / CACHE_FILE
+        if not cache_file.exists():
+            return {}
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+        return cache if cache.get('_version') == CACHE_VERSION else {}
+
+    def _save_cache(self):
+        with open(self.state_path / CACHE_FILE, 'w') as f:
+            json.dump(dict(self.cache, _version=CACHE_VERSION, _files=self.file_hashes), f, indent=2)
+
+    def file_hash(self, path: str) -> Optional[str]:
+        """sha256 of a file's content, or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        known = self.file_hashes.get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self.file_hashes[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+    def cache_key(self, stage: Stage, inputs: Dict[str, str]) -> str:
+        """Content hash of everything a stage's result depends on"""
+        key = {
+            'version': CACHE_VERSION,
+            'stage': stage.name,
+            'run': f'{stage.run.__module__}.{stage.run.__qualname__}',
+            'options': stage.options,
+            'inputs': {name: self.file_hash(path) for name, path in sorted(inputs.items())},
+            'files': {path: self.file_hash(path) for path in sorted(stage.hashed_files)},
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _up_to_date(self, stage: Stage, key: str) -> bool:
+        previous = self.cache.get(stage.name)
+        return (
+            stage.cacheable and previous is not None and previous['key'] == key
+            and all(self.file_hash(path) == digest for path, digest in previous['output_hashes'].items())
+        )
+
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Run the pipeline
+
+        Args:
+            force: Run every stage, even if up to date
+
+        Returns:
+            Run report, also saved as pipeline_run_<timestamp>.json
+        """
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = list(self.order)
+        running = {}
+
+        # A fresh process per stage keeps peak RSS per stage
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context, max_tasks_per_child=1) as pool:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    upstream = [results.get(up) for up, _ in stage.upstream.values()]
+                    if any(r is None or r['status'] == 'running' for r in upstream):
+                        continue
+                    pending.remove(name)
+                    if any(r['status'] in ('failed', 'skipped') for r in upstream):
+                        results[name] = {'status': 'skipped', 'error': 'upstream stage did not complete'}
+                        continue
+
+                    inputs = dict(stage.inputs)
+                    inputs.update({
+                        input_name: results[up]['outputs'][output]
+                        for input_name, (up, output) in stage.upstream.items()
+                    })
+                    key = self.cache_key(stage, inputs)
+                    if not force and self._up_to_date(stage, key):
+                        cached = self.cache[name]
+                        results[name] = {'status': 'cached', 'key': key, 'outputs': cached['outputs'],
+                                         'rows_in': cached['rows_in'], 'rows_out': cached['rows_out']}
+                        logger.info(f"Stage {name} is up to date")
+                        continue
+
+                    logger.info(f"Running stage {name}")
+                    results[name] = {'status': 'running', 'key': key}
+                    running[pool.submit(_run_stage, stage.run, inputs, stage.options)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Stage {name} failed: {e}")
+                        results[name] = {'status': 'failed', 'key': results[name]['key'], 'error': str(e)}
+                        continue
+
+                    results[name] = dict(result, status='ran', key=results[name]['key'])
+                    if self.stages[name].cacheable:
+                        self.cache[name] = {
+                            'key': results[name]['key'],
+                            'outputs': result['outputs'],
+                            'output_hashes': {path: self.file_hash(path) for path in result['outputs'].values()},
+                            'rows_in': result['rows_in'],
+                            'rows_out': result['rows_out'],
+                            'finished_at': datetime.utcnow().isoformat(),
+                        }
+                    self._save_cache()
+
+        self._save_cache()
+        report = {
+            'started_at': started_at.isoformat(),
+            'finished_at': datetime.utcnow().isoformat(),
+            'wall_seconds': round(time.perf_counter() - start, 3),
+            'workers': self.workers,
+            'stages': [dict(results[name], stage=name) for name in self.order],
+        }
+        report_file = self.state_path / f"pipeline_run_{started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        report['file'] = str(report_file)
+
+        logger.info(f"Pipeline run complete. Report saved to: {report_file}")
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the bronze → silver → gold pipeline')
+    parser.add_argument(
+        '--config',
+        type=str,
+        default='./config/salesforce_config.json',
+        help='Path to configuration file'
+    )
+    parser.add_argument(
+        '--mapping',
+        type=str,
+        default='./config/bronze_to_silver_mapping.json',
+        help='Path to transformation mapping file'
+    )
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        default='./config/silver_to_gold_metrics.json',
+        help='Path to metrics configuration file'
+    )
+    parser.add_argument(
+        '--tables',
+        type=str,
+        default=','.join(TABLES),
+        help='Comma-separated list of tables to process'
+    )
+    parser.add_argument('--extract', action='store_true', help='Extract bronze from Salesforce first')
+    parser.add_argument('--no-currency', action='store_true', help='Skip currency normalization')
+    parser.add_argument('--no-link', action='store_true', help='Skip cross-regional account linking')
+    parser.add_argument('--force', action='store_true', help='Run every stage, even if up to date')
+    parser.add_argument('--workers', type=int, default=None, help='Stages run at once (default: CPU count)')
+
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        state_path = Path(json.load(f).get('pipeline_path', './data/pipeline'))
+
+    stages = pipeline_stages(
+        args.config, args.mapping, args.metrics,
+        tables=[t.strip() for t in args.tables.split(',')],
+        extract=args.extract, normalize=not args.no_currency, link=not args.no_link,
+    )
+    report = PipelineRunner(stages, state_path, workers=args.workers).run(force=args.force)
+
+    print(f"\n✅ Pipeline run complete in {report['wall_seconds']:.1f}s")
+    print(f"{'stage':<42} {'status':<8} {'seconds':>8} {'rows in':>10} {'rows out':>10} {'peak MB':>8}")
+    for stage in report['stages']:
+        print(f"{stage['stage']:<42} {stage['status']:<8} {stage.get('wall_seconds', 0):>8.2f} "
+              f"{stage.get('rows_in', 0):>10} {stage.get('rows_out', 0):>10} {stage.get('peak_rss_mb', 0):>8.1f}")
+    print(f"Report: {report['file']}")
+
+    failed = [stage for stage in report['stages'] if stage['status'] == 'failed']
+    for stage in failed:
+        print(f"❌ {stage['stage']}: {stage['error']}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Silver Transformations
+Column transformations named in bronze_to_silver_mapping.json, each applied
+to a whole bronze column at once. Values a transformation cannot convert are
+kept as they are and counted, rather than logged one by one
+"""
+
+import logging
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_TYPE_MAPPING = {
+    'CUSTOMER': 'Enterprise',
+    'PARTNER': 'Wholesale',
+    'PROSPECT': 'SMB'
+}
+
+REGION_MAPPING = {
+    'South Africa': 'South Africa',
+    'ZA': 'South Africa',
+    'Kenya': 'Kenya',
+    'KE': 'Kenya',
+    'Nigeria': 'Nigeria',
+    'NG': 'Nigeria',
+    'USA': 'North America',
+    'United States': 'North America',
+    'UK': 'Europe',
+    'United Kingdom': 'Europe'
+}
+
+STAGE_MAPPING = {
+    'PROSPECTING': 'Prospecting',
+    'QUALIFICATION': 'Qualification',
+    'PROPOSAL': 'Proposal',
+    'NEGOTIATION': 'Negotiation',
+    'CLOSED WON': 'Closed Won',
+    'CLOSED LOST': 'Closed Lost'
+}
+
+# A transformed column and how many of its values could not be converted (kept as is)
+Transformed = Tuple[pd.Series, int]
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """str(value) of every value, missing values kept missing"""
+    if pd.api.types.is_string_dtype(values.dtype) and values.dtype != object:
+        return values
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values.map(str, na_action='ignore').astype('str')
+    return values.astype('str')
+
+
+def _mapped(values: pd.Series, mapping: Dict[str, str]) -> pd.Series:
+    """mapping[value] where the value is a key, otherwise the value"""
+    return values.map(mapping).fillna(values)
+
+
+def _standardized(values: pd.Series, mapping: Dict[str, str]) -> pd.Series:
+    """mapping[upper-cased text] where that is a key, otherwise the text"""
+    text = _text(values)
+    return text.str.upper().map(mapping).fillna(text)
+
+
+def _missing_as_none(values: pd.Series) -> pd.Series:
+    """Object column with None for missing values"""
+    return values.astype(object).where(values.notna().to_numpy(), None)
+
+
+def _infallible(transformation: Callable[[pd.Series], pd.Series]) -> Callable[[pd.Series], Transformed]:
+    return lambda values: (transformation(values), 0)
+
+
+def _convert_failures(values: pd.Series, result: pd.Series, unconverted: np.ndarray,
+                      convert: Callable[[Any], Any]) -> Transformed:
+    """
+    Convert the values the vectorized path left unconverted one by one
+
+    These are few in practice (empty strings, unusual spellings). Values
+    `convert` rejects too are kept as they are.
+    """
+    if not unconverted.any():
+        return result, 0
+
+    converted, failed = [], []
+    for value in values[unconverted].tolist():
+        try:
+            converted.append(convert(value))
+            failed.append(False)
+        except (TypeError, ValueError, OverflowError):
+            converted.append(value)
+            failed.append(True)
+
+    if any(failed):
+        result = result.astype(object)
+    result[unconverted] = converted
+    return result, sum(failed)
+
+
+def _numbers(divisor: float) -> Callable[[pd.Series], Transformed]:
+    """float(value) / divisor, with empty and zero values as 0.0"""
+
+    def convert(value: Any) -> float:
+        return float(value) / divisor if value else 0.0
+
+    def transformation(values: pd.Series) -> Transformed:
+        numbers = pd.to_numeric(values, errors='coerce').astype(float)
+        unconverted = (numbers.isna() & values.notna()).to_numpy()
+        return _convert_failures(values, numbers / divisor, unconverted, convert)
+    return transformation
+
+
+def _dates(values: pd.Series) -> Transformed:
+    """
+    Calendar date of each value
+
+    ISO 8601 text (what the extract writes) is parsed in one pass; anything
+    else is parsed value by value, as pd.to_datetime would.
+    """
+    try:
+        parsed = pd.to_datetime(values, format='ISO8601', errors='coerce')
+    except (TypeError, ValueError):
+        # e.g. mixed UTC offsets, which only parse value by value
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    dates = _missing_as_none(parsed.dt.date.where(parsed.notna()))
+    unconverted = (parsed.isna() & values.notna()).to_numpy()
+    return _convert_failures(values, dates, unconverted, lambda value: pd.to_datetime(value).date())
+
+
+def _booleans(values: pd.Series) -> Transformed:
+    """bool(value): zero and empty values are False"""
+    if pd.api.types.is_bool_dtype(values.dtype):
+        truth = values
+    elif pd.api.types.is_numeric_dtype(values.dtype):
+        truth = values != 0
+    elif pd.api.types.is_string_dtype(values.dtype) and values.dtype != object:
+        truth = values.str.len() > 0
+    else:
+        truth = values.map(bool, na_action='ignore')
+    present = values.notna()
+    return (truth.astype(bool) if present.all() else _missing_as_none(truth.where(present))), 0
+
+
+def _zero_if_missing(values: pd.Series) -> Transformed:
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.fillna(0), 0
+    return values.astype(object).where(values.notna().to_numpy(), 0), 0
+
+
+# Whole-column implementations of each transformation name in the bronze to
+# silver mapping. Missing values stay missing, except for null_to_zero.
+TRANSFORMATIONS: Dict[str, Callable[[pd.Series], Transformed]] = {
+    'trim': _infallible(lambda values: _text(values).str.strip()),
+    'trim_upper': _infallible(lambda values: _text(values).str.strip().str.upper()),
+    'trim_lower': _infallible(lambda values: _text(values).str.strip().str.lower()),
+    'standardize_account_type': _infallible(lambda values: _standardized(values, ACCOUNT_TYPE_MAPPING)),
+    'standardize_stage': _infallible(lambda values: _standardized(values, STAGE_MAPPING)),
+    'map_country_to_region': _infallible(lambda values: _mapped(values, REGION_MAPPING)),
+    'standardize_phone': _infallible(
+        lambda values: _text(values).str.replace(r'[^0-9+]', '', regex=True)
+    ),
+    # Amounts are taken to be in USD already; currency_normalizer converts them
+    'convert_to_usd': _numbers(1.0),
+    'divide_by_100': _numbers(100.0),
+    'parse_date': _dates,
+    'to_boolean': _booleans,
+    'null_to_zero': _zero_if_missing,
+}
+
+
+def transform_column(values: pd.Series, transformation: str) -> Transformed:
+    """
+    A bronze column with a named transformation applied to all its values
+
+    Names not in TRANSFORMATIONS ('none', 'calculate_in_gold') leave the
+    column as it is.
+
+    Returns:
+        (transformed column, number of values that could not be converted and were kept as is)
+    """
+    if transformation not in TRANSFORMATIONS:
+        return values, 0
+    return TRANSFORMATIONS[transformation](values)
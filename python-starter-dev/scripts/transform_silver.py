@@ -12,7 +12,8 @@ from typing import Dict, Any, List
 import pandas as pd
 import numpy as np
 import pyarrow.parquet as pq
-import re
+
+from silver_transformations import REGION_MAPPING, transform_column
 
 logging.basicConfig(
     level=logging.INFO,
@@ -34,18 +35,7 @@ class SilverLayerTransformer:
         'GBP': 1.27
     }
 
-    REGION_MAPPING = {
-        'South Africa': 'South Africa',
-        'ZA': 'South Africa',
-        'Kenya': 'Kenya',
-        'KE': 'Kenya',
-        'Nigeria': 'Nigeria',
-        'NG': 'Nigeria',
-        'USA': 'North America',
-        'United States': 'North America',
-        'UK': 'Europe',
-        'United Kingdom': 'Europe'
-    }
+    REGION_MAPPING = REGION_MAPPING
 
     def __init__(self, config_path: str, mapping_path: str):
         """Initialize transformer with configuration"""
@@ -59,61 +49,18 @@ class SilverLayerTransformer:
         self.silver_path = Path(self.config.get('silver_path', './data/silver'))
         self.silver_path.mkdir(parents=True, exist_ok=True)
 
+        # Values left untransformed per table and target column, by the last transform_table
+        self.failed_values: Dict[str, Dict[str, int]] = {}
+
         logger.info("Silver layer transformer initialized")
 
     def apply_transformation(self, value: Any, transformation: str, column_name: str = '') -> Any:
-        """Apply specified transformation to value"""
-        if pd.isna(value):
-            if transformation == 'null_to_zero':
-                return 0
-            return None
-
-        try:
-            if transformation == 'trim_upper':
-                return str(value).strip().upper()
-            elif transformation == 'trim':
-                return str(value).strip()
-            elif transformation == 'trim_lower':
-                return str(value).strip().lower()
-            elif transformation == 'standardize_account_type':
-                type_map = {
-                    'CUSTOMER': 'Enterprise',
-                    'PARTNER': 'Wholesale',
-                    'PROSPECT': 'SMB'
-                }
-                return type_map.get(str(value).upper(), str(value))
-            elif transformation == 'map_country_to_region':
-                return self.REGION_MAPPING.get(value, value)
-            elif transformation == 'convert_to_usd':
-                # Assume value is in local currency, default to USD if unknown
-                return float(value) if value else 0.0
-            elif transformation == 'parse_date':
-                return pd.to_datetime(value).date()
-            elif transformation == 'null_to_zero':
-                return 0 if pd.isna(value) else value
-            elif transformation == 'divide_by_100':
-                return float(value) / 100.0 if value else 0.0
-            elif transformation == 'to_boolean':
-                return bool(value)
-            elif transformation == 'standardize_stage':
-                stage_map = {
-                    'PROSPECTING': 'Prospecting',
-                    'QUALIFICATION': 'Qualification',
-                    'PROPOSAL': 'Proposal',
-                    'NEGOTIATION': 'Negotiation',
-                    'CLOSED WON': 'Closed Won',
-                    'CLOSED LOST': 'Closed Lost'
-                }
-                return stage_map.get(str(value).upper(), str(value))
-            elif transformation == 'standardize_phone':
-                # Remove non-numeric characters
-                phone = re.sub(r'[^0-9+]', '', str(value))
-                return phone
-            else:
-                return value
-        except Exception as e:
-            logger.warning(f"Transformation '{transformation}' failed for value '{value}': {e}")
-            return value
+        """Apply specified transformation to a single value"""
+        transformed, failed = transform_column(pd.Series([value], dtype=object), transformation)
+        if failed:
+            logger.warning(f"Transformation '{transformation}' failed for value '{value}'")
+        result = transformed.iloc[0]
+        return None if pd.api.types.is_scalar(result) and pd.isna(result) else result
 
     def transform_table(self, table_name: str, bronze_df: pd.DataFrame) -> pd.DataFrame:
         """Transform a table from bronze to silver layer"""
@@ -125,6 +72,7 @@ class SilverLayerTransformer:
 
         # Create new dataframe for silver layer
         silver_data = {}
+        failed_values = {}
 
         # Transform mapped columns
         for col_config in table_mapping['columns']:
@@ -136,12 +84,17 @@ class SilverLayerTransformer:
                 logger.warning(f"Source column '{source_col}' not found in bronze data")
                 continue
 
-            # Apply transformation
-            silver_data[target_col] = bronze_df[source_col].apply(
-                lambda x: self.apply_transformation(x, transformation, target_col)
-            )
+            # Apply transformation to the whole column
+            silver_data[target_col], failed = transform_column(bronze_df[source_col], transformation)
+            if failed:
+                failed_values[target_col] = failed
+                logger.warning(
+                    f"Transformation '{transformation}' failed for {failed} of {len(bronze_df)} values "
+                    f"of '{source_col}'; they were kept as is"
+                )
 
         silver_df = pd.DataFrame(silver_data)
+        self.failed_values[table_name] = failed_values
 
         # Add metadata
         silver_df['_processed_at'] = datetime.utcnow()
@@ -197,7 +150,8 @@ class SilverLayerTransformer:
                 metrics['tables_processed'].append({
                     'table': table,
                     'records': len(silver_df),
-                    'file': filepath
+                    'file': filepath,
+                    'failed_values': self.failed_values[table]
                 })
                 metrics['total_records'] += len(silver_df)
 
@@ -0,0 +1,55 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The API and pipeline scripts are run from their own directories, not installed.
+# `src` goes first so the `app` package wins over api/app.py.
+for path in (ROOT / 'scripts', ROOT / 'api', ROOT / 'src'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture(scope='session')
+def api():
+    """The Flask API module (api/app.py), imported under a non-clashing name"""
+    spec = importlib.util.spec_from_file_location('customer360_api', ROOT / 'api' / 'app.py')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def client(api):
+    return api.app.test_client()
+
+
+@pytest.fixture(scope='module')
+def customers(api):
+    """The customer_360_metrics snapshot the API serves"""
+    return api.data_loader.load_latest('customer_360_metrics')
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """A running fake OpenAI server with the API pointed at it"""
+    from fake_llm_server import FakeLLMServer
+
+    server = FakeLLMServer().start()
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('OPENAI_BASE_URL', server.base_url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def _reset_chatbot_state():
+    """Cached answers and LLM circuit state from one test must not leak into the next"""
+    module = sys.modules.get('customer360_api')
+    if module is not None:
+        module.response_cache.clear()
+        module.llm_client.breaker.reset()
@@ -0,0 +1,157 @@
+"""
+Fake LLM Server
+Minimal OpenAI-compatible chat completions endpoint for tests and offline
+development. Point the API at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+    python tests/fake_llm_server.py --port 8765 --reply "Hello there"
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMServer:
+    """
+    Serves a fixed reply, streamed word by word when the client asks for a stream
+
+    Set `fail_requests` to answer the next N requests with HTTP 500, and
+    `response_delay` to stall before responding (e.g. to trigger timeouts).
+
+    As a stub tool-calling model: when `tool_calls` holds (name, arguments)
+    pairs and the request offers tools, the first round answers with those
+    calls; once the request carries tool results it answers with the reply.
+    """
+
+    def __init__(self, reply: str = 'This is a reply from the fake LLM.', chunk_delay: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.fail_requests = 0
+        self.response_delay = 0.0
+        self.tool_calls = []
+        self.requests = []
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def chunks(self):
+        words = self.reply.split(' ')
+        return [word if i == 0 else f' {word}' for i, word in enumerate(words)]
+
+    def wants_tool_calls(self, body: dict) -> bool:
+        messages = body.get('messages') or [{}]
+        return bool(self.tool_calls and body.get('tools') and body.get('tool_choice') != 'none'
+                    and messages[-1].get('role') != 'tool')
+
+    def tool_call_payload(self):
+        return [
+            {'id': f'call_{i}', 'type': 'function', 'function': {'name': name, 'arguments': json.dumps(arguments)}}
+            for i, (name, arguments) in enumerate(self.tool_calls)
+        ]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                server.requests.append(body)
+                if server.response_delay:
+                    time.sleep(server.response_delay)
+                if server.fail_requests > 0:
+                    server.fail_requests -= 1
+                    payload = json.dumps({'error': {'message': 'Injected failure', 'type': 'server_error'}}).encode()
+                    self.send_response(500)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                base = {'id': 'chatcmpl-fake', 'created': int(time.time()), 'model': body.get('model', 'fake')}
+                calls = server.tool_call_payload() if server.wants_tool_calls(body) else None
+
+                if not body.get('stream'):
+                    message = {'role': 'assistant', 'content': server.reply}
+                    if calls:
+                        message = {'role': 'assistant', 'content': None, 'tool_calls': calls}
+                    payload = json.dumps({
+                        **base,
+                        'object': 'chat.completion',
+                        'choices': [{
+                            'index': 0,
+                            'message': message,
+                            'finish_reason': 'tool_calls' if calls else 'stop',
+                        }],
+                        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+                    }).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                if calls:
+                    # Name first, then the arguments split in two fragments, like the real API
+                    deltas = [{'role': 'assistant', 'content': None}]
+                    for i, call in enumerate(calls):
+                        arguments = call['function']['arguments']
+                        half = len(arguments) // 2
+                        deltas.append({'tool_calls': [{'index': i, 'id': call['id'], 'type': 'function',
+                                                       'function': {'name': call['function']['name'], 'arguments': ''}}]})
+                        deltas.append({'tool_calls': [{'index': i, 'function': {'arguments': arguments[:half]}}]})
+                        deltas.append({'tool_calls': [{'index': i, 'function': {'arguments': arguments[half:]}}]})
+                else:
+                    deltas = [{'role': 'assistant', 'content': ''}] + [{'content': c} for c in server.chunks()]
+                for i, delta in enumerate(deltas):
+                    finish = ('tool_calls' if calls else 'stop') if i == len(deltas) - 1 else None
+                    chunk = {**base, 'object': 'chat.completion.chunk',
+                             'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}]}
+                    self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode())
+                    self.wfile.flush()
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                self.wfile.write(b'data: [DONE]\n\n')
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self) -> 'FakeLLMServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a fake OpenAI-compatible chat completions server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--reply', default='This is a reply from the fake LLM.')
+    parser.add_argument('--chunk-delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    fake = FakeLLMServer(args.reply, args.chunk_delay, port=args.port)
+    print(f'Fake LLM listening on {fake.base_url}')
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
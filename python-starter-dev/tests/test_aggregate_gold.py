@@ -0,0 +1,562 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate_gold import GoldLayerAggregator, shard_of
+
+NOW = datetime.now()
+METRICS_CONFIG = Path(__file__).resolve().parent.parent / 'config' / 'silver_to_gold_metrics.json'
+
+
+def _date(days):
+    return (NOW + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def _write_silver(tmp_path):
+    """Silver tables and a config reading them; returns the config path"""
+    silver = tmp_path / 'silver'
+    silver.mkdir()
+    accounts = pd.DataFrame({
+        'account_id': ['A1', 'A2', 'A3'],
+        'account_name': ['Alpha', 'Beta', 'Gamma'],
+        'region': ['East Africa', 'West Africa', 'East Africa'],
+        'customer_since': ['2020-01-01', '2021-01-01', '2022-01-01'],
+    })
+    opportunities = pd.DataFrame({
+        'opportunity_id': ['O1', 'O2', 'O3', 'O4', 'O5', 'O6'],
+        'account_id': ['A1', 'A1', 'A1', 'A2', 'A2', 'A1'],
+        'opportunity_name': ['Fiber 1', 'Mobile 2', 'Cloud 3', 'Fiber 4', 'IoT 5', 'Voice 6'],
+        'stage': ['Closed Won', 'Closed Won', 'Proposal', 'Closed Lost', 'Negotiation', 'Prospecting'],
+        'deal_value': [100.0, 250.5, 80.0, 40.0, 60.0, 30.0],
+        'close_date': [_date(-10), _date(-400), _date(30), _date(-100), _date(300), _date(20)],
+        'win_probability': [1.0, 1.0, 0.4, 0.0, 0.6, 0.2],
+        'is_won': [True, True, False, False, False, False],
+        'is_closed': [True, True, False, True, False, False],
+    })
+    line_items = pd.DataFrame({
+        'line_item_id': ['L1', 'L2', 'L3', 'L4'],
+        'opportunity_id': ['O1', 'O2', 'O2', 'O4'],
+        'product_id': ['P1', 'P1', 'P2', 'P3'],
+        'product_name': ['Fiber', 'Fiber', 'Cloud', 'IoT'],
+        'quantity': [2, 1, 3, 1],
+        'total_price': [100.0, 50.0, 90.0, 40.0],
+    })
+    contacts = pd.DataFrame({'contact_id': ['C1'], 'account_id': ['A1']})
+    tickets = pd.DataFrame({
+        'ticket_id': ['T1', 'T2', 'T3', 'T4'],
+        'account_id': ['A1', 'A2', 'A1', 'A9'],
+        'subject': ['Outage', 'Billing question', 'Slow link', 'Orphan'],
+        'priority': ['Critical', 'Low', 'Medium', 'High'],
+        'status': ['Open', 'Closed', 'Resolved', 'Open'],
+        'category': ['Technical Issue'] * 4,
+        'created_date': pd.to_datetime([_date(-5), _date(-20), _date(-60), _date(-1)]),
+        'closed_date': pd.to_datetime([None, _date(-19), _date(-58), None]),
+        'response_time_hours': [1.0, 2.0, 3.0, 4.0],
+        'resolution_time_hours': [np.nan, 24.0, 48.0, np.nan],
+        'is_sla_violated': [True, False, False, False],
+    })
+    invoices = pd.DataFrame({
+        'invoice_id': ['I1', 'I2', 'I3'],
+        'account_id': ['A1', 'A1', 'A3'],
+        'invoice_number': ['INV-1', 'INV-2', 'INV-3'],
+        'invoice_date': pd.to_datetime([_date(-90), _date(-70), _date(-3)]),
+        'due_date': pd.to_datetime([_date(-60), _date(-40), _date(27)]),
+        'invoice_amount': [1000.0, 500.0, 200.0],
+        'paid_amount': [1000.0, 0.0, 0.0],
+        'balance': [0.0, 500.0, 200.0],
+        'status': ['Paid', 'Overdue', 'Pending'],
+        'paid_date': pd.to_datetime([_date(-62), None, None]),
+        'payment_method': ['ACH', None, None],
+        'overdue_days': [0, 40, 0],
+        'disputed': [False, False, False],
+    })
+    for name, table in [('account', accounts), ('opportunity', opportunities),
+                        ('opportunity_line_item', line_items), ('contact', contacts),
+                        ('ticket', tickets), ('invoice', invoices)]:
+        table['_processed_at'] = NOW - timedelta(hours=1)
+        table.to_parquet(silver / f'silver_{name}_test.parquet', index=False)
+
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'silver_path': str(silver), 'gold_path': str(tmp_path / 'gold')}))
+    return config
+
+
+@pytest.fixture
+def aggregator(tmp_path):
+    return GoldLayerAggregator(str(_write_silver(tmp_path)), str(METRICS_CONFIG))
+
+
+def test_customer_360_metrics_match_per_account_reference(aggregator):
+    metrics = aggregator.calculate_customer_360_metrics().set_index('account_id')
+
+    assert list(metrics.index) == ['A1', 'A2', 'A3']
+    alpha, beta, gamma = metrics.loc['A1'], metrics.loc['A2'], metrics.loc['A3']
+
+    assert alpha['customer_lifetime_value'] == 350.5
+    assert alpha['total_opportunities'] == 4
+    assert alpha['won_opportunities'] == 2
+    assert alpha['open_opportunities'] == 2
+    assert alpha['win_rate'] == 100.0
+    assert alpha['pipeline_value'] == 110.0
+    assert alpha['avg_deal_size'] == pytest.approx(175.25)
+    assert alpha['active_services'] == 2
+    assert alpha['next_close_date'] == _date(20)
+    assert alpha['next_close_value'] == 30.0
+    assert alpha['upcoming_renewals_count'] == 2
+    assert alpha['upcoming_renewal_value'] == 110.0
+    assert json.loads(alpha['quarterly_revenue'])[0] == 100.0
+
+    assert beta['win_rate'] == 0
+    assert beta['active_services'] == 1
+    assert beta['next_close_probability'] == 0.6
+    assert beta['upcoming_renewals_count'] == 0
+
+    assert gamma['total_opportunities'] == 0
+    assert gamma['customer_lifetime_value'] == 0
+    assert pd.isna(gamma['next_close_date'])
+    assert np.isnan(gamma['avg_deal_size'])
+    assert gamma['avg_sales_cycle_days'] == 0
+
+
+def test_line_item_rollups_give_product_mix_and_contracted_value(aggregator):
+    metrics = aggregator.calculate_customer_360_metrics().set_index('account_id')
+
+    assert metrics['active_services'].tolist() == [2, 1, 0]
+    assert metrics['contracted_value'].tolist() == [240.0, 0.0, 0.0]
+    assert json.loads(metrics.loc['A1', 'product_mix']) == [
+        {'product_id': 'P1', 'product_name': 'Fiber', 'line_items': 2, 'quantity': 3.0, 'value': 150.0,
+         'contracted_value': 150.0},
+        {'product_id': 'P2', 'product_name': 'Cloud', 'line_items': 1, 'quantity': 3.0, 'value': 90.0,
+         'contracted_value': 90.0},
+    ]
+    assert json.loads(metrics.loc['A2', 'product_mix'])[0]['contracted_value'] == 0.0
+    assert metrics.loc['A3', 'product_mix'] == '[]'
+
+
+def test_support_and_billing_metrics_come_from_tickets_and_invoices(aggregator):
+    metrics = aggregator.calculate_customer_360_metrics().set_index('account_id')
+    alpha, beta, gamma = metrics.loc['A1'], metrics.loc['A2'], metrics.loc['A3']
+
+    assert (alpha['open_tickets'], alpha['closed_tickets'], alpha['total_tickets']) == (1, 1, 2)
+    assert alpha['avg_response_time_hours'] == 2.0
+    assert alpha['avg_resolution_time_hours'] == 48.0
+    assert alpha['sla_compliance_pct'] == 50.0
+    assert alpha['recurring_issues_count'] == 1
+    assert (alpha['overdue_invoices'], alpha['overdue_amount'], alpha['days_overdue']) == (1, 500.0, 40)
+    assert not alpha['credit_hold']
+    assert alpha['billing_accuracy_pct'] == 100.0
+    assert alpha['payment_terms'] == 'Net 30'
+
+    assert (beta['open_tickets'], beta['sla_compliance_pct'], beta['recurring_issues_count']) == (0, 100.0, 0)
+    assert beta['overdue_invoices'] == 0
+    assert pd.isna(beta['payment_terms']) and np.isnan(beta['billing_accuracy_pct'])
+
+    assert gamma['total_tickets'] == 0 and np.isnan(gamma['sla_compliance_pct'])
+    assert (gamma['overdue_invoices'], gamma['overdue_amount']) == (0, 0.0)
+    assert 1.0 <= gamma['ces_score'] <= 7.0
+
+
+def test_derived_metrics_follow_config_and_are_checked_at_load(tmp_path):
+    config = json.loads(METRICS_CONFIG.read_text())
+    derived = config['derived_metrics']['metrics']
+    next(m for m in derived if m['name'] == 'credit_hold')['calculation'] = 'overdue_amount > 100'
+    config_path = tmp_path / 'metrics.json'
+    config_path.write_text(json.dumps(config))
+    aggregator = GoldLayerAggregator(str(_write_silver(tmp_path)), str(config_path))
+
+    metrics = aggregator.calculate_customer_360_metrics().set_index('account_id')
+    assert metrics['credit_hold'].tolist() == [True, False, False]
+    assert list(metrics.columns[-3:]) == ['subsidiary_count', 'primary_subsidiary', '_calculated_at']
+
+    # Unknown columns, and derived metrics read before they are computed, fail at load
+    for section, rule, key, source in [
+        ('derived_metrics', 'metrics', 'calculation', 'overdue_amount > credit_limit'),
+        ('derived_metrics', 'metrics', 'calculation', 'monthly_recurring_revenue > 0'),
+        ('alert_triggers', 'rules', 'condition', 'churn_score > 70'),
+    ]:
+        broken = json.loads(METRICS_CONFIG.read_text())
+        broken[section][rule][0][key] = source
+        config_path.write_text(json.dumps(broken))
+        with pytest.raises(ValueError, match=source.split()[0]):
+            GoldLayerAggregator(str(tmp_path / 'config.json'), str(config_path))
+
+
+SIMULATED = ['nps_score', 'csat_score', 'ces_score', 'last_interaction_days', 'primary_subsidiary']
+
+
+def test_customer_360_metrics_reproducible_with_seed(tmp_path, aggregator):
+    config = str(tmp_path / 'config.json')
+    first = GoldLayerAggregator(config, str(METRICS_CONFIG), seed=7).calculate_customer_360_metrics()
+    second = GoldLayerAggregator(config, str(METRICS_CONFIG), seed=7).calculate_customer_360_metrics()
+    other = GoldLayerAggregator(config, str(METRICS_CONFIG), seed=8).calculate_customer_360_metrics()
+
+    pd.testing.assert_frame_equal(first[SIMULATED], second[SIMULATED])
+    assert not first[SIMULATED].equals(other[SIMULATED])
+
+
+def test_revenue_totals_are_floats_without_won_deals(aggregator):
+    # A3 has no opportunities at all
+    metrics = aggregator.for_accounts({'A3'}).calculate_customer_360_metrics()
+
+    for column in ['customer_lifetime_value', 'annual_revenue', 'pipeline_value', 'upcoming_renewal_value']:
+        assert metrics[column].dtype == np.float64, column
+
+
+def test_simulated_metrics_depend_only_on_the_account(aggregator):
+    metrics = aggregator.calculate_customer_360_metrics().set_index('account_id')
+    alone = aggregator.for_accounts({'A2'}).calculate_customer_360_metrics().set_index('account_id')
+
+    pd.testing.assert_series_equal(alone.loc['A2', SIMULATED], metrics.loc['A2', SIMULATED])
+
+
+def test_timeline_combines_sources_sorted_by_account_and_newest_first(aggregator):
+    timeline = aggregator.generate_customer_timeline()
+
+    assert timeline['account_id'].tolist() == ['A1'] * 10 + ['A2'] * 3 + ['A3'] + ['A9']
+    for _, events in timeline.groupby('account_id'):
+        assert events['event_date'].is_monotonic_decreasing
+    assert set(timeline.loc[timeline['account_id'] == 'A1', 'event_id']) == {
+        'OPP_O1', 'OPP_O2', 'TKT_T1_OPENED', 'TKT_T1_SLA', 'TKT_T3_OPENED', 'TKT_T3_RESOLVED',
+        'INV_I1_ISSUED', 'INV_I1_PAID', 'INV_I2_ISSUED', 'INV_I2_OVERDUE',
+    }
+
+    events = timeline.set_index('event_id')
+    assert events.loc['OPP_O4', 'event_type'] == 'OPPORTUNITY_LOST'
+    assert events.loc['TKT_T1_OPENED', ['severity', 'status']].tolist() == ['HIGH', 'OPEN']
+    assert events.loc['TKT_T3_RESOLVED', 'event_description'] == 'Resolved in 48.0 hours'
+    assert events.loc['INV_I2_OVERDUE', 'event_description'] == '$500.00 overdue for 40 days'
+    assert events.loc['INV_I2_OVERDUE', 'event_date'] == pd.Timestamp(_date(-40))
+    assert events.loc['INV_I1_PAID', 'event_description'] == 'Paid $1,000.00 via ACH'
+
+
+def _scored(aggregator, yoy_growth):
+    metrics = pd.DataFrame({'account_id': [f'ACC{i}' for i in range(len(yoy_growth))], 'yoy_growth': yoy_growth})
+    return aggregator.calculate_churn_risk(aggregator.calculate_health_score(metrics))
+
+
+def test_health_and_churn_scores_follow_config(aggregator):
+    scored = _scored(aggregator, np.linspace(-300, 150, 1001))
+
+    health = aggregator._risk_metric('health_score')['thresholds']
+    expected_status = np.where(scored['health_score'] >= health['healthy'], 'Healthy',
+                               np.where(scored['health_score'] >= health['at_risk'], 'At-Risk', 'Critical'))
+    # Status is decided before the score is rounded to 2 decimals
+    clear = np.abs(scored['health_score'].to_numpy()[:, None] - [health['healthy'], health['at_risk']]).min(axis=1) > 0.01
+    assert (scored['health_status'] == expected_status)[clear].all()
+
+    churn = aggregator._risk_metric('churn_risk_score')
+    weights, defaults = churn['weights'], churn['default_risks']
+    baseline = sum(defaults[k] * weights[k] for k in ['payment_history', 'support_issues', 'engagement'])
+    expected_risk = np.minimum(100, np.maximum(0, -scored['yoy_growth']) * weights['usage_trend'] + baseline)
+    assert scored['churn_risk_score'].to_numpy() == pytest.approx(expected_risk.round(2))
+    assert set(scored.loc[scored['yoy_growth'] >= 0, 'churn_risk_level']) == {'LOW'}
+    assert set(scored.loc[scored['churn_risk_score'] >= churn['thresholds']['high'], 'churn_risk_level']) == {'HIGH'}
+    assert set(scored['churn_risk_level']) == {'LOW', 'MEDIUM', 'HIGH'}
+
+
+def test_health_scores_reproducible_with_seed(tmp_path, aggregator):
+    config = tmp_path / 'config.json'
+    yoy_growth = np.zeros(500)
+    first = _scored(GoldLayerAggregator(str(config), str(METRICS_CONFIG), seed=3), yoy_growth)
+    second = _scored(GoldLayerAggregator(str(config), str(METRICS_CONFIG), seed=3), yoy_growth)
+    other = _scored(GoldLayerAggregator(str(config), str(METRICS_CONFIG), seed=4), yoy_growth)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert not first['health_score'].equals(other['health_score'])
+
+
+def test_configured_rules_generate_alerts_and_recommendations(aggregator):
+    metrics = aggregator.calculate_customer_360_metrics()
+    metrics = aggregator.calculate_churn_risk(aggregator.calculate_health_score(metrics))
+    metrics['overdue_amount'] = [75000.0, 0.0, 0.0]
+    metrics['days_overdue'] = [50, 0, 0]
+
+    alerts = aggregator.generate_risk_alerts(metrics)
+    overdue = alerts[alerts['alert_type'] == 'payment_overdue']
+    assert overdue['alert_id'].tolist() == ['A1_A005']
+    assert overdue['message'].iloc[0] == '💰 $75,000 overdue for 50 days'
+
+    recommendations = aggregator.generate_recommendations(metrics)
+    collections = recommendations[recommendations['category'] == 'Finance'].iloc[0]
+    assert collections['priority'] == 'HIGH'
+    assert collections['estimated_impact'] == pytest.approx(60000.0)
+    assert collections['action_data'] == {'overdue_amount': 75000.0, 'days_overdue': 50}
+    assert (recommendations['status'] == 'OPEN').all()
+
+
+def _change_log(aggregator):
+    return json.loads(sorted(aggregator.gold_path.glob('gold_change_log_*.json'))[-1].read_text())
+
+
+def test_incremental_build_recomputes_changed_accounts(tmp_path, aggregator):
+    aggregator.create_gold_layer()
+    assert _change_log(aggregator)['mode'] == 'full'
+
+    # A1's pipeline grows; A2 is unchanged
+    opportunities = aggregator.opportunities.copy()
+    opportunities.loc[opportunities['opportunity_id'] == 'O3', ['deal_value', '_processed_at']] = [500.0, NOW]
+    opportunities.to_parquet(tmp_path / 'silver' / 'silver_opportunity_test.parquet', index=False)
+
+    incremental = GoldLayerAggregator(str(tmp_path / 'config.json'), str(METRICS_CONFIG))
+    results = incremental.create_gold_layer(incremental=True, verify=True)
+
+    log = _change_log(incremental)
+    assert log['mode'] == 'incremental'
+    assert log['accounts']['updated'] == ['A1']
+    assert log['accounts']['unchanged'] == 2
+    assert log['verification']['matches_full_build']
+
+    customer_360 = pd.read_parquet(results['customer_360_metrics']['file']).set_index('account_id')
+    assert customer_360.loc['A1', 'pipeline_value'] == 530.0
+    assert list(customer_360.index) == ['A1', 'A2', 'A3']
+
+
+def test_incremental_build_recomputes_both_owners_of_a_moved_row(tmp_path, aggregator):
+    aggregator.create_gold_layer()
+
+    # O1 (A1's only won deal) moves to A2
+    opportunities = aggregator.opportunities.copy()
+    opportunities.loc[opportunities['opportunity_id'] == 'O1', ['account_id', '_processed_at']] = ['A2', NOW]
+    opportunities.to_parquet(tmp_path / 'silver' / 'silver_opportunity_test.parquet', index=False)
+
+    incremental = GoldLayerAggregator(str(tmp_path / 'config.json'), str(METRICS_CONFIG))
+    results = incremental.create_gold_layer(incremental=True, verify=True)
+
+    log = _change_log(incremental)
+    assert log['accounts']['updated'] == ['A1', 'A2']
+    assert log['verification']['matches_full_build']
+
+    customer_360 = pd.read_parquet(results['customer_360_metrics']['file']).set_index('account_id')
+    assert customer_360.loc['A1', 'customer_lifetime_value'] == 250.5
+    timeline = pd.read_parquet(results['customer_timeline']['file'])
+    assert timeline.loc[timeline['event_id'] == 'OPP_O1', 'account_id'].tolist() == ['A2']
+
+
+def test_incremental_build_recomputes_the_owner_of_a_deleted_row(tmp_path, aggregator):
+    aggregator.create_gold_layer()
+
+    # O1 is deleted; no remaining silver row of A1 changed
+    opportunities = aggregator.opportunities[aggregator.opportunities['opportunity_id'] != 'O1']
+    opportunities.to_parquet(tmp_path / 'silver' / 'silver_opportunity_test.parquet', index=False)
+
+    incremental = GoldLayerAggregator(str(tmp_path / 'config.json'), str(METRICS_CONFIG))
+    results = incremental.create_gold_layer(incremental=True, verify=True)
+
+    log = _change_log(incremental)
+    assert log['accounts']['updated'] == ['A1']
+    assert log['accounts']['unchanged'] == 2
+    assert log['verification']['matches_full_build']
+    timeline = pd.read_parquet(results['customer_timeline']['file'])
+    assert 'OPP_O1' not in set(timeline['event_id'])
+
+
+def test_incremental_build_falls_back_to_full_after_a_streaming_build(tmp_path, aggregator):
+    streaming = GoldLayerAggregator(str(tmp_path / 'config.json'), str(METRICS_CONFIG), load_silver=False)
+    streaming.create_gold_layer_streaming(batch_size=2)
+
+    aggregator.create_gold_layer(incremental=True)
+    assert _change_log(aggregator)['mode'] == 'full'
+
+
+def test_changed_line_items_map_to_the_first_row_of_a_repeated_opportunity(aggregator):
+    watermarks = aggregator.silver_watermarks()
+
+    # O1 was reprocessed under another account, unchanged since; its line item L1 changed
+    repeated = aggregator.opportunities[aggregator.opportunities['opportunity_id'] == 'O1'].assign(account_id='A2')
+    aggregator.opportunities = pd.concat([aggregator.opportunities, repeated], ignore_index=True)
+    aggregator.line_items.loc[aggregator.line_items['line_item_id'] == 'L1', '_processed_at'] = NOW
+
+    assert aggregator.changed_account_ids(watermarks) == {'A1'}
+
+
+def test_incremental_verification_compares_scores_alerts_and_recommendations(aggregator):
+    tables = aggregator.build_gold_tables()
+    assert aggregator.verify_incremental(tables)['matches_full_build']
+
+    tables['customer_360_metrics'] = tables['customer_360_metrics'].assign(health_score=0.0)
+    tables['recommendations'] = tables['recommendations'].iloc[1:]
+    result = aggregator.verify_incremental(tables)
+    assert sorted(result['mismatches']) == ['customer_360_metrics', 'recommendations']
+
+
+def test_incremental_build_falls_back_to_full_when_seed_or_metrics_config_change(tmp_path, aggregator):
+    aggregator.create_gold_layer()
+    config = str(tmp_path / 'config.json')
+
+    reseeded = GoldLayerAggregator(config, str(METRICS_CONFIG), seed=7)
+    reseeded.create_gold_layer(incremental=True)
+    assert _change_log(reseeded)['mode'] == 'full'
+
+    metrics_config = json.loads(METRICS_CONFIG.read_text())
+    metrics_config['alert_triggers']['rules'].pop()
+    edited = tmp_path / 'edited_metrics.json'
+    edited.write_text(json.dumps(metrics_config))
+    reconfigured = GoldLayerAggregator(config, str(edited), seed=7)
+    reconfigured.create_gold_layer(incremental=True)
+    assert _change_log(reconfigured)['mode'] == 'full'
+
+    unchanged = GoldLayerAggregator(config, str(edited), seed=7)
+    unchanged.create_gold_layer(incremental=True)
+    assert _change_log(unchanged)['mode'] == 'incremental'
+
+
+def test_incremental_build_falls_back_to_full_without_previous_build(aggregator):
+    aggregator.create_gold_layer(incremental=True)
+    assert _change_log(aggregator)['mode'] == 'full'
+
+
+@pytest.fixture
+def concentration_config(tmp_path, aggregator):
+    """
+    Metrics config with an alert on revenue_concentration; returns its path
+
+    A3 gets a won deal, so won revenue is spread over accounts that land in
+    different shards and batches, and only A3 is within the alert's range.
+    """
+    opportunities = aggregator.opportunities
+    won = opportunities[opportunities['opportunity_id'] == 'O1'].assign(
+        opportunity_id='O7', account_id='A3', deal_value=300.0
+    )
+    pd.concat([opportunities, won], ignore_index=True) \
+        .to_parquet(tmp_path / 'silver' / 'silver_opportunity_test.parquet', index=False)
+
+    metrics_config = json.loads(METRICS_CONFIG.read_text())
+    metrics_config['alert_triggers']['rules'].append({
+        'rule_id': 'A900',
+        'alert_type': 'revenue_concentration',
+        'condition': '40 < revenue_concentration < 60',
+        'severity': 'MEDIUM',
+        'message': '{revenue_concentration:.0f}% of won revenue this year',
+        'recommendation': 'Diversify the revenue base',
+        'action_type': 'review_account',
+    })
+    path = tmp_path / 'concentration_metrics.json'
+    path.write_text(json.dumps(metrics_config))
+    return str(path)
+
+
+@pytest.mark.parametrize('build', ['sharded', 'streaming', 'incremental'])
+def test_rules_on_revenue_concentration_match_a_full_build(tmp_path, concentration_config, build):
+    config = str(tmp_path / 'config.json')
+    if build == 'incremental':
+        GoldLayerAggregator(config, concentration_config).create_gold_layer()
+        # A1's won deal grows, taking A3 out of the alert's range without any change to A3's rows
+        silver_file = tmp_path / 'silver' / 'silver_opportunity_test.parquet'
+        opportunities = pd.read_parquet(silver_file)
+        opportunities.loc[opportunities['opportunity_id'] == 'O1', ['deal_value', '_processed_at']] = [900.0, NOW]
+        opportunities.to_parquet(silver_file, index=False)
+
+    expected = GoldLayerAggregator(config, concentration_config).build_gold_tables()
+    expected_alerts = expected['risk_alerts']
+    concentrated = expected_alerts.loc[expected_alerts['alert_type'] == 'revenue_concentration', 'account_id']
+    assert concentrated.tolist() == ([] if build == 'incremental' else ['A3'])
+
+    if build == 'sharded':
+        results = GoldLayerAggregator(config, concentration_config, workers=3).create_gold_layer()
+    elif build == 'streaming':
+        streaming = GoldLayerAggregator(config, concentration_config, load_silver=False)
+        results = streaming.create_gold_layer_streaming(batch_size=2)
+    else:
+        incremental = GoldLayerAggregator(config, concentration_config)
+        results = incremental.create_gold_layer(incremental=True)
+        assert _change_log(incremental)['accounts']['updated'] == ['A1', 'A2', 'A3']
+
+    customer_360 = pd.read_parquet(results['customer_360_metrics']['file'])
+    np.testing.assert_allclose(customer_360['revenue_concentration'],
+                               expected['customer_360_metrics']['revenue_concentration'])
+    alerts = pd.read_parquet(results['risk_alerts']['file'])
+    assert alerts['alert_id'].tolist() == expected_alerts['alert_id'].tolist()
+
+
+def test_incremental_build_keeps_unchanged_accounts_when_nothing_reads_concentration(tmp_path, aggregator):
+    aggregator.create_gold_layer()
+
+    # A1's won deal grows; A2 and A3 keep their rows but not their share of won revenue
+    opportunities = aggregator.opportunities.copy()
+    opportunities.loc[opportunities['opportunity_id'] == 'O1', ['deal_value', '_processed_at']] = [400.0, NOW]
+    opportunities.to_parquet(tmp_path / 'silver' / 'silver_opportunity_test.parquet', index=False)
+
+    incremental = GoldLayerAggregator(str(tmp_path / 'config.json'), str(METRICS_CONFIG))
+    incremental.create_gold_layer(incremental=True, verify=True)
+
+    log = _change_log(incremental)
+    assert log['accounts']['updated'] == ['A1']
+    assert log['verification']['matches_full_build']
+
+
+def test_shard_subsets_partition_every_silver_table(aggregator):
+    subsets = aggregator.shard_subsets(3)
+
+    for attribute in ['accounts', 'opportunities', 'line_items', 'tickets', 'invoices']:
+        rows = pd.concat([getattr(subset, attribute) for subset in subsets])
+        pd.testing.assert_frame_equal(rows.sort_index(), getattr(aggregator, attribute))
+    for shard, subset in enumerate(subsets):
+        assert (shard_of(subset.accounts['account_id'], 3) == shard).all()
+        assert set(subset.line_items['opportunity_id']) <= set(subset.opportunities['opportunity_id'])
+
+
+def test_sharded_build_writes_the_same_gold_files(aggregator):
+    single = aggregator.create_gold_layer()
+    expected = {name: pd.read_parquet(info['file']) for name, info in single.items()}
+
+    aggregator.workers = 3
+    sharded = aggregator.create_gold_layer()
+
+    assert set(sharded) == set(expected)
+    for name, info in sharded.items():
+        pd.testing.assert_frame_equal(pd.read_parquet(info['file']), expected[name])
+    assert not any(aggregator.gold_path.glob('shards_*'))
+    shards = _stage(json.loads(Path(aggregator.run_metrics_file).read_text())['stages'], 'shards')
+    assert [shard['name'] for shard in shards['stages']] == ['shard_000', 'shard_001', 'shard_002']
+    assert sum(shard['rows'] for shard in shards['stages']) == 3
+
+
+def test_streaming_build_writes_the_same_gold_files(tmp_path, aggregator):
+    full = aggregator.create_gold_layer()
+    expected = {name: pd.read_parquet(info['file']) for name, info in full.items()}
+
+    streaming = GoldLayerAggregator(str(tmp_path / 'config.json'), str(METRICS_CONFIG), load_silver=False)
+    streaming.as_of, streaming.built_at = aggregator.as_of, aggregator.built_at
+    results = streaming.create_gold_layer_streaming(batch_size=2)
+
+    assert set(results) == set(expected)
+    for name, info in results.items():
+        assert info['records'] == len(expected[name])
+        pd.testing.assert_frame_equal(pd.read_parquet(info['file']), expected[name])
+    assert _change_log(streaming)['batches'] == 2
+    assert not any(streaming.gold_path.glob('stream_*'))
+    stages = json.loads(Path(streaming.run_metrics_file).read_text())['stages']
+    assert [_stage(stages, f'batch_{n:06d}')['rows'] for n in range(2)] == [2, 1]
+
+
+def _stage(stages, name):
+    return next(stage for stage in stages if stage['name'] == name)
+
+
+def test_build_writes_run_metrics_per_stage(tmp_path):
+    aggregator = GoldLayerAggregator(str(_write_silver(tmp_path)), str(METRICS_CONFIG),
+                                     trace_memory=True, profile='cprofile')
+    aggregator.create_gold_layer()
+
+    metrics = json.loads(Path(aggregator.run_metrics_file).read_text())
+    assert Path(aggregator.run_metrics_file).name.startswith('gold_run_metrics_')
+    assert metrics['status'] == 'success' and metrics['mode'] == 'full'
+    assert [stage['name'] for stage in metrics['stages']] == [
+        'load_silver', 'silver_watermarks', 'customer_360_metrics', 'health_score', 'churn_risk',
+        'risk_alerts', 'recommendations', 'customer_timeline', 'save',
+    ]
+    customer_360 = _stage(metrics['stages'], 'customer_360_metrics')
+    assert customer_360['rows'] == 3 and customer_360['rows_per_second'] > 0
+    assert {stage['name'] for stage in customer_360['stages']} == {
+        'opportunity_metrics', 'line_item_rollups', 'support_billing_metrics', 'simulated_metrics',
+    }
+    assert customer_360['peak_rss_mb'] > 0 and 'peak_traced_mb' in customer_360
+    assert _stage(_stage(metrics['stages'], 'load_silver')['stages'], 'opportunity')['rows'] == 6
+    assert metrics['largest_accounts'][0] == {'account_id': 'A1', 'opportunities': 4, 'line_items': 3}
+
+    assert Path(metrics['profile']['file']).exists()
+    assert metrics['profile']['top_functions']
@@ -0,0 +1,47 @@
+from chat_context import ChatContext, ContextSection, estimate_tokens, render_sections
+
+
+def test_context_within_budget_is_complete(customers):
+    context = ChatContext(customers)
+
+    assert context.summary_stats['total_customers'] == len(customers)
+    assert context.summary_stats['high_risk_customers'] == int((customers['churn_risk_level'] == 'HIGH').sum())
+    assert 'Top 5 At-Risk Customers:' in context.system_prompt
+    for customer in context.top_customers:
+        assert customer['account_name'] in context.system_prompt
+
+
+def test_context_is_trimmed_to_budget(customers):
+    full = ChatContext(customers)
+    budget = estimate_tokens(full.system_prompt) // 2
+
+    trimmed = ChatContext(customers, token_budget=budget)
+
+    assert estimate_tokens(trimmed.system_prompt) <= budget
+    assert trimmed.system_prompt.startswith('You are a helpful AI assistant')
+    assert 'Be concise, specific, and actionable.' in trimmed.system_prompt
+
+
+def test_partial_section_keeps_leading_items():
+    sections = [
+        ContextSection('Intro', required=True),
+        ContextSection('Items:', [f'- item {i}' for i in range(50)]),
+    ]
+
+    rendered = render_sections(sections, token_budget=40)
+
+    lines = rendered.split('\n\n')[1].split('\n')
+    assert lines[0] == 'Items:'
+    assert lines[1:] == [f'- item {i}' for i in range(len(lines) - 1)]
+    assert 0 < len(lines) - 1 < 50
+
+
+def test_chatbot_reuses_context_across_messages(api, client, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    first = client.post('/api/chatbot/query', json={'query': 'How many customers do we have?'})
+    built = api.get_chat_context()
+    second = client.post('/api/chatbot/query', json={'query': 'What is our revenue?'})
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert api.get_chat_context() is built
+    assert str(built.summary_stats['total_customers']) in first.get_json()['response']
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def tools(api):
+    return api.get_chat_tools()
+
+
+def test_lookup_customer_by_id_and_name(tools, customers):
+    customer = customers.iloc[123]
+
+    by_id = tools.call('lookup_customer', json.dumps({'query': customer['account_id']}))
+    by_name = tools.call('lookup_customer', json.dumps({'query': f"how is {customer['account_name']}?"}))
+
+    assert by_id['customers'][0]['account_id'] == customer['account_id']
+    assert by_id['customers'][0]['annual_revenue'] == round(float(customer['annual_revenue']), 2)
+    assert customer['account_id'] in [c['account_id'] for c in by_name['customers']]
+
+
+def test_segment_stats_match_full_scan(tools, customers):
+    region = customers['region'].iloc[0]
+    segment = customers[(customers['region'] == region) & (customers['health_status'] == 'Critical')]
+
+    stats = tools.call('segment_stats', json.dumps({'region': region, 'health_status': 'Critical'}))
+
+    assert stats['total_customers'] == len(segment)
+    assert stats['total_revenue'] == pytest.approx(segment['annual_revenue'].sum(), abs=0.01)
+    assert stats['avg_nps'] == pytest.approx(segment['nps_score'].mean(), abs=0.01)
+
+
+def test_top_customers_match_nlargest(tools, customers):
+    opco = customers['country'].iloc[0]
+    expected = customers[customers['country'] == opco].nlargest(3, 'churn_risk_score')['account_id'].tolist()
+
+    result = tools.call('top_customers', json.dumps({'metric': 'churn_risk_score', 'k': 3, 'opco': opco}))
+
+    assert [c['account_id'] for c in result['customers']] == expected
+
+
+def test_account_alerts_and_invalid_calls(tools, api):
+    alerts = api.data_loader.load_latest('risk_alerts')
+    account_id = alerts['account_id'].iloc[0]
+    expected = alerts[alerts['account_id'] == account_id]
+
+    result = tools.call('account_alerts', json.dumps({'account_id': account_id, 'limit': 20}))
+
+    assert result['alert_count'] == len(expected)
+    assert [a['alert_id'] for a in result['alerts']] == expected['alert_id'].head(20).tolist()
+    assert 'error' in tools.call('account_alerts', json.dumps({'account_id': 'NOPE'}))
+    assert 'error' in tools.call('top_customers', json.dumps({'metric': 'bogus'}))
+    assert 'error' in tools.call('missing_tool', '{}')
+    assert 'error' in tools.call('segment_stats', 'not json')
+
+
+@pytest.mark.parametrize('endpoint', ['/api/chatbot/query', '/api/chatbot/stream'])
+def test_model_answers_through_tool_calls(client, fake_llm, customers, endpoint):
+    account_id = customers['account_id'].iloc[5]
+    fake_llm.tool_calls = [('lookup_customer', {'query': account_id}), ('segment_stats', {'region': 'East Africa'})]
+
+    body = client.post(endpoint, json={'query': 'How is this account doing?'}).get_data(as_text=True)
+
+    assert len(fake_llm.requests) == 2
+    first, second = fake_llm.requests
+    assert {tool['function']['name'] for tool in first['tools']} == {
+        'lookup_customer', 'segment_stats', 'top_customers', 'account_alerts'
+    }
+    assert 'Use the provided tools' in first['messages'][0]['content']
+    assert 'Top 5 Customers by Revenue' not in first['messages'][0]['content']
+
+    tool_results = [m for m in second['messages'] if m['role'] == 'tool']
+    assert [m['tool_call_id'] for m in tool_results] == ['call_0', 'call_1']
+    assert json.loads(tool_results[0]['content'])['customers'][0]['account_id'] == account_id
+    assert fake_llm.reply.split(' ')[-1] in body
@@ -0,0 +1,70 @@
+import json
+
+
+def _events(response):
+    """Parse an SSE body into (event, data) pairs"""
+    events = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        event, data = 'message', None
+        for line in block.split('\n'):
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: '):
+                data = json.loads(line[len('data: '):])
+        events.append((event, data))
+    return events
+
+
+def test_demo_mode_streams_the_demo_answer(api, client, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    query = {'query': 'How many customers do we have?'}
+
+    expected = client.post('/api/chatbot/query', json=query).get_json()['response']
+    api.response_cache.clear()
+    response = client.post('/api/chatbot/stream', json=query)
+    events = _events(response)
+
+    assert response.mimetype == 'text/event-stream'
+    deltas = [data['delta'] for event, data in events if event == 'message']
+    assert len(deltas) > 1
+    assert ''.join(deltas) == expected
+    assert events[-1][0] == 'done'
+    assert events[-1][1]['time_to_first_delta_ms'] is not None
+
+
+def test_llm_stream_relays_deltas(client, fake_llm):
+    history = [{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'Hello!'}]
+
+    events = _events(client.post('/api/chatbot/stream', json={'query': 'What is our revenue?', 'history': history}))
+
+    deltas = [data['delta'] for event, data in events if event == 'message']
+    assert deltas == fake_llm.chunks()
+    assert events[-1][0] == 'done'
+
+    sent = fake_llm.requests[-1]
+    assert sent['stream'] is True
+    assert [m['role'] for m in sent['messages']] == ['system', 'user', 'assistant', 'user']
+    assert sent['messages'][-1]['content'] == 'What is our revenue?'
+
+
+def test_llm_query_uses_same_messages(client, fake_llm):
+    response = client.post('/api/chatbot/query', json={'query': 'What is our revenue?'}).get_json()
+
+    assert response['response'] == fake_llm.reply
+    assert 'stream' not in fake_llm.requests[-1] or not fake_llm.requests[-1]['stream']
+
+
+def test_stream_requires_query(client):
+    assert client.post('/api/chatbot/stream', json={'query': ''}).status_code == 400
+
+
+def test_stream_falls_back_to_demo_answer_when_llm_is_down(api, client, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('OPENAI_BASE_URL', 'http://127.0.0.1:9/v1')
+    monkeypatch.setattr(api.llm_client, 'backoff_base', 0)
+
+    events = _events(client.post('/api/chatbot/stream', json={'query': 'What is our revenue?'}))
+
+    deltas = ''.join(data['delta'] for event, data in events if event == 'message')
+    assert deltas.startswith('Our total annual revenue')
+    assert events[-1][0] == 'done' and events[-1][1]['fallback'] is True
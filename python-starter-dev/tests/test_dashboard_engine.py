@@ -0,0 +1,58 @@
+import pytest
+
+from dashboard_engine import Segment, SegmentDashboardEngine
+from rollup_cube import RollupCube
+from topk_index import TopKIndex
+
+
+@pytest.fixture(scope='module')
+def engine(customers):
+    cube = RollupCube.from_customers(customers)
+    return SegmentDashboardEngine(customers, cube, TopKIndex.from_snapshot(customers, cube.relationships))
+
+
+def _ids(records):
+    return [record['account_id'] for record in records]
+
+
+def test_samples_match_reference(engine, customers):
+    region = customers['region'].iloc[0]
+    segment = customers[customers['region'] == region]
+    nonzero = lambda df: df[df['annual_revenue'] != 0]['account_id'].tolist()
+
+    dashboard = engine.dashboard(Segment(region=region))
+
+    assert _ids(dashboard['top_revenue_customers']) == nonzero(segment.nlargest(10, 'annual_revenue'))
+    assert _ids(dashboard['critical_customers_sample']) == nonzero(
+        segment[segment['health_status'] == 'Critical'].head(10)
+    )
+    assert _ids(dashboard['region_samples'][region]) == nonzero(segment.nlargest(5, 'annual_revenue'))
+
+
+def test_opco_lists_keep_zero_revenue_customers(engine, customers):
+    opco_id = customers['country'].iloc[0]
+    segment = customers[customers['country'] == opco_id]
+
+    dashboard = engine.dashboard(Segment(country=opco_id), exclude_zero_revenue=False)
+
+    assert _ids(dashboard['healthy_customers_sample']) == \
+        segment[segment['health_status'] == 'Healthy'].head(10)['account_id'].tolist()
+
+
+def test_dashboard_is_memoized_per_segment(engine):
+    first = engine.dashboard(Segment(subsidiary='liquid_tech', region='East Africa'))
+    assert engine.dashboard(Segment(subsidiary='liquid_tech', region='East Africa')) is first
+    assert engine.dashboard(Segment(region='NONEXISTENT'))['total_customers'] == 0
+
+
+def test_empty_segments_are_not_memoized(engine):
+    memoized = len(engine._memo)
+    for junk in range(50):
+        assert engine.dashboard(Segment(subsidiary=f'junk-{junk}'))['total_customers'] == 0
+        assert engine.dashboard(Segment(country=f'junk-{junk}'))['total_customers'] == 0
+    assert len(engine._memo) == memoized
+
+
+def test_engine_is_reused_until_snapshot_changes(api):
+    engine = api.get_dashboard_engine()
+    assert api.get_dashboard_engine() is engine
@@ -0,0 +1,61 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_expressions import compile_expression
+
+
+@pytest.fixture
+def metrics():
+    return pd.DataFrame({
+        'annual_revenue': [120000.0, 0.0, np.nan],
+        'days_to_renewal': [20, 45, 200],
+        'overdue_amount': [60000.0, 0.0, 1200.0],
+        'credit_hold': [True, False, False],
+        'region': ['EMEA', 'APAC', None],
+    })
+
+
+def test_expressions_evaluate_column_wise(metrics):
+    mrr = compile_expression('where(annual_revenue > 0, annual_revenue / 12, 0)').evaluate(metrics)
+    assert mrr.tolist() == [10000.0, 0.0, 0.0]
+    assert compile_expression('-abs(overdue_amount) + 1').evaluate(metrics).tolist() == [-59999.0, 1.0, -1199.0]
+    assert compile_expression('max(days_to_renewal, 30)').evaluate(metrics).tolist() == [30, 45, 200]
+    assert compile_expression('2 * 3').evaluate(metrics) == 6
+
+
+def test_conditions_accept_sql_keywords_and_chained_comparisons(metrics):
+    assert compile_expression('0 < days_to_renewal < 90').mask(metrics).tolist() == [True, True, False]
+    assert compile_expression("region = 'EMEA' OR NOT credit_hold").mask(metrics).tolist() == [True, True, True]
+    assert compile_expression('credit_hold AND overdue_amount >= 50000').mask(metrics).tolist() == [True, False, False]
+    assert compile_expression('TRUE').mask(metrics).tolist() == [True, True, True]
+    # String literals are not rewritten
+    assert compile_expression("region != 'AND'").mask(metrics).tolist() == [True, True, True]
+
+
+def test_missing_values_never_match(metrics):
+    assert compile_expression('annual_revenue < 1').mask(metrics).tolist() == [False, True, False]
+    assert compile_expression("region = 'EMEA'").mask(metrics).tolist() == [True, False, False]
+    assert compile_expression('isnull(annual_revenue)').mask(metrics).tolist() == [False, False, True]
+
+
+@pytest.mark.parametrize('source', [
+    'annual_revenue.sum()', '__import__("os")', 'open("x")', 'annual_revenue[0]', 'lambda: 1', 'x if y else z',
+    'annual_revenue >',
+])
+def test_unsupported_syntax_is_rejected(source):
+    with pytest.raises(ValueError):
+        compile_expression(source)
+
+
+def test_columns_are_validated_and_plans_cached():
+    expression = compile_expression('overdue_amount > 100000 or days_overdue > 45')
+    assert expression.columns == {'overdue_amount', 'days_overdue'}
+    expression.validate(['overdue_amount', 'days_overdue', 'region'])
+    with pytest.raises(ValueError, match='days_overdue'):
+        expression.validate(['overdue_amount'])
+
+    assert compile_expression('overdue_amount > 100000 or days_overdue > 45') is expression
+    assert pickle.loads(pickle.dumps(expression)) is expression
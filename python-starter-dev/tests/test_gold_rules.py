@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_rules import RuleSet, condition_mask, render_template
+
+COLUMNS = ['alert_id', 'account_id', 'account_name', 'severity', 'message', 'action_data', 'created_at']
+
+
+@pytest.fixture
+def metrics():
+    return pd.DataFrame({
+        'account_id': ['A1', 'A2', 'A3'],
+        'account_name': ['Alpha', 'Beta', 'Gamma'],
+        'churn_risk_score': [80.4, 20.0, 75.0],
+        'yoy_growth': [-45.2, 10.0, np.nan],
+        'overdue_amount': [60000.0, 0.0, 1200.0],
+        'days_overdue': [40, 0, 5],
+    })
+
+
+def test_condition_mask_ands_conditions(metrics):
+    mask = condition_mask(metrics, [['churn_risk_score', '>', 50], ['overdue_amount', '<=', 50000]])
+    assert mask.tolist() == [False, False, True]
+
+    # Missing values never match
+    assert condition_mask(metrics, [['yoy_growth', '<', 0]]).tolist() == [True, False, False]
+
+    with pytest.raises(ValueError):
+        condition_mask(metrics, [['yoy_growth', '~', 0]])
+
+
+def test_render_template_formats_columns(metrics):
+    assert render_template('static text', metrics) == 'static text'
+    assert list(render_template('${overdue_amount:,.0f} for {days_overdue} days', metrics)) == [
+        '$60,000 for 40 days', '$0 for 0 days', '$1,200 for 5 days',
+    ]
+    assert render_template('down {abs(yoy_growth):.0f}%', metrics)[0] == 'down 45%'
+
+
+def test_rule_set_builds_rows_in_account_then_rule_order(metrics):
+    rules = RuleSet([
+        {
+            'rule_id': 'A002',
+            'conditions': [['overdue_amount', '>', 0]],
+            'severity': {'cases': [{'conditions': [['overdue_amount', '>', 50000]], 'value': 'HIGH'}],
+                         'default': 'MEDIUM'},
+            'message': '${overdue_amount:,.0f} overdue',
+            'action_data': {'overdue_amount': {'column': 'overdue_amount', 'factor': 0.5}, 'tags': ['billing']},
+        },
+        {
+            'rule_id': 'A001',
+            'conditions': [['churn_risk_score', '>', 70]],
+            'severity': 'HIGH',
+            'message': 'Churn risk {churn_risk_score:.0f}%',
+        },
+    ], COLUMNS, 'alert_id')
+
+    alerts = rules.evaluate(metrics, created_at='now')
+
+    assert list(alerts.columns) == COLUMNS
+    assert alerts['alert_id'].tolist() == ['A1_A002', 'A1_A001', 'A3_A002', 'A3_A001']
+    assert alerts['severity'].tolist() == ['HIGH', 'HIGH', 'MEDIUM', 'HIGH']
+    assert alerts['message'].tolist() == ['$60,000 overdue', 'Churn risk 80%', '$1,200 overdue', 'Churn risk 75%']
+    assert alerts['action_data'][0] == {'overdue_amount': 30000.0, 'tags': ['billing']}
+    assert alerts['action_data'][1] is None
+    assert (alerts['created_at'] == 'now').all()
+
+
+def test_rule_set_rejects_unknown_fields_and_handles_no_matches(metrics):
+    with pytest.raises(ValueError):
+        RuleSet([{'rule_id': 'A001', 'conditions': [], 'priority': 'HIGH'}], COLUMNS, 'alert_id')
+
+    rules = RuleSet([{'rule_id': 'A001', 'conditions': [['churn_risk_score', '>', 100]]}], COLUMNS, 'alert_id')
+    assert rules.evaluate(metrics).empty
+
+
+def test_rules_accept_expression_conditions_and_values(metrics):
+    assert condition_mask(metrics, 'churn_risk_score > 50 and overdue_amount <= 50000').tolist() == [False, False, True]
+
+    rules = RuleSet([{
+        'rule_id': 'A003',
+        'condition': 'overdue_amount > 0',
+        'severity': {'cases': [{'condition': '0 <= days_overdue < 30', 'value': 'LOW'}], 'default': 'HIGH'},
+        'message': 'Overdue',
+        'action_data': {'half': {'expression': 'overdue_amount / 2'}},
+    }], COLUMNS, 'alert_id')
+
+    alerts = rules.evaluate(metrics)
+    assert alerts['alert_id'].tolist() == ['A1_A003', 'A3_A003']
+    assert alerts['severity'].tolist() == ['HIGH', 'LOW']
+    assert alerts['action_data'][1] == {'half': 600.0}
+
+    rules.validate(metrics.columns)
+    assert rules.columns_read() == {'overdue_amount', 'days_overdue'}
+    with pytest.raises(ValueError, match='days_overdue'):
+        rules.validate(['overdue_amount'])
+    with pytest.raises(ValueError):
+        RuleSet([{'rule_id': 'A004', 'condition': 'overdue_amount >'}], COLUMNS, 'alert_id')
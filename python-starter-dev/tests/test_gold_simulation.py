@@ -0,0 +1,62 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from gold_simulation import AccountDraws, simulate_account_metrics
+
+SUBSIDIARIES = [
+    {'id': 'fiber', 'name': 'Fiber Co', 'short_name': 'Fiber', 'services': ['F1', 'F2', 'F3', 'F4']},
+    {'id': 'cloud', 'name': 'Cloud Co', 'short_name': 'Cloud', 'services': ['C1', 'C2']},
+    {'id': 'pay', 'name': 'Pay Co', 'short_name': 'Pay', 'services': ['P1', 'P2', 'P3', 'P4', 'P5', 'P6']},
+]
+ACCOUNTS = np.array([f'A{i}' for i in range(500)], dtype=object)
+
+
+def _simulate(account_ids, seed=42):
+    revenue = np.linspace(0, 100_000.01, len(account_ids))
+    tickets = np.arange(len(account_ids)) % 17
+    return simulate_account_metrics(account_ids, revenue, tickets, SUBSIDIARIES, datetime(2025, 6, 1), seed)
+
+
+def test_draws_depend_only_on_account_seed_and_stream():
+    draws = AccountDraws(ACCOUNTS, 1)
+    subset = AccountDraws(ACCOUNTS[[7, 3]], 1)
+
+    np.testing.assert_array_equal(subset.random('x'), draws.random('x')[[7, 3]])
+    assert not np.array_equal(draws.random('x'), draws.random('y'))
+    assert not np.array_equal(draws.random('x'), AccountDraws(ACCOUNTS, 2).random('x'))
+
+    values = draws.integers('n', 2, 5)
+    assert values.min() == 2 and values.max() == 4
+    picked = draws.choice('c', ['a', 'b'], p=[0.9, 0.1])
+    assert 0.8 < (picked == 'a').mean() < 1.0
+    assert (np.sort(draws.permutation('p', 4), axis=1) == np.arange(4)).all()
+
+
+def test_simulated_metrics_are_reproducible_per_account():
+    metrics = _simulate(ACCOUNTS)
+    again = _simulate(ACCOUNTS)
+    subset = _simulate(ACCOUNTS[[10, 20]]).set_index(pd.Index(['A10', 'A20']))
+
+    pd.testing.assert_frame_equal(metrics, again)
+    columns = ['nps_score', 'csat_score', 'qbr_scheduled', 'primary_subsidiary', 'subsidiary_count']
+    pd.testing.assert_frame_equal(subset[columns], metrics.set_index(pd.Index(ACCOUNTS)).loc[['A10', 'A20'], columns])
+    assert not metrics['nps_score'].equals(_simulate(ACCOUNTS, seed=7)['nps_score'])
+
+
+def test_subsidiary_splits_add_up_to_the_account_totals():
+    metrics = _simulate(ACCOUNTS)
+    revenue = np.linspace(0, 100_000.01, len(ACCOUNTS))
+
+    for account, details in enumerate(metrics['subsidiaries']):
+        details = json.loads(details)
+        assert len(details) == metrics['subsidiary_count'][account]
+        assert [d['primary'] for d in details] == [True] + [False] * (len(details) - 1)
+        assert details[0]['subsidiary_id'] == metrics['primary_subsidiary'][account]
+        assert len({d['subsidiary_id'] for d in details}) == len(details)
+        assert round(sum(d['annual_revenue'] for d in details), 2) == round(revenue[account], 2)
+        assert sum(d['tickets_count'] for d in details) == account % 17
+        for detail in details:
+            assert len(set(detail['services'])) == detail['service_count'] >= 2
@@ -0,0 +1,76 @@
+import pytest
+
+from llm_client import CircuitBreaker, LLMClient, LLMUnavailable
+
+MESSAGES = [{'role': 'user', 'content': 'Hi'}]
+PARAMS = {'model': 'gpt-4o-mini'}
+
+
+def _client(**kwargs):
+    kwargs.setdefault('sleep', lambda seconds: None)
+    return LLMClient(**kwargs)
+
+
+def test_client_is_reused_and_retries_transient_errors(fake_llm):
+    llm = _client(max_retries=2)
+    fake_llm.fail_requests = 2
+
+    assert llm.complete(MESSAGES, **PARAMS) == fake_llm.reply
+    assert len(fake_llm.requests) == 3
+    first = llm.client
+    assert llm.complete(MESSAGES, **PARAMS) == fake_llm.reply
+    assert llm.client is first
+
+
+def test_circuit_opens_and_recovers(fake_llm, monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    llm = _client(max_retries=0, breaker=breaker)
+    fake_llm.fail_requests = 2
+
+    for _ in range(2):
+        with pytest.raises(LLMUnavailable):
+            llm.complete(MESSAGES, **PARAMS)
+    assert breaker.state == 'open'
+
+    # Rejected without reaching the upstream
+    with pytest.raises(LLMUnavailable, match='circuit is open'):
+        llm.complete(MESSAGES, **PARAMS)
+    assert len(fake_llm.requests) == 2
+
+    # After the reset period one trial call goes through and closes the circuit
+    monkeypatch.setattr(breaker, 'opened_at', breaker.opened_at - 31)
+    assert breaker.state == 'half-open'
+    assert llm.complete(MESSAGES, **PARAMS) == fake_llm.reply
+    assert breaker.state == 'closed'
+
+
+def test_timeout_is_enforced(fake_llm):
+    llm = _client(timeout=0.2, max_retries=0)
+    fake_llm.response_delay = 1.0
+
+    with pytest.raises(LLMUnavailable):
+        llm.complete(MESSAGES, **PARAMS)
+
+
+def test_concurrency_is_bounded(fake_llm):
+    llm = _client(max_concurrency=1, acquire_timeout=0.05)
+    fake_llm.chunk_delay = 0.05
+    first = llm.stream(MESSAGES, **PARAMS)
+    head = next(first)  # holds the only slot while streaming
+
+    with pytest.raises(LLMUnavailable, match='Too many concurrent'):
+        llm.complete(MESSAGES, **PARAMS)
+
+    assert head + ''.join(first) == fake_llm.reply
+    assert llm.complete(MESSAGES, **PARAMS) == fake_llm.reply
+
+
+def test_query_falls_back_to_demo_answer(api, client, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('OPENAI_BASE_URL', 'http://127.0.0.1:9/v1')
+    monkeypatch.setattr(api.llm_client, 'backoff_base', 0)
+
+    response = client.post('/api/chatbot/query', json={'query': 'How many customers do we have?'}).get_json()
+
+    assert response['fallback'] is True
+    assert response['response'].startswith('We currently have')
@@ -0,0 +1,45 @@
+import random
+
+from name_matcher import AhoCorasick, CustomerNameMatcher
+
+
+def test_automaton_matches_naive_substring_search():
+    rng = random.Random(7)
+    patterns = ['he', 'she', 'his', 'hers', 'a', 'ab', 'bab', 'abab'] + [
+        ''.join(rng.choice('abhers') for _ in range(rng.randint(1, 5))) for _ in range(40)
+    ]
+    automaton = AhoCorasick(patterns)
+
+    for _ in range(200):
+        text = ''.join(rng.choice('abhers ') for _ in range(rng.randint(0, 30)))
+        assert set(automaton.search(text)) == {i for i, p in enumerate(patterns) if p in text}
+
+
+def test_matcher_finds_same_customers_as_full_scan(customers):
+    matcher = CustomerNameMatcher(customers)
+    names = customers['account_name'].tolist()
+    queries = [
+        f'How is {names[10]} doing?',
+        f'Compare {names[42].upper()} with {names[7]}',
+        f"What about  {'  '.join(names[3].split())} this quarter",
+        'Who are the top customers?',
+    ]
+
+    for query in queries:
+        normalized = ' '.join(query.lower().split())
+        expected = customers[customers['account_name'].map(
+            lambda name: ' '.join(name.lower().split()) in normalized
+        )]['account_id'].tolist()
+        assert matcher.match_ids(query) == expected
+        assert matcher.match(query)['account_id'].tolist() == expected
+
+
+def test_demo_chatbot_answers_for_mentioned_customer(api, client, customers, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    name = customers['account_name'].iloc[25]
+    first = customers[customers['account_name'].str.lower().map(lambda n: n in name.lower())].iloc[0]
+
+    response = client.post('/api/chatbot/query', json={'query': f'Tell me about {name}'}).get_json()
+
+    assert response['response'].startswith(f"**{first['account_name']}** ({first['region']})")
+    assert api.get_chat_context().system_prompt_for(api.get_name_matcher().match(name)).count(name) >= 1
@@ -0,0 +1,50 @@
+import time
+
+from response_cache import ResponseCache, normalize_query
+
+
+def test_normalized_queries_share_a_key():
+    history = [{'role': 'user', 'content': 'Hi'}]
+
+    assert normalize_query('  How many   Customers? ') == 'how many customers'
+    assert ResponseCache.key('How many customers?', history, 's1') == ResponseCache.key('how many customers', history, 's1')
+    assert ResponseCache.key('How many customers?', history, 's1') != ResponseCache.key('How many customers?', [], 's1')
+    assert ResponseCache.key('How many customers?', history, 's1') != ResponseCache.key('How many customers?', history, 's2')
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a')[0] == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a')[0] == 1 and cache.get('c')[0] == 3
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+    assert cache.get('a') is None
+    assert len(cache) == 1
+
+
+def test_repeat_question_is_served_from_cache(client, fake_llm):
+    first = client.post('/api/chatbot/query', json={'query': "What's our NPS?"}).get_json()
+    second = client.post('/api/chatbot/query', json={'query': "what's our nps"}).get_json()
+    other_history = client.post('/api/chatbot/query', json={
+        'query': "What's our NPS?", 'history': [{'role': 'user', 'content': 'Hello'}]
+    }).get_json()
+
+    assert first['cached'] is False
+    assert second['cached'] is True and second['response'] == first['response']
+    assert other_history['cached'] is False
+    assert len(fake_llm.requests) == 2
+
+
+def test_streamed_answer_is_cached(client, fake_llm):
+    client.post('/api/chatbot/stream', json={'query': 'Top customers?'}).get_data()
+    body = client.post('/api/chatbot/stream', json={'query': 'top customers'}).get_data(as_text=True)
+
+    assert len(fake_llm.requests) == 1
+    assert '"cached": true' in body
+    assert fake_llm.reply in body
@@ -0,0 +1,60 @@
+import math
+
+import pytest
+
+from retrieval_index import BM25Index, tokenize
+
+
+@pytest.fixture(scope='module')
+def retrieval(api):
+    return api.get_retrieval_index()
+
+
+def _reference_score(documents, query, doc_id, k1=1.5, b=0.75):
+    avg_length = sum(len(d) for d in documents) / len(documents)
+    score = 0.0
+    for term in set(query):
+        df = sum(term in d for d in documents)
+        if not df:
+            continue
+        tf = documents[doc_id].count(term)
+        idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+        score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(documents[doc_id]) / avg_length))
+    return score
+
+
+def test_bm25_matches_reference_formula():
+    documents = [tokenize(text) for text in [
+        'usage declined sharply in east africa',
+        'overdue invoices escalate collections',
+        'renewal due renewal at risk east africa',
+        'healthy account expansion opportunity',
+    ]]
+    index = BM25Index(documents)
+    query = tokenize('East Africa renewal risk')
+
+    for doc_id in range(len(documents)):
+        assert index.scores(query)[doc_id] == pytest.approx(_reference_score(documents, query, doc_id))
+    assert [doc_id for doc_id, _ in index.search(query, 2)] == [2, 0]
+    assert index.search(tokenize('nothing matches'), 3) == []
+
+
+def test_search_finds_account_by_id_and_alert_text(retrieval, api):
+    alerts = api.data_loader.load_latest('risk_alerts')
+    alert = alerts.iloc[0]
+
+    assert retrieval.search(f"Tell me about {alert['account_id']}", 1)[0][0] == alert['account_id']
+    hits = retrieval.search(alert['message'], 5)
+    assert hits and all(score > 0 for _, score in hits)
+    assert alert['account_id'] not in [a for a, _ in retrieval.search(alert['account_id'], 5, exclude=[alert['account_id']])]
+
+
+def test_llm_prompt_includes_retrieved_customers(client, fake_llm, retrieval, monkeypatch):
+    monkeypatch.setenv('CHATBOT_TOOLS', 'false')
+    query = 'Which accounts need collections escalation for overdue invoices?'
+    client.post('/api/chatbot/query', json={'query': query})
+
+    system_prompt = fake_llm.requests[-1]['messages'][0]['content']
+    assert 'Other Customers Relevant to the Question:' in system_prompt
+    top_account = retrieval.search(query, 1)[0][0]
+    assert top_account in system_prompt
@@ -0,0 +1,128 @@
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from rollup_cube import RollupCube
+
+
+def _reference_fields(df):
+    """Aggregates exactly as the dashboard routes computed them per request"""
+    return {
+        'total_customers': len(df),
+        'total_revenue': float(df['annual_revenue'].sum()),
+        'avg_health_score': float(df['health_score'].mean()),
+        'high_risk_customers': len(df[df['churn_risk_level'] == 'HIGH']),
+        'health_distribution': df['health_status'].value_counts().to_dict(),
+        'risk_distribution': df['churn_risk_level'].value_counts().to_dict(),
+        'region_distribution': df['region'].value_counts().to_dict(),
+        'avg_nps': float(df['nps_score'].mean()),
+        'avg_csat': float(df['csat_score'].mean()),
+        'avg_ces': float(df['ces_score'].mean()),
+        'avg_support_tickets': 0,
+        'avg_sla_compliance': 0,
+    }
+
+
+def _assert_fields_match(actual, expected):
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert actual[key] == value, key
+        else:
+            assert actual[key] == pytest.approx(value), key
+
+
+def test_cube_rollups_match_full_scan(customers):
+    cube = RollupCube.from_customers(customers)
+
+    view = cube.slice()
+    assert view.count == len(customers)
+    assert view.sum('annual_revenue_sum') == pytest.approx(customers['annual_revenue'].sum())
+
+    region = customers['region'].iloc[0]
+    subset = customers[(customers['region'] == region) & (customers['health_status'] == 'At-Risk')]
+    view = cube.slice(region=region, health_status='At-Risk')
+    assert view.count == len(subset)
+    assert view.mean('nps_score') == pytest.approx(subset['nps_score'].mean())
+    assert view.distribution('churn_risk_level') == subset['churn_risk_level'].value_counts().to_dict()
+
+
+def test_dashboard_summary_matches_reference(client, customers):
+    body = client.get('/api/dashboard/summary').get_json()
+    _assert_fields_match(body, _reference_fields(customers))
+
+    body = client.get('/api/dashboard/summary?opco=kenya').get_json()
+    _assert_fields_match(body, _reference_fields(customers[customers['region'] == 'East Africa']))
+
+
+def test_opco_endpoints_match_reference(client, customers):
+    opco_id = customers['country'].iloc[0]
+    subset = customers[customers['country'] == opco_id]
+
+    body = client.get(f'/api/opco/{opco_id}/dashboard').get_json()
+    _assert_fields_match(body, _reference_fields(subset))
+
+    stats = client.get(f'/api/opco/{opco_id}/stats').get_json()
+    assert stats['total_customers'] == len(subset)
+    assert stats['total_revenue'] == pytest.approx(subset['annual_revenue'].sum())
+
+
+def _subsidiary_reference(customers, subsidiary_id):
+    """Customers related to a subsidiary, once each, with their relationships' revenue and tickets"""
+    related = []
+    revenue = 0.0
+    tickets = 0
+    for _, customer in customers.iterrows():
+        subs = [sub for sub in json.loads(customer['subsidiaries']) if sub['subsidiary_id'] == subsidiary_id]
+        if subs:
+            related.append(customer)
+            revenue += sum(sub.get('annual_revenue', 0) for sub in subs)
+            tickets += sum(sub.get('tickets_count', 0) for sub in subs)
+    return pd.DataFrame(related), revenue, tickets
+
+
+def _with_duplicate_relationship(customers, subsidiary_id):
+    """Snapshot where the first customer related to the subsidiary lists it twice"""
+    customers = customers.copy()
+    for label, value in customers['subsidiaries'].items():
+        subs = json.loads(value)
+        match = next((sub for sub in subs if sub['subsidiary_id'] == subsidiary_id), None)
+        if match is not None:
+            customers.at[label, 'subsidiaries'] = json.dumps(subs + [match])
+            return customers
+    raise AssertionError(f'No customer related to {subsidiary_id}')
+
+
+@pytest.mark.parametrize('duplicate', [False, True])
+def test_subsidiary_endpoints_match_reference(client, api, customers, monkeypatch, duplicate):
+    subsidiary_id = 'liquid_tech'
+    if duplicate:
+        customers = _with_duplicate_relationship(customers, subsidiary_id)
+        loader = api.data_loader
+        monkeypatch.setitem(loader.cache, 'customer_360_metrics', customers)
+        monkeypatch.setitem(loader.cache_time, 'customer_360_metrics', datetime.now())
+        monkeypatch.setitem(loader.cache_file, 'customer_360_metrics', 'duplicate_relationship.parquet')
+    sub_df, revenue, tickets = _subsidiary_reference(customers, subsidiary_id)
+
+    stats = client.get(f'/api/subsidiary/{subsidiary_id}/stats').get_json()
+    assert stats['total_customers'] == len(sub_df)
+    assert stats['total_revenue'] == pytest.approx(revenue)
+    assert stats['total_tickets'] == tickets
+
+    body = client.get(f'/api/subsidiary/{subsidiary_id}/dashboard').get_json()
+    expected = _reference_fields(sub_df)
+    expected['total_revenue'] = revenue
+    _assert_fields_match(body, expected)
+
+
+def test_segment_stats_match_reference(client, customers):
+    body = client.get('/api/segment/recommendations?type=health&value=Critical').get_json()
+    segment = customers[customers['health_status'] == 'Critical']
+    stats = body['segment_stats']
+    assert stats['customer_count'] == len(segment)
+    assert stats['total_revenue'] == pytest.approx(segment['annual_revenue'].sum())
+    assert stats['avg_churn_risk'] == pytest.approx(segment['churn_risk_score'].mean())
+    assert stats['at_risk_revenue'] == pytest.approx(
+        segment[segment['churn_risk_level'].isin(['HIGH', 'MEDIUM'])]['annual_revenue'].sum()
+    )
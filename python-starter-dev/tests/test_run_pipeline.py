@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from run_pipeline import PipelineRunner, Stage, latest_bronze_file, pipeline_stages
+
+CONFIG = Path(__file__).resolve().parent.parent / 'config'
+NOW = datetime.now()
+
+
+def _date(days):
+    return (NOW + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    bronze = tmp_path / 'bronze'
+    bronze.mkdir()
+    tables = {
+        'account': pd.DataFrame({
+            'Id': ['a1', 'a2'], 'Name': ['Alpha ', 'Beta'], 'Type': ['Customer', 'Partner'],
+            'BillingCountry': ['Kenya', 'ZA'], 'AnnualRevenue': [1000.0, 2000.0],
+            'CreatedDate': ['2020-01-01', '2021-06-01'], 'LastModifiedDate': [str(NOW)] * 2,
+        }),
+        'opportunity': pd.DataFrame({
+            'Id': ['o1', 'o2', 'o3'], 'AccountId': ['a1', 'a1', 'a2'], 'Name': ['Fiber', 'Cloud', 'IoT'],
+            'Amount': [100.0, 50.0, 70.0], 'StageName': ['Closed Won', 'Proposal', 'Closed Lost'],
+            'CloseDate': [_date(-10), _date(30), _date(-50)], 'Probability': [100, 40, 0],
+            'IsWon': [True, False, False], 'IsClosed': [True, False, True], 'LastModifiedDate': [str(NOW)] * 3,
+        }),
+        'opportunity_line_item': pd.DataFrame({
+            'Id': ['l1'], 'OpportunityId': ['o1'], 'Product2Id': ['p1'], 'LastModifiedDate': [str(NOW)],
+        }),
+        'contact': pd.DataFrame({'Id': ['c1'], 'AccountId': ['a1'], 'LastModifiedDate': [str(NOW)]}),
+    }
+    for name, table in tables.items():
+        table.to_parquet(bronze / f'bronze_{name}_20250101_000000.parquet', index=False)
+
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({
+        'bronze_path': str(bronze),
+        'silver_path': str(tmp_path / 'silver'),
+        'gold_path': str(tmp_path / 'gold'),
+    }))
+    mapping = tmp_path / 'mapping.json'
+    mapping.write_text((CONFIG / 'bronze_to_silver_mapping.json').read_text())
+
+    def run():
+        stages = pipeline_stages(str(config), str(mapping), str(CONFIG / 'silver_to_gold_metrics.json'),
+                                 normalize=False, link=False)
+        return PipelineRunner(stages, tmp_path / 'pipeline', workers=2).run()
+
+    run.mapping = mapping
+    run.silver = tmp_path / 'silver'
+    return run
+
+
+def _statuses(report):
+    return {stage['stage']: stage['status'] for stage in report['stages']}
+
+
+def test_pipeline_runs_stages_and_skips_them_when_up_to_date(pipeline):
+    first = pipeline()
+    assert set(_statuses(first).values()) == {'ran'}
+    assert Path(first['file']).exists()
+
+    gold = next(s for s in first['stages'] if s['stage'] == 'aggregate_gold')
+    assert gold['rows_in'] == 2 + 3 + 1 + 1
+    assert gold['rows_out'] > 2
+    assert gold['peak_rss_mb'] > 0 and gold['wall_seconds'] > 0
+    customer_360 = pd.read_parquet(gold['outputs']['customer_360_metrics'])
+    assert sorted(customer_360['account_id']) == ['A1', 'A2']
+
+    assert set(_statuses(pipeline()).values()) == {'cached'}
+
+    # Tickets are not produced by the pipeline but are gold inputs
+    pd.DataFrame({
+        'ticket_id': ['t1'], 'account_id': ['A1'], 'created_date': [NOW], 'status': ['Open'],
+    }).to_parquet(pipeline.silver / 'silver_ticket_sample.parquet', index=False)
+    statuses = _statuses(pipeline())
+    assert statuses.pop('aggregate_gold') == 'ran'
+    assert set(statuses.values()) == {'cached'}
+
+    # A mapping change reruns every silver stage and the gold stage that reads them
+    mapping = json.loads(pipeline.mapping.read_text())
+    mapping['contact']['description'] += ' (edited)'
+    pipeline.mapping.write_text(json.dumps(mapping))
+    assert set(_statuses(pipeline()).values()) == {'ran'}
+
+
+def _gold_as_of(report):
+    """Date the gold stage's metrics were computed as of, from simulated contract end dates"""
+    gold = next(s for s in report['stages'] if s['stage'] == 'aggregate_gold')
+    customer_360 = pd.read_parquet(gold['outputs']['customer_360_metrics'])
+    as_of = customer_360['contract_end_date'] - pd.to_timedelta(customer_360['days_to_renewal'], unit='D')
+    assert as_of.nunique() == 1
+    return as_of.iloc[0]
+
+
+def test_gold_stage_reruns_on_a_new_day(pipeline, monkeypatch):
+    today = pipeline()
+    assert _gold_as_of(today) == pd.Timestamp(datetime.now().date())
+
+    class Tomorrow(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(days=1)
+
+    monkeypatch.setattr('run_pipeline.datetime', Tomorrow)
+    tomorrow = pipeline()
+    statuses = _statuses(tomorrow)
+    assert statuses.pop('aggregate_gold') == 'ran'
+    assert set(statuses.values()) == {'cached'}
+    # Built today, but as of the date the result is cached under
+    assert _gold_as_of(tomorrow) == pd.Timestamp(datetime.now().date() + timedelta(days=1))
+
+
+def test_runner_rejects_cycles_and_unknown_stages(tmp_path):
+    def noop(inputs):
+        return {'outputs': {}, 'rows_in': 0, 'rows_out': 0}
+
+    with pytest.raises(ValueError, match='cycle'):
+        PipelineRunner([
+            Stage('a', noop, upstream={'x': ('b', 'out')}),
+            Stage('b', noop, upstream={'x': ('a', 'out')}),
+        ], tmp_path)
+    with pytest.raises(ValueError, match='Unknown'):
+        PipelineRunner([Stage('a', noop, upstream={'x': ('missing', 'out')})], tmp_path)
+
+
+def test_latest_bronze_file_matches_the_exact_table(tmp_path):
+    for name in ['bronze_opportunity_20250101_000000', 'bronze_opportunity_line_item_20250102_000000']:
+        (tmp_path / f'{name}.parquet').write_bytes(b'')
+
+    assert latest_bronze_file(tmp_path, 'opportunity').endswith('bronze_opportunity_20250101_000000.parquet')
+    assert latest_bronze_file(tmp_path, 'contact') is None
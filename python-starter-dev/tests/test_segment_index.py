@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+PRIORITY_ORDER = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+
+
+@pytest.fixture(scope='module')
+def tables(api):
+    load = api.data_loader.load_latest
+    return load('customer_360_metrics'), load('recommendations'), load('risk_alerts')
+
+
+def _reference(customers, recommendations, alerts, account_ids):
+    recs = recommendations[recommendations['account_id'].isin(account_ids)]
+    recs = recs.assign(priority_order=recs['priority'].map(PRIORITY_ORDER))
+    recs = recs.sort_values('priority_order', kind='stable').head(5)
+    critical = alerts[alerts['account_id'].isin(account_ids) & (alerts['severity'] == 'HIGH')].head(5)
+    return recs['recommendation_id'].tolist(), critical['alert_id'].tolist()
+
+
+@pytest.mark.parametrize('filter_type, column, value', [
+    ('health', 'health_status', 'Critical'),
+    ('region', 'region', 'West Africa'),
+])
+def test_segment_lookup_matches_full_scan(client, tables, filter_type, column, value):
+    customers, recommendations, alerts = tables
+    account_ids = customers[customers[column] == value]['account_id']
+
+    body = client.get(f'/api/segment/recommendations?type={filter_type}&value={value}').get_json()
+
+    expected_recs, expected_alerts = _reference(customers, recommendations, alerts, account_ids)
+    assert [r['recommendation_id'] for r in body['top_recommendations']] == expected_recs
+    assert [a['alert_id'] for a in body['critical_alerts']] == expected_alerts
+
+
+def test_opco_and_subsidiary_segments(client, tables):
+    customers, recommendations, alerts = tables
+
+    opco_id = customers['country'].iloc[0]
+    body = client.get(f'/api/segment/recommendations?type=opco&value={opco_id}').get_json()
+    opco_accounts = customers[customers['country'] == opco_id]['account_id']
+    assert body['segment_stats']['customer_count'] == len(opco_accounts)
+    assert [a['alert_id'] for a in body['critical_alerts']] == \
+        _reference(customers, recommendations, alerts, opco_accounts)[1]
+
+    related = customers[customers['subsidiaries'].map(
+        lambda subs: any(s['subsidiary_id'] == 'sasai_fintech' for s in json.loads(subs))
+    )]['account_id']
+    body = client.get('/api/segment/recommendations?type=subsidiary&value=sasai_fintech').get_json()
+    assert body['segment_stats']['customer_count'] == len(related)
+    assert [r['recommendation_id'] for r in body['top_recommendations']] == \
+        _reference(customers, recommendations, alerts, related)[0]
+
+
+def test_invalid_segment_type(client):
+    assert client.get('/api/segment/recommendations?type=bogus&value=x').status_code == 400
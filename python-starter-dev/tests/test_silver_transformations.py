@@ -0,0 +1,71 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from silver_transformations import transform_column
+from transform_silver import SilverLayerTransformer
+
+CONFIG = Path(__file__).resolve().parent.parent / 'config'
+
+
+def _transform(values, transformation, dtype=None):
+    result, failed = transform_column(pd.Series(values, dtype=dtype), transformation)
+    return [None if pd.api.types.is_scalar(v) and pd.isna(v) else v for v in result.tolist()], failed
+
+
+def test_text_transformations_work_on_whole_columns():
+    assert _transform([' ab c ', None, 5], 'trim_upper', object) == (['AB C', None, '5'], 0)
+    assert _transform([' Ab ', None], 'trim_lower') == (['ab', None], 0)
+    assert _transform(['customer', ' Partner', 'Reseller', None], 'standardize_account_type') == (
+        ['Enterprise', ' Partner', 'Reseller', None], 0
+    )
+    assert _transform(['closed won', 'Demo'], 'standardize_stage') == (['Closed Won', 'Demo'], 0)
+    assert _transform(['ZA', 'Ghana', None], 'map_country_to_region') == (['South Africa', 'Ghana', None], 0)
+    assert _transform(['+27 (11) 555-1234', 27115551234.0], 'standardize_phone', object) == (
+        ['+27115551234', '271155512340'], 0
+    )
+
+
+def test_numbers_and_booleans_keep_scalar_semantics():
+    assert _transform([1250.0, np.nan, 0.0], 'divide_by_100') == ([12.5, None, 0.0], 0)
+    # Empty values are zero; unreadable ones are kept and counted
+    assert _transform(['12.5', '', ' 7 ', 'abc', None], 'convert_to_usd') == ([12.5, 0.0, 7.0, 'abc', None], 1)
+    assert _transform([1.5, np.nan], 'null_to_zero') == ([1.5, 0.0], 0)
+    assert _transform(['x', None], 'null_to_zero') == (['x', 0], 0)
+    assert _transform([True, False], 'to_boolean') == ([True, False], 0)
+    assert _transform(['False', '', None, 0, 2], 'to_boolean', object) == ([True, False, None, False, True], 0)
+    assert _transform(['a', None], 'none') == (['a', None], 0)
+
+
+def test_dates_parse_iso_at_once_and_other_formats_per_value():
+    values = ['2024-01-05', '2024-01-05T23:10:00.000+0000', None, 'Jan 6, 2024', 'garbage']
+    assert _transform(values, 'parse_date') == (
+        [date(2024, 1, 5), date(2024, 1, 5), None, date(2024, 1, 6), 'garbage'], 1
+    )
+    # Mixed UTC offsets keep each value's own date
+    assert _transform(['2024-01-05T23:00:00-05:00', '2024-01-05T01:00:00+02:00'], 'parse_date') == (
+        [date(2024, 1, 5), date(2024, 1, 5)], 0
+    )
+
+
+def test_transform_table_counts_failed_values_per_column(tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'bronze_path': str(tmp_path), 'silver_path': str(tmp_path / 'silver')}))
+    transformer = SilverLayerTransformer(str(config), str(CONFIG / 'bronze_to_silver_mapping.json'))
+    bronze = pd.DataFrame({
+        'Id': [' a1', 'a2', 'a3'], 'Name': ['Alpha ', 'Beta', None], 'Type': ['Customer', 'Partner', None],
+        'AnnualRevenue': ['1000', 'n/a', None], 'CreatedDate': ['2020-01-01', 'someday', 'never'],
+    })
+
+    silver = transformer.transform_table('account', bronze)
+
+    assert silver['account_id'].tolist() == ['A1', 'A2', 'A3']
+    assert silver['account_type'].tolist()[:2] == ['Enterprise', 'Wholesale']
+    assert silver['annual_revenue_usd'].tolist()[:2] == [1000.0, 'n/a']
+    assert silver['customer_since'][0] == date(2020, 1, 1)
+    assert transformer.failed_values['account'] == {'annual_revenue_usd': 1, 'customer_since': 2}
+    assert transformer.apply_transformation(' x ', 'trim_upper') == 'X'
+    assert transformer.apply_transformation(None, 'trim') is None
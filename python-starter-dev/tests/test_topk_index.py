@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from rollup_cube import RollupCube
+from topk_index import TopKIndex
+
+
+@pytest.fixture(scope='module')
+def topk(customers):
+    return TopKIndex.from_snapshot(customers, RollupCube.from_customers(customers).relationships)
+
+
+def _ids(customers, positions):
+    return customers['account_id'].to_numpy()[positions].tolist()
+
+
+def test_single_segment_leaderboards_match_nlargest(topk, customers):
+    for region in customers['region'].unique():
+        expected = customers[customers['region'] == region].nlargest(5, 'annual_revenue')
+        assert _ids(customers, topk.top('annual_revenue', 5, region=region)) == expected['account_id'].tolist()
+
+    expected = customers.nlargest(10, 'churn_risk_score')['account_id'].tolist()
+    assert _ids(customers, topk.top('churn_risk_score', 10)) == expected
+
+
+def test_combined_filters_match_filtered_head(topk, customers):
+    opco_id = customers['country'].iloc[0]
+    segment = customers[(customers['country'] == opco_id) & (customers['health_status'] == 'At-Risk')]
+
+    positions = topk.top('snapshot_order', 10, country=opco_id, health_status='At-Risk')
+
+    assert _ids(customers, positions) == segment.head(10)['account_id'].tolist()
+
+
+def test_subsidiary_leaderboard_ranks_by_relationship_revenue(topk, customers):
+    revenue = topk.subsidiary_revenue('liquid_tech')
+    positions = topk.top('subsidiary_revenue', 10, subsidiary='liquid_tech')
+
+    assert np.all(np.diff(revenue[positions]) <= 0)
+    assert revenue[positions[0]] == np.nanmax(revenue)
+
+
+def test_leaderboard_endpoint(client):
+    body = client.get('/api/leaderboard/annual_revenue?k=3&health_status=Healthy').get_json()
+    assert len(body) == 3
+    assert all(c['health_status'] == 'Healthy' for c in body)
+
+    assert client.get('/api/leaderboard/not_a_metric').status_code == 400
+
+
+def test_leaderboard_endpoint_clamps_k(client):
+    assert len(client.get('/api/leaderboard/annual_revenue?k=-3').get_json()) == 1
+    assert len(client.get('/api/leaderboard/annual_revenue?k=0').get_json()) == 1
+    assert len(client.get('/api/leaderboard/annual_revenue?k=1000').get_json()) == 100